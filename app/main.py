@@ -1,19 +1,38 @@
 from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse
 import uvicorn
 import logging
-import time
 from fastapi.middleware.cors import CORSMiddleware
-from app.log_requests_middleware import LogRequestsMiddleware
-from app.correlation_id_middleware import CorrelationIdMiddleware
+from framework.middleware.compression import CompressionMiddleware
+from framework.middleware.observability import ObservabilityMiddleware
+from framework.services.data_access.ConnectionPool import PoolTimeoutError
+from framework.utils.logging_pipeline import configure_logging
+from framework.utils.json_response import FastJSONResponse
 import json
 import os
+from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
 
 from app.routers import mealplan
+from app.services.service_factory import ServiceFactory
 
-logging.basicConfig(level=logging.INFO)
+# Log records are written by a background thread; see configure_logging for the LOG_* settings.
+configure_logging()
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the shared services and warm them (open pool connections, prime caches) before
+    # serving, then close them once the server stops: in-flight data-service calls finish
+    # and pooled connections are closed.
+    await run_in_threadpool(ServiceFactory.startup)
+    yield
+    await run_in_threadpool(ServiceFactory.shutdown)
+
+
+# Responses are encoded by pydantic-core in one pass; see FastJSONResponse.
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -23,25 +42,27 @@ app.add_middleware(
     allow_headers=["*"], # Allows all headers
 )
 
-#add middleware
-app.add_middleware(LogRequestsMiddleware)
-app.add_middleware(CorrelationIdMiddleware)
-
-# Middleware to log requests before and after
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    logger.info(f"Request: {request.method} {request.url}")
+# Negotiated gzip/br/zstd compression of JSON responses. Bodies under COMPRESSION_MIN_SIZE
+# bytes are sent as is; bodies of COMPRESSION_OFFLOAD_SIZE bytes or more are compressed on a
+# worker thread.
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.environ.get("COMPRESSION_MIN_SIZE", 1024)),
+    offload_size=int(os.environ.get("COMPRESSION_OFFLOAD_SIZE", 64 * 1024)),
+)
 
-    # Log before the request is processed
-    start_time = time.time()
-    # Call the next process in the pipeline
-    response = await call_next(request)
+# Correlation ID, timing and access logging. Added last, so it is the outermost middleware
+# and times the whole request.
+app.add_middleware(ObservabilityMiddleware)
 
-    # Log after the request is processed
-    process_time = time.time() - start_time
-    logger.info(f"Response status: {response.status_code} | Time: {process_time:.4f}s")
 
-    return response
+# Every pooled database connection stayed busy for DB_POOL_TIMEOUT seconds: the service is
+# overloaded, not broken, so clients are asked to retry.
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    logger.warning("Database pool exhausted: %s", exc)
+    return JSONResponse(status_code=503, content={"detail": "The service is busy, try again later."},
+                        headers={"Retry-After": "1"})
 
 
 app.include_router(mealplan.router)
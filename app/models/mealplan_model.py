@@ -1,16 +1,81 @@
 from __future__ import annotations
-from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
+from datetime import date
+from typing import Optional, List, Dict, Any, ClassVar, Tuple
+from pydantic import BaseModel, ConfigDict, Field
 
-class WeeklyMealplan(BaseModel):
+
+class RowModel(BaseModel):
+    """
+    A model of a row of our own database. from_row() builds it without validation: the
+    columns already have the field types, except DATE columns, which become YYYY-MM-DD strings.
+    Use it only for rows read from the database, never for request data.
+    """
+    # Precomputed per subclass: the fields read from the row, and those that are dates.
+    _row_fields: ClassVar[Tuple[str, ...]] = ()
+    _date_fields: ClassVar[Tuple[str, ...]] = ()
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs):
+        super().__pydantic_init_subclass__(**kwargs)
+        cls._row_fields = tuple(name for name in cls.model_fields if name != "links")
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]):
+        values = {name: row[name] for name in cls._row_fields if name in row}
+        for name in cls._date_fields:
+            value = values.get(name)
+            if isinstance(value, date):
+                values[name] = value.isoformat()
+        return cls.model_construct(**values)
+
+    @classmethod
+    def parse_fields(cls, value: str) -> Tuple[str, ...]:
+        """
+        Parse a sparse fieldset, e.g. "meal_id,lunch_recipe", into field names in model order.
+
+        :raises ValueError: If it names no field or a field the model does not have.
+        """
+        requested = {name.strip() for name in value.split(",") if name.strip()}
+        if not requested:
+            raise ValueError("fields must name at least one field")
+        unknown = requested - set(cls.model_fields)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. "
+                             f"Valid fields are: {', '.join(cls.model_fields)}")
+        return tuple(name for name in cls.model_fields if name in requested)
+
+    @classmethod
+    def columns(cls, fields: Tuple[str, ...]) -> Tuple[str, ...]:
+        """
+        The table columns needed for a fieldset from parse_fields().
+        """
+        return tuple(name for name in fields if name != "links")
+
+    @classmethod
+    def row_dict(cls, row: Dict[str, Any], fields: Tuple[str, ...]) -> Dict[str, Any]:
+        """
+        The response body of a row restricted to a fieldset from parse_fields(): a plain dict
+        with only those keys, dates as YYYY-MM-DD strings.
+        """
+        values = {name: row.get(name) for name in fields}
+        for name in cls._date_fields:
+            value = values.get(name)
+            if isinstance(value, date):
+                values[name] = value.isoformat()
+        return values
+
+
+class WeeklyMealplan(RowModel):
     week_plan_id: int
     start_date: str  # Format: YYYY-MM-DD
     end_date: str  # Format: YYYY-MM-DD
     links: Optional[Dict[str, Any]] = Field(None, alias="links")
 
-    class Config:
-        orm_mode = True
-        json_schema_extra = {
+    _date_fields: ClassVar[Tuple[str, ...]] = ("start_date", "end_date")
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
             "example": {
                 "week_plan_id": 1,
                 "start_date": "2024-10-01",
@@ -23,17 +88,20 @@ class WeeklyMealplan(BaseModel):
                 }
             }
         }
+    )
 
-class DailyMealplan(BaseModel):
+class DailyMealplan(RowModel):
     day_plan_id: int
     week_plan_id: int
     date: str  # Format: YYYY-MM-DD
     meal_id: int
     links: Optional[Dict[str, Any]] = Field(None, alias="links")
 
-    class Config:
-        orm_mode = True
-        json_schema_extra = {
+    _date_fields: ClassVar[Tuple[str, ...]] = ("date",)
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
             "example": {
                 "day_plan_id": 1,
                 "week_plan_id": 1,
@@ -48,17 +116,18 @@ class DailyMealplan(BaseModel):
                 }
             }
         }
+    )
 
-class Mealplan(BaseModel):
+class Mealplan(RowModel):
     meal_id: int
     breakfast_recipe: Optional[int] = None
     lunch_recipe: Optional[int] = None
     dinner_recipe: Optional[int] = None
     links: Optional[Dict[str, Any]] = Field(None, alias="links")
 
-    class Config:
-        orm_mode = True
-        json_schema_extra = {
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
             "example": {
                 "meal_id": 10,
                 "breakfast_recipe": 171,
@@ -74,14 +143,15 @@ class Mealplan(BaseModel):
                 }
             }
         }
+    )
 
 class PaginatedResponse(BaseModel):
     items: List[Any]
     links: Dict[str, Any]
 
-    class Config:
-        orm_mode = True
-        json_schema_extra = {
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
             "example": {
                 "items": [
                     {"day_plan_id": 1, "week_plan_id": 1, "date": "2024-10-01", "meal_id": 10},
@@ -94,3 +164,87 @@ class PaginatedResponse(BaseModel):
                 }
             }
         }
+    )
+
+class BatchResponse(BaseModel):
+    items: List[Any]
+    missing: List[int]
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
+            "example": {
+                "items": [
+                    {"meal_id": 1, "breakfast_recipe": 171, "lunch_recipe": 180, "dinner_recipe": 192},
+                    {"meal_id": 3, "breakfast_recipe": 172, "lunch_recipe": 181, "dinner_recipe": 193}
+                ],
+                "missing": [2]
+            }
+        }
+    )
+
+class BulkCreateResponse(BaseModel):
+    items: List[Any]
+    errors: List[Dict[str, Any]] = []
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
+            "example": {
+                "items": [
+                    {"meal_id": 11, "breakfast_recipe": 171, "lunch_recipe": 180, "dinner_recipe": 192}
+                ],
+                "errors": [
+                    {"index": 1, "error": "(1452, 'Cannot add or update a child row: a foreign key constraint fails')"}
+                ]
+            }
+        }
+    )
+
+class BatchOperation(BaseModel):
+    method: str  # POST, PUT or DELETE
+    path: str  # e.g. /mealplans/10
+    body: Optional[Dict[str, Any]] = None
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation]
+    atomic: bool = True  # All or nothing; otherwise failed operations are skipped
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "operations": [
+                    {"method": "PUT", "path": "/mealplans/10",
+                     "body": {"meal_id": 10, "breakfast_recipe": 171, "lunch_recipe": 180, "dinner_recipe": 192}},
+                    {"method": "POST", "path": "/daily-mealplans",
+                     "body": {"day_plan_id": 0, "week_plan_id": 0, "date": "2024-10-02", "meal_id": 10}},
+                    {"method": "DELETE", "path": "/daily-mealplans/7"}
+                ],
+                "atomic": True
+            }
+        }
+    )
+
+class BatchOperationResult(BaseModel):
+    status: int
+    body: Optional[Any] = None
+
+class BatchOperationsResponse(BaseModel):
+    committed: bool
+    results: List[BatchOperationResult]
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
+            "example": {
+                "committed": True,
+                "results": [
+                    {"status": 200, "body": {"meal_id": 10, "breakfast_recipe": 171, "lunch_recipe": 180,
+                                             "dinner_recipe": 192}},
+                    {"status": 201, "body": {"day_plan_id": 12, "week_plan_id": 2, "date": "2024-10-02",
+                                             "meal_id": 10}},
+                    {"status": 200, "body": {"message": "Daily meal plan with ID 7 has been deleted"}}
+                ]
+            }
+        }
+    )
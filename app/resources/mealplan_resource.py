@@ -1,14 +1,31 @@
 # resource.py
+import logging
+from contextlib import nullcontext
 from typing import Any, List
 from framework.resources.base_resource import BaseResource
-from datetime import datetime
+from datetime import datetime, timedelta
 from datetime import date
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from pydantic import BaseModel
 from fastapi import HTTPException
 
 from app.models.mealplan_model import Mealplan, DailyMealplan, WeeklyMealplan
 from app.services.service_factory import ServiceFactory
+from framework.services.cache.single_flight import call_key
+from framework.utils.cursor import encode_cursor, decode_cursor, NEXT, PREV
+
+logger = logging.getLogger(__name__)
+
+# The recipe columns of a meal plan are <course>_recipe.
+COURSES = ("breakfast", "lunch", "dinner")
+
+
+class BatchAbortedError(Exception):
+    """
+    The result of an operation of an atomic batch that was rolled back, or not run, because
+    another operation failed.
+    """
+    pass
 
 
 def transform_to_daily_mealplans(input_data: Dict) -> List[Dict[str, Any]]:
@@ -46,6 +63,14 @@ class MealplanResource(BaseResource):
         super().__init__(config)
 
         self.data_service = ServiceFactory.get_service("MealplanResourceDataService")
+        self.async_data_service = ServiceFactory.get_service("MealplanResourceAsyncDataService")
+        self.id_allocator = ServiceFactory.get_service("MealplanIdAllocator")
+        self.count_cache = ServiceFactory.get_service("MealplanCountCache")
+        self.object_cache = ServiceFactory.get_service("MealplanObjectCache")
+        # Identical concurrent reads share one query; see _read_async.
+        self.single_flight = ServiceFactory.get_service("MealplanSingleFlight")
+        # Recipe details come from the recipe service when one is configured.
+        self.recipe_client = ServiceFactory.get_service("RecipeClient")
         self.database = "mealplan_db"
         self.meal_plans = "meal_plans"
         self.daily_meal_plans = "daily_meal_plans"
@@ -62,49 +87,163 @@ class MealplanResource(BaseResource):
         )
         return Mealplan(**data)
 
-    def get_by_key(self, key: Any, collection: str):
-        d_service = self.data_service
-        try:
-            key = int(key)
-        except:
-            key = str(key) #RETURN AN ERROR CODE FOR INCORRECT KEY TYPE
-        if collection == "meal_plans":
-            result = d_service.get_data_object(
-                self.database, self.meal_plans, key_field=self.meal_plans_pk, key_value=key
+    def _get_data_object(self, collection: str, key_field: str, key: Any, fields: Optional[Tuple[str, ...]] = None):
+        """
+        Read-through lookup of a single row in the object cache. The data service invalidates
+        cached rows when they are updated or deleted, including by cascading deletes.
+
+        With fields, a cached row is used if there is one; otherwise only those columns are
+        selected, and the partial row is not cached.
+        """
+        if fields is not None:
+            row = self.object_cache.get((self.database, collection, key))
+            if row is not None:
+                return row
+            return self.data_service.get_data_object(
+                self.database, collection, key_field=key_field, key_value=key,
+                fields=self._collection_model(collection)[1].columns(fields)
             )
-            return Mealplan(**result)
-        elif collection == "weekly_meal_plans":
-            result = d_service.get_data_object(
-                self.database, self.weekly_meal_plans, key_field=self.weekly_pk, key_value=key
+        return self.object_cache.get_or_load(
+            (self.database, collection, key),
+            lambda: self.data_service.get_data_object(
+                self.database, collection, key_field=key_field, key_value=key
             )
-            return WeeklyMealplan(**result)
+        )
+
+    def _collection_model(self, collection: str):
+        """
+        The primary key and model of a collection.
+        """
+        if collection == "meal_plans":
+            return self.meal_plans_pk, Mealplan
+        elif collection == "weekly_meal_plans":
+            return self.weekly_pk, WeeklyMealplan
         elif collection == "daily_meal_plans":
-            result = d_service.get_data_object(
-                self.database, self.daily_meal_plans, key_field=self.daily_pk, key_value=key
-            )
-            return DailyMealplan(**result)
-        
-    async def get_by_key_async(self, key: Any, collection: str):
-        d_service = self.data_service
+            return self.daily_pk, DailyMealplan
+        raise ValueError(f"Invalid collection name: {collection}")
+
+    def get_by_key(self, key: Any, collection: str, fields: Optional[Tuple[str, ...]] = None):
+        return self.to_model(self.get_row(key, collection, fields), collection, fields)
+
+    def get_row(self, key: Any, collection: str, fields: Optional[Tuple[str, ...]] = None) -> Optional[dict]:
+        """
+        Retrieve the row of an object through the object cache, without building its model.
+        Conditional GETs hash the row, so a 304 never builds a model.
+
+        :param fields: A fieldset from RowModel.parse_fields(). The row is restricted to it.
+        """
         try:
             key = int(key)
         except:
             key = str(key) #RETURN AN ERROR CODE FOR INCORRECT KEY TYPE
-        if collection == "meal_plans":
-            result = d_service.get_data_object(
-                self.database, self.meal_plans, key_field=self.meal_plans_pk, key_value=key
-            )
-            return Mealplan(**result)
-        elif collection == "weekly_meal_plans":
-            result = d_service.get_data_object(
-                self.database, self.weekly_meal_plans, key_field=self.weekly_pk, key_value=key
+        key_field, model = self._collection_model(collection)
+        row = self._get_data_object(collection, key_field, key, fields)
+        if row is not None and fields is not None:
+            return model.row_dict(row, fields)
+        return row
+
+    def to_model(self, row: Optional[dict], collection: str, fields: Optional[Tuple[str, ...]] = None):
+        """
+        Build the response model of a row returned by get_row(), or None for no row. With
+        fields, the response is the restricted row itself.
+        """
+        if not row:
+            return None
+        if fields is not None:
+            return row
+        return self._collection_model(collection)[1].from_row(row)
+
+    def get_by_keys(self, keys: List[Any], collection: str,
+                    fields: Optional[Tuple[str, ...]] = None) -> Tuple[List[Any], List[Any]]:
+        """
+        Retrieve many objects of one collection with at most one IN query for the keys that are
+        not already cached.
+
+        :param keys: The primary keys to look up.
+        :param collection: meal_plans, weekly_meal_plans or daily_meal_plans.
+        :param fields: A fieldset from RowModel.parse_fields(). Items are then dicts with only
+            those keys, and the query selects only those columns; its partial rows are not cached.
+        :return: A tuple (items, missing). items are in request order; missing lists the keys
+            that do not exist.
+        """
+        key_field, model = self._collection_model(collection)
+
+        def load(cache_keys, columns=None):
+            rows = self.data_service.get_data_objects(
+                self.database, collection, key_field, [cache_key[2] for cache_key in cache_keys], fields=columns
             )
-            return WeeklyMealplan(**result)
-        elif collection == "daily_meal_plans":
-            result = d_service.get_data_object(
-                self.database, self.daily_meal_plans, key_field=self.daily_pk, key_value=key
+            return {(self.database, collection, row[key_field]): row for row in rows}
+
+        cache_keys = [(self.database, collection, key) for key in keys]
+        if fields is None:
+            found = self.object_cache.get_many_or_load(cache_keys, load)
+        else:
+            found = {cache_key: self.object_cache.get(cache_key) for cache_key in cache_keys}
+            misses = [cache_key for cache_key, row in found.items() if row is None]
+            if misses:
+                found.update(load(misses, model.columns(fields)))
+
+        items, missing = [], []
+        for key in keys:
+            row = found.get((self.database, collection, key))
+            if row is None:
+                missing.append(key)
+            elif fields is None:
+                items.append(model.from_row(row))
+            else:
+                items.append(model.row_dict(row, fields))
+        return items, missing
+
+    def expand(self, items: List[Any], collection: str, expand: Tuple[str, ...]) -> List[dict]:
+        """
+        Embed related objects in response items, with one batched query per level rather than
+        one per item.
+
+        - daily: each weekly plan gets its daily plans (daily_mealplans), ordered by date, from
+          one WHERE week_plan_id IN (...) query.
+        - meals: each daily plan, including those embedded by daily, gets its meal plan
+          (mealplan) from one get_by_keys() lookup. For weekly plans, meals implies daily.
+
+        Recipes come from the recipe service; see expand_async().
+
+        :param items: Meal plan, weekly or daily plan items, as models or dicts (e.g. from a
+            fieldset). They must include week_plan_id (daily) or meal_id (meals).
+        :param collection: meal_plans, weekly_meal_plans or daily_meal_plans.
+        :param expand: The expansions, from daily and meals.
+        :return: The items as dicts with the related objects embedded.
+        :raises ValueError: If an item lacks the key an expansion needs.
+        """
+        items = [item.model_dump() if isinstance(item, BaseModel) else dict(item) for item in items]
+        if collection == self.weekly_meal_plans:
+            weekly_items, daily_items = items, []
+        elif collection == self.daily_meal_plans:
+            weekly_items, daily_items = [], items
+        else:
+            weekly_items, daily_items = [], []
+
+        def keys_of(rows: List[dict], key_field: str, expansion: str) -> List[Any]:
+            if any(key_field not in row for row in rows):
+                raise ValueError(f"expand={expansion} needs {key_field} in fields")
+            return list(dict.fromkeys(row[key_field] for row in rows))
+
+        if weekly_items and ("daily" in expand or "meals" in expand):
+            rows = self.data_service.get_data_objects(
+                self.database, self.daily_meal_plans, self.weekly_pk,
+                keys_of(weekly_items, self.weekly_pk, "daily")
             )
-            return DailyMealplan(**result)
+            by_week: Dict[Any, List[dict]] = {}
+            for row in sorted(rows, key=lambda row: (row["date"], row[self.daily_pk])):
+                by_week.setdefault(row[self.weekly_pk], []).append(DailyMealplan.from_row(row).model_dump())
+            for item in weekly_items:
+                item["daily_mealplans"] = by_week.get(item[self.weekly_pk], [])
+                daily_items.extend(item["daily_mealplans"])
+
+        if daily_items and "meals" in expand:
+            meal_plans, _ = self.get_by_keys(keys_of(daily_items, self.meal_plans_pk, "meals"), self.meal_plans)
+            by_meal = {meal_plan.meal_id: meal_plan.model_dump() for meal_plan in meal_plans}
+            for item in daily_items:
+                item["mealplan"] = by_meal.get(item[self.meal_plans_pk])
+        return items
 
     def update_by_key(self, key: str, data: dict) -> Mealplan:
         d_service = self.data_service
@@ -118,94 +257,198 @@ class MealplanResource(BaseResource):
         d_service.delete_data(
             self.database, self.meal_plans, key_field=self.key_field, key_value=key
         )
-    # Get the total count of meal plans in the meal_plans table
-    def get_total_count(self) -> int:
-        return self.data_service.get_total_count(self.database, self.meal_plans)
+    # Get the total count of rows in a collection (meal_plans by default), served from the count cache
+    def get_total_count(self, collection: Optional[str] = None, approximate: Optional[bool] = None) -> int:
+        return self.count_cache.get(self.database, collection or self.meal_plans, approximate=approximate)
 
-    # Create a new meal plan entry
-    def create_meal_plan(self, mealplan: Mealplan) -> Mealplan:
-        mealplan_data = mealplan.dict(exclude_unset=True)
+    # Create a new meal plan entry. The key may have been reserved by the caller (run_batch).
+    def create_meal_plan(self, mealplan: Mealplan, meal_id: Optional[int] = None) -> Mealplan:
+        mealplan_data = mealplan.model_dump(exclude_unset=True)
         # Remove links
         mealplan_data.pop('links', None)
-        print(self.data_service.get_total_count(self.database, self.meal_plans))
-        # mealplan_data['meal_id'] = self.data_service.get_total_count(self.database, self.meal_plans) + 2
-        mealplan_data['meal_id'] = self.data_service.get_max_value("meal_id", self.database, self.meal_plans) + 1
-        print("DAY PLAN ID: ", mealplan_data['meal_id'])
+        mealplan_data['meal_id'] = meal_id or self.id_allocator.next_id(self.meal_plans, self.meal_plans_pk)
+        logger.debug("Creating meal plan %s", mealplan_data['meal_id'])
         # Call insert_data with the meal plan data
         result = self.data_service.insert_data(self.database, self.meal_plans, mealplan_data)
+        self.count_cache.adjust(self.database, self.meal_plans, 1)
         return Mealplan(**result)
     
     # Create a new weekly meal plan entry
-    def create_weekly_meal_plan(self, weekly_mealplan: WeeklyMealplan) -> WeeklyMealplan:
-        weekly_mealplan_data = weekly_mealplan.dict(exclude_unset=True)
+    def create_weekly_meal_plan(self, weekly_mealplan: WeeklyMealplan,
+                                week_plan_id: Optional[int] = None) -> WeeklyMealplan:
+        weekly_mealplan_data = weekly_mealplan.model_dump(exclude_unset=True)
         # Remove any links 
         weekly_mealplan_data.pop('links', None)
-        # weekly_mealplan_data['week_plan_id'] = self.data_service.get_total_count(self.database, self.weekly_meal_plans) + 1
-        weekly_mealplan_data['week_plan_id'] = self.data_service.get_max_value("week_plan_id", self.database, self.weekly_meal_plans) + 1
-        print("WEEK PLAN ID: ", weekly_mealplan_data['week_plan_id'])
+        weekly_mealplan_data['week_plan_id'] = (
+            week_plan_id or self.id_allocator.next_id(self.weekly_meal_plans, self.weekly_pk)
+        )
+        logger.debug("Creating weekly meal plan %s", weekly_mealplan_data['week_plan_id'])
         # Call insert_data with the meal plan data
         result = self.data_service.insert_data(self.database, self.weekly_meal_plans, weekly_mealplan_data)
+        self.count_cache.adjust(self.database, self.weekly_meal_plans, 1)
         return WeeklyMealplan(**result)
 
-    def create_daily_meal_plan(self, daily_mealplan: DailyMealplan) -> DailyMealplan:
-        daily_mealplan_data = daily_mealplan.dict(exclude_unset=True)
+    def create_daily_meal_plan(self, daily_mealplan: DailyMealplan, day_plan_id: Optional[int] = None) -> DailyMealplan:
+        daily_mealplan_data = daily_mealplan.model_dump(exclude_unset=True)
         daily_mealplan_data.pop('links', None)
 
         # Extract the date
         date = daily_mealplan_data['date']
 
+        created_week = False
         try:
-            # Check if a weekly plan exists for the date
-            query = """
-            SELECT week_plan_id FROM mealplan_db.weekly_meal_plans
-            WHERE %s BETWEEN start_date AND end_date
-            """
-            params = (date,)
-            print(f"Checking for existing weekly plan with query: {query}, params: {params}")  # Debugging
-            existing_week_plan = self.data_service.execute_query(query, params)
-
-            if existing_week_plan:
-                # Use the existing week_plan_id
-                daily_mealplan_data['week_plan_id'] = existing_week_plan[0]['week_plan_id']
-            else:
-                # Create a new weekly plan
-                new_week_plan_id = self.data_service.get_max_value(
-                    "week_plan_id", self.database, "weekly_meal_plans"
-                ) + 1
-
-                # Calculate the start_date and end_date for the new weekly plan
-                start_date = date  # Assuming the week starts on the provided date
-                end_date_query = """
-                SELECT DATE_ADD(%s, INTERVAL 6 DAY) AS end_date
+            # The week lookup, the week insert and the day insert run in one transaction. IDs
+            # may be allocated inside it: the allocator does not use the pool.
+            with self.data_service.transaction():
+                # Check if a weekly plan exists for the date
+                query = """
+                SELECT week_plan_id FROM mealplan_db.weekly_meal_plans
+                WHERE %s BETWEEN start_date AND end_date
                 """
-                end_date_result = self.data_service.execute_query(end_date_query, (start_date,))
-                end_date = end_date_result[0]['end_date']
+                params = (date,)
+                logger.debug("Checking for existing weekly plan for %s", date)
+                existing_week_plan = self.data_service.execute_query(query, params)
+
+                if existing_week_plan:
+                    # Use the existing week_plan_id
+                    daily_mealplan_data['week_plan_id'] = existing_week_plan[0]['week_plan_id']
+                else:
+                    # Create a new weekly plan, starting on the provided date
+                    start_date = datetime.strptime(date, "%Y-%m-%d").date()
+                    weekly_mealplan_data = {
+                        "week_plan_id": self.id_allocator.next_id(self.weekly_meal_plans, self.weekly_pk),
+                        "start_date": start_date.isoformat(),
+                        "end_date": (start_date + timedelta(days=6)).isoformat()
+                    }
+                    logger.debug("Creating new weekly plan: %s", weekly_mealplan_data)
+                    self.data_service.insert_data(self.database, self.weekly_meal_plans, weekly_mealplan_data)
+                    created_week = True
+
+                    # Use the newly created week_plan_id
+                    daily_mealplan_data['week_plan_id'] = weekly_mealplan_data['week_plan_id']
+
+                daily_mealplan_data['day_plan_id'] = (
+                    day_plan_id or self.id_allocator.next_id(self.daily_meal_plans, self.daily_pk)
+                )
+
+                # Insert the daily meal plan
+                result = self.data_service.insert_data(
+                    self.database, "daily_meal_plans", daily_mealplan_data
+                )
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error("Error in create_daily_meal_plan: %s", e)
+            raise HTTPException(status_code=500, detail="Failed to create daily meal plan.")
 
-                # Insert the new weekly plan
-                insert_query = """
-                INSERT INTO mealplan_db.weekly_meal_plans (week_plan_id, start_date, end_date)
-                VALUES (%s, %s, %s)
-                """
-                print(
-                    f"Creating new weekly plan with query: {insert_query}, params: ({new_week_plan_id}, {start_date}, {end_date})")  # Debugging
-                self.data_service.execute_query(insert_query, (new_week_plan_id, start_date, end_date))
+        if created_week:
+            self.count_cache.adjust(self.database, self.weekly_meal_plans, 1)
+        self.count_cache.adjust(self.database, self.daily_meal_plans, 1)
+        return DailyMealplan(**result)
+
+    # Bulk create. Keys are allocated in one call and rows are written with insert_many.
+    def _prepare_rows(self, models: List[BaseModel], collection: str, key_field: str) -> List[dict]:
+        rows = []
+        for model in models:
+            row = model.model_dump(exclude_unset=True)
+            row.pop('links', None)
+            rows.append(row)
+        for row, key in zip(rows, self.id_allocator.next_ids(collection, key_field, len(rows))):
+            row[key_field] = key
+        return rows
+
+    def create_meal_plans(self, mealplans: List[Mealplan], report_errors: bool = False) -> Tuple[List[Mealplan], List[dict]]:
+        rows = self._prepare_rows(mealplans, self.meal_plans, self.meal_plans_pk)
+        inserted, errors = self.data_service.insert_many(self.database, self.meal_plans, rows, report_errors=report_errors)
+        self.count_cache.adjust(self.database, self.meal_plans, len(inserted))
+        return [Mealplan(**row) for row in inserted], errors
+
+    def create_weekly_meal_plans(self, weekly_mealplans: List[WeeklyMealplan],
+                                 report_errors: bool = False) -> Tuple[List[WeeklyMealplan], List[dict]]:
+        rows = self._prepare_rows(weekly_mealplans, self.weekly_meal_plans, self.weekly_pk)
+        inserted, errors = self.data_service.insert_many(self.database, self.weekly_meal_plans, rows, report_errors=report_errors)
+        self.count_cache.adjust(self.database, self.weekly_meal_plans, len(inserted))
+        return [WeeklyMealplan(**row) for row in inserted], errors
+
+    def _find_weeks(self, days: List[date]) -> List[Tuple[Any, date, date]]:
+        """
+        The weekly plans overlapping the days, as (week_plan_id, start_date, end_date), in one query.
+        """
+        query = """
+        SELECT week_plan_id, start_date, end_date FROM mealplan_db.weekly_meal_plans
+        WHERE start_date <= %s AND end_date >= %s
+        ORDER BY week_plan_id
+        """
+        return [
+            (week['week_plan_id'], week['start_date'], week['end_date'])
+            for week in self.data_service.execute_query(query, (max(days).isoformat(), min(days).isoformat()))
+        ]
 
-                # Use the newly created week_plan_id
-                daily_mealplan_data['week_plan_id'] = new_week_plan_id
+    def _assign_weeks(self, rows: List[dict], days: List[date], weeks: List[Tuple[Any, date, date]]) -> List[dict]:
+        """
+        Set the week_plan_id of each daily row to the weekly plan containing its day. A day with
+        no weekly plan gets a new week starting on it. The keys of the new weeks are allocated
+        in one call.
 
-            # Generate a new day_plan_id
-            daily_mealplan_data['day_plan_id'] = self.data_service.get_max_value(
-                "day_plan_id", self.database, "daily_meal_plans"
-            ) + 1
+        :return: The weekly plans to create.
+        """
+        new_weeks: List[Tuple[date, date, List[dict]]] = []
+        for row, day in zip(rows, days):
+            week_plan_id = next((week_id for week_id, start, end in weeks if start <= day <= end), None)
+            if week_plan_id is not None:
+                row['week_plan_id'] = week_plan_id
+                continue
+            week = next((week for week in new_weeks if week[0] <= day <= week[1]), None)
+            if week is None:
+                week = (day, day + timedelta(days=6), [])
+                new_weeks.append(week)
+            week[2].append(row)
+
+        week_ids = self.id_allocator.next_ids(self.weekly_meal_plans, self.weekly_pk, len(new_weeks))
+        created = []
+        for (start, end, week_rows), week_plan_id in zip(new_weeks, week_ids):
+            for row in week_rows:
+                row['week_plan_id'] = week_plan_id
+            created.append({"week_plan_id": week_plan_id, "start_date": start.isoformat(), "end_date": end.isoformat()})
+        return created
+
+    def create_daily_meal_plans(self, daily_mealplans: List[DailyMealplan],
+                                report_errors: bool = False) -> Tuple[List[DailyMealplan], List[dict]]:
+        """
+        Create many daily meal plans. As in create_daily_meal_plan, each day is attached to the
+        weekly plan containing its date, and a week starting on that date is created if there is
+        none. All existing weeks are looked up with one query and missing weeks are inserted
+        with one insert_many.
 
-            # Insert the daily meal plan
-            result = self.data_service.insert_data(
-                self.database, "daily_meal_plans", daily_mealplan_data
+        The lookup and the inserts run in one transaction. With report_errors, failed days are skipped in savepoints (see insert_many), and the new
+        weeks only they needed are removed again.
+        """
+        if not daily_mealplans:
+            return [], []
+        rows = self._prepare_rows(daily_mealplans, self.daily_meal_plans, self.daily_pk)
+        days = [datetime.strptime(row['date'], "%Y-%m-%d").date() for row in rows]
+
+        with self.data_service.transaction() as connection:
+            new_weeks = self._assign_weeks(rows, days, self._find_weeks(days))
+            if new_weeks:
+                self.data_service.insert_many(self.database, self.weekly_meal_plans, new_weeks)
+
+            inserted, errors = self.data_service.insert_many(
+                self.database, self.daily_meal_plans, rows, report_errors=report_errors
             )
-            return DailyMealplan(**result)
-        except Exception as e:
-            print(f"Error in create_daily_meal_plan: {e}")  # Debugging
-            raise HTTPException(status_code=500, detail="Failed to create daily meal plan.")
+
+            used = {row['week_plan_id'] for row in inserted}
+            unused = [week['week_plan_id'] for week in new_weeks if week['week_plan_id'] not in used]
+            if unused:
+                placeholders = ", ".join(["%s"] * len(unused))
+                connection.cursor().execute(
+                    f"DELETE FROM `{self.database}`.`{self.weekly_meal_plans}` "
+                    f"WHERE `{self.weekly_pk}` IN ({placeholders})", unused
+                )
+
+        self.count_cache.adjust(self.database, self.weekly_meal_plans, len(new_weeks) - len(unused))
+        self.count_cache.adjust(self.database, self.daily_meal_plans, len(inserted))
+        return [DailyMealplan(**row) for row in inserted], errors
 
     def _get_year_and_week(self, date: str) -> tuple:
         """
@@ -223,26 +466,53 @@ class MealplanResource(BaseResource):
         result = self.data_service.get_data_object(
             self.database, self.weekly_meal_plans, key_field="week_plan_id", key_value=week_plan_id
         )
-        return WeeklyMealplan(**result) if result else None
+        return WeeklyMealplan.from_row(result) if result else None
 
     # Retrieve daily meal plans within a specific week
-    def get_daily_meal_plans_by_week(self, week_plan_id: Any) -> List[DailyMealplan]:
+    def get_daily_meal_plans_by_week(self, week_plan_id: Any,
+                                     fields: Optional[Tuple[str, ...]] = None) -> List[DailyMealplan]:
         results = self.data_service.get_all_data(
-            self.database, self.daily_meal_plans, filters={"week_plan_id": week_plan_id}
+            self.database, self.daily_meal_plans, filters={"week_plan_id": week_plan_id},
+            fields=DailyMealplan.columns(fields) if fields else None
         )
-        for idx, result in enumerate(results):
-            results[idx] = {
-                "day_plan_id": result["day_plan_id"],
-                "week_plan_id": result["week_plan_id"],
-                "date": result["date"].strftime("%Y-%m-%d"),
-                "meal_id": result["meal_id"]
+        return self._to_daily_mealplans(results, fields)
+    def get_daily_meal_plans_by_date(self, date: str, with_recipes: bool = True) -> List[DailyMealplan]:
+        return self.data_service.get_daily_meal_plans_by_date(date, with_recipes)
+    # Retrieve daily meal plans with recipes for a date range, e.g. a calendar view, in one query
+    def get_daily_meal_plans_by_date_range(self, start_date: str, end_date: str, with_recipes: bool = True):
+        return self.data_service.get_daily_meal_plans_by_date_range(start_date, end_date, with_recipes)
+
+    async def _with_recipe_names(self, result: dict) -> dict:
+        """
+        Fill in the recipe names of a get_daily_meal_plans_by_date(_range) result read without
+        the recipes join, with one concurrent fan-out to the recipe service. The result may be
+        shared by coalesced callers, so the meals are copied rather than changed.
+        """
+        summaries = await self.recipe_client.get_many(
+            meal[f"{course}_id"] for meal in result["meals"] for course in COURSES
+        )
+        meals = []
+        for meal in result["meals"]:
+            meal = dict(meal)
+            for course in COURSES:
+                summary = summaries.get(meal[f"{course}_id"])
+                meal[f"{course}_recipe"] = summary.get("name") if summary else None
+            meals.append(meal)
+        return dict(result, meals=meals)
+
+    async def _embed_recipes(self, meal_plans: List[dict]) -> None:
+        """
+        Add the summaries of their recipes to meal plan dicts, as recipes: {course: summary},
+        with one concurrent fan-out to the recipe service.
+        """
+        summaries = await self.recipe_client.get_many(
+            meal_plan.get(f"{course}_recipe") for meal_plan in meal_plans for course in COURSES
+        )
+        for meal_plan in meal_plans:
+            meal_plan["recipes"] = {
+                course: summaries.get(meal_plan.get(f"{course}_recipe")) for course in COURSES
             }
-        return [DailyMealplan(**item) for item in results]
-    def get_daily_meal_plans_by_date(self, date: str) -> List[DailyMealplan]:
-        results = self.data_service.get_daily_meal_plans_by_date(date)
-        print("results: ", results)
 
-        return results
     # Retrieve meal plans from a specific date
     # def get_daily_meal_plans_by_date(self, date: str) -> List[DailyMealplan]:
     #     results = self.data_service.get_daily_meal_plans_by_date(date)
@@ -296,63 +566,352 @@ class MealplanResource(BaseResource):
         self.data_service.delete_data(
             self.database, self.meal_plans, key_field="meal_id", key_value=meal_id
         )
+        self.count_cache.invalidate(self.database, self.meal_plans)
     
     # Delete a specific meal plan
     def delete_daily_meal_plan(self, day_plan_id: int) -> None:
         self.data_service.delete_data(
             self.database, self.daily_meal_plans, key_field="day_plan_id", key_value=day_plan_id
         )
+        # The delete cascades to the day's meal plan
+        self.count_cache.invalidate(self.database, self.daily_meal_plans)
+        self.count_cache.invalidate(self.database, self.meal_plans)
 
     # Delete a specific meal plan
     def delete_weekly_meal_plan(self, week_plan_id: int) -> None:
         self.data_service.delete_data(
             self.database, self.weekly_meal_plans, key_field="week_plan_id", key_value=week_plan_id
         )
+        # The delete cascades to the week's daily meal plans
+        self.count_cache.invalidate(self.database, self.weekly_meal_plans)
+        self.count_cache.invalidate(self.database, self.daily_meal_plans)
+
+    # Batch writes. run_batch() runs on one thread, so every operation joins its unit of work.
+    def _reserve_batch_keys(self, operations: List[Tuple[str, str, Any, Any]]) -> List[Tuple[str, str, Any, Any]]:
+        """
+        Reserve the keys of the rows a batch creates, in one allocator call per collection.
+
+        :return: The operations, with the reserved keys of the creates.
+        """
+        creates = [collection for action, collection, _, _ in operations if action == "create"]
+        keys = {}
+        for collection in set(creates) & {self.meal_plans, self.weekly_meal_plans, self.daily_meal_plans}:
+            key_field, _ = self._collection_model(collection)
+            keys[collection] = iter(self.id_allocator.next_ids(collection, key_field, creates.count(collection)))
+
+        reserved = []
+        for action, collection, key, payload in operations:
+            if action == "create" and collection in keys:
+                key = next(keys[collection])
+            reserved.append((action, collection, key, payload))
+        return reserved
+
+    def _run_operation(self, action: str, collection: str, key: Any, payload: Any) -> Any:
+        key_field, model = self._collection_model(collection)
+        if action == "create":
+            create = {
+                self.meal_plans: self.create_meal_plan,
+                self.weekly_meal_plans: self.create_weekly_meal_plan,
+                self.daily_meal_plans: self.create_daily_meal_plan,
+            }[collection]
+            return create(payload, key)
+        if action == "update":
+            self.data_service.update_data(self.database, collection, dict(payload), key_field=key_field, key_value=key)
+            # Read back on the transaction's connection: the object cache only hears of the
+            # change once the batch commits.
+            row = self.data_service.get_data_object(self.database, collection, key_field=key_field, key_value=key)
+            if row is None:
+                raise HTTPException(status_code=404, detail=f"{model.__name__} {key} not found")
+            return model.from_row(row)
+        if action == "delete":
+            delete = {
+                self.meal_plans: self.delete_meal_plan,
+                self.weekly_meal_plans: self.delete_weekly_meal_plan,
+                self.daily_meal_plans: self.delete_daily_meal_plan,
+            }[collection]
+            return delete(key)
+        raise ValueError(f"Invalid batch action: {action}")
+
+    def run_batch(self, operations: List[Tuple[str, str, Any, Any]],
+                  atomic: bool = True) -> Tuple[bool, List[Tuple[Any, Optional[Exception]]]]:
+        """
+        Run many writes on one pooled connection, in one transaction.
+
+        :param operations: (action, collection, key, payload) tuples, run in order: create
+            (payload is the model), update (payload is the data to set on key) or delete (key).
+        :param atomic: If True, the first failed operation rolls back the batch and the later
+            ones are not run. Otherwise each operation runs in a savepoint, so a failed one is
+            undone on its own and the others are committed.
+        :return: A tuple (committed, results), with one (value, error) per operation. error is
+            None on success; in an aborted atomic batch, the other operations get a
+            BatchAbortedError.
+        """
+        reserved = self._reserve_batch_keys(operations)
+        results: List[Tuple[Any, Optional[Exception]]] = []
+        failed = None
+        try:
+            with self.data_service.transaction():
+                for index, operation in enumerate(reserved):
+                    try:
+                        with nullcontext() if atomic else self.data_service.savepoint():
+                            results.append((self._run_operation(*operation), None))
+                    except Exception as e:
+                        logger.info("Batch operation %s failed: %s", index, e)
+                        results.append((None, e))
+                        if atomic:
+                            failed = index
+                            raise
+        except Exception as e:
+            if failed is None:
+                # The commit itself failed.
+                error = BatchAbortedError(f"The batch was rolled back: {e}")
+            else:
+                error = BatchAbortedError(f"The batch was rolled back: operation {failed} failed.")
+            results = [
+                (None, results[index][1] if index == failed else error) for index in range(len(operations))
+            ]
+            # Creates and deletes that were rolled back may already have adjusted the counts.
+            for collection in (self.meal_plans, self.weekly_meal_plans, self.daily_meal_plans):
+                self.count_cache.invalidate(self.database, collection)
+            return False, results
+        return True, results
+
+    # Convert rows from get_all_data into response models. The rows come from our own
+    # database, so the models are built with from_row(), without validation. With a fieldset,
+    # the rows are restricted to it instead.
+    def _to_mealplans(self, results: List[dict], fields: Optional[Tuple[str, ...]] = None) -> List[Mealplan]:
+        if fields:
+            return [Mealplan.row_dict(item, fields) for item in results]
+        return [Mealplan.from_row(item) for item in results]
+
+    def _to_weekly_mealplans(self, results: List[dict], fields: Optional[Tuple[str, ...]] = None) -> List[WeeklyMealplan]:
+        if fields:
+            return [WeeklyMealplan.row_dict(item, fields) for item in results]
+        return [WeeklyMealplan.from_row(item) for item in results]
+
+    def _to_daily_mealplans(self, results: List[dict], fields: Optional[Tuple[str, ...]] = None) -> List[DailyMealplan]:
+        if fields:
+            return [DailyMealplan.row_dict(item, fields) for item in results]
+        return [DailyMealplan.from_row(item) for item in results]
 
     # Retrieve all meal plans with pagination
-    def get_all_meal_plans(self, skip: int = 0, limit: int = 10) -> List[Mealplan]:
+    def get_all_meal_plans(self, skip: int = 0, limit: int = 10,
+                           fields: Optional[Tuple[str, ...]] = None) -> List[Mealplan]:
 
         results = self.data_service.get_all_data(
             database_name=self.database, 
             collection_name=self.meal_plans, 
             skip=skip, 
-            limit=limit
+            limit=limit,
+            key_field=self.meal_plans_pk,
+            fields=Mealplan.columns(fields) if fields else None
         )
         
-        return [Mealplan(**item) for item in results]
+        return self._to_mealplans(results, fields)
     
-    def get_all_weekly_meal_plans(self, skip: int = 0, limit: int = 10) -> List[WeeklyMealplan]:
+    def get_all_weekly_meal_plans(self, skip: int = 0, limit: int = 10,
+                                  fields: Optional[Tuple[str, ...]] = None) -> List[WeeklyMealplan]:
  
         results = self.data_service.get_all_data(
             database_name=self.database, 
             collection_name=self.weekly_meal_plans, 
             skip=skip, 
-            limit=limit
+            limit=limit,
+            key_field=self.weekly_pk,
+            fields=WeeklyMealplan.columns(fields) if fields else None
         )
-        print(type(results[0]['end_date']))
-        for idx, result in enumerate(results):
-            results[idx] = {
-                "week_plan_id": result["week_plan_id"],
-                "start_date": result["start_date"].strftime("%Y-%m-%d"),
-                "end_date": result["end_date"].strftime("%Y-%m-%d")
-            }
-        return [WeeklyMealplan(**item) for item in results]
+        return self._to_weekly_mealplans(results, fields)
     
-    def get_all_daily_meal_plans(self, skip: int = 0, limit: int = 10) -> List[DailyMealplan]:
+    def get_all_daily_meal_plans(self, skip: int = 0, limit: int = 10,
+                                 fields: Optional[Tuple[str, ...]] = None) -> List[DailyMealplan]:
  
         results = self.data_service.get_all_data(
             database_name=self.database, 
             collection_name=self.daily_meal_plans, 
             skip=skip, 
-            limit=limit
+            limit=limit,
+            key_field=self.daily_pk,
+            fields=DailyMealplan.columns(fields) if fields else None
         )
-        for idx, result in enumerate(results):
-            results[idx] = {
-                "day_plan_id": 0,
-                "week_plan_id": result["week_plan_id"],
-                "date": result["date"].strftime("%Y-%m-%d"),
-                "meal_id": result["meal_id"]
-            }
-        return [DailyMealplan(**item) for item in results]
-        
+        return self._to_daily_mealplans(results, fields)
+
+    def _get_keyset_page(self, collection: str, key_field: str, limit: int, cursor: Optional[str] = None,
+                         columns: Optional[Tuple[str, ...]] = None) -> Tuple[List[dict], Optional[str], Optional[str]]:
+        """
+        Fetch one page of rows by seeking on the primary key instead of using OFFSET.
+
+        :param collection: The collection to page through.
+        :param key_field: The primary key of the collection.
+        :param limit: The page size.
+        :param cursor: An opaque cursor from a previous page, or None for the first page.
+        :param columns: Only select these columns, and key_field.
+        :return: A tuple (rows, next_cursor, prev_cursor). A cursor is None if there is no such page.
+        """
+        direction, key = decode_cursor(cursor) if cursor else (NEXT, None)
+
+        # One extra row tells us whether there is a page beyond this one.
+        if direction == NEXT:
+            rows = self.data_service.get_all_data(
+                self.database, collection, limit=limit + 1, key_field=key_field, after=key, fields=columns
+            )
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            has_next, has_prev = has_more, key is not None
+        else:
+            rows = self.data_service.get_all_data(
+                self.database, collection, limit=limit + 1, key_field=key_field, before=key, descending=True,
+                fields=columns
+            )
+            has_more = len(rows) > limit
+            rows = rows[:limit][::-1]
+            has_next, has_prev = direction == PREV, has_more
+
+        next_cursor = encode_cursor(NEXT, rows[-1][key_field]) if rows and has_next else None
+        prev_cursor = encode_cursor(PREV, rows[0][key_field]) if rows and has_prev else None
+        return rows, next_cursor, prev_cursor
+
+    # Retrieve a page of meal plans using keyset pagination
+    def get_meal_plans_page(self, limit: int = 10, cursor: Optional[str] = None,
+                               fields: Optional[Tuple[str, ...]] = None):
+        rows, next_cursor, prev_cursor = self._get_keyset_page(self.meal_plans, self.meal_plans_pk, limit, cursor,
+                                                               Mealplan.columns(fields) if fields else None)
+        return self._to_mealplans(rows, fields), next_cursor, prev_cursor
+
+    def get_weekly_meal_plans_page(self, limit: int = 10, cursor: Optional[str] = None,
+                                      fields: Optional[Tuple[str, ...]] = None):
+        rows, next_cursor, prev_cursor = self._get_keyset_page(self.weekly_meal_plans, self.weekly_pk, limit, cursor,
+                                                               WeeklyMealplan.columns(fields) if fields else None)
+        return self._to_weekly_mealplans(rows, fields), next_cursor, prev_cursor
+
+    def get_daily_meal_plans_page(self, limit: int = 10, cursor: Optional[str] = None,
+                                     fields: Optional[Tuple[str, ...]] = None):
+        rows, next_cursor, prev_cursor = self._get_keyset_page(self.daily_meal_plans, self.daily_pk, limit, cursor,
+                                                               DailyMealplan.columns(fields) if fields else None)
+        return self._to_daily_mealplans(rows, fields), next_cursor, prev_cursor
+
+    # Async variants for the routers. Each one runs the blocking method above on the
+    # async data service's bounded executor, so a request never blocks the event loop.
+    def _read_async(self, method, *args, **kwargs):
+        """
+        Run a read on the executor, sharing it with identical reads already in flight, so
+        concurrent requests for the same object take one executor slot and one query.
+        """
+        return self.single_flight.do_async(call_key(method.__name__, args, kwargs),
+                                           self.async_data_service.run, method, *args, **kwargs)
+
+    async def get_by_key_async(self, key: Any, collection: str, fields: Optional[Tuple[str, ...]] = None):
+        return await self._read_async(self.get_by_key, key, collection, fields)
+
+    async def get_row_async(self, key: Any, collection: str, fields: Optional[Tuple[str, ...]] = None) -> Optional[dict]:
+        return await self._read_async(self.get_row, key, collection, fields)
+
+    async def get_by_keys_async(self, keys: List[Any], collection: str, fields: Optional[Tuple[str, ...]] = None):
+        return await self._read_async(self.get_by_keys, keys, collection, fields)
+
+    async def expand_async(self, items: List[Any], collection: str, expand: Tuple[str, ...]) -> List[dict]:
+        """
+        expand(), plus recipes: every meal plan, including those embedded by meals, gets the
+        summaries of its recipes from the recipe service. For daily and weekly plans, recipes
+        implies meals.
+
+        :raises HTTPException: 503 if recipes is requested and no recipe service is configured.
+        """
+        if "recipes" in expand:
+            if not self.recipe_client.enabled:
+                raise HTTPException(status_code=503, detail="Recipe details are unavailable: no recipe service is configured.")
+            if collection != self.meal_plans:
+                expand = expand + ("meals",)
+        # Not coalesced: the items are the caller's own.
+        items = await self.async_data_service.run(self.expand, items, collection, expand)
+        if "recipes" in expand:
+            if collection == self.meal_plans:
+                meal_plans = items
+            elif collection == self.daily_meal_plans:
+                meal_plans = [item.get("mealplan") for item in items]
+            else:
+                meal_plans = [day.get("mealplan") for item in items for day in item["daily_mealplans"]]
+            await self._embed_recipes([meal_plan for meal_plan in meal_plans if meal_plan])
+        return items
+
+    async def get_total_count_async(self, collection: Optional[str] = None, approximate: Optional[bool] = None) -> int:
+        return await self._read_async(self.get_total_count, collection, approximate)
+
+    async def create_meal_plan_async(self, mealplan: Mealplan) -> Mealplan:
+        return await self.async_data_service.run(self.create_meal_plan, mealplan)
+
+    async def create_weekly_meal_plan_async(self, weekly_mealplan: WeeklyMealplan) -> WeeklyMealplan:
+        return await self.async_data_service.run(self.create_weekly_meal_plan, weekly_mealplan)
+
+    async def create_daily_meal_plan_async(self, daily_mealplan: DailyMealplan) -> DailyMealplan:
+        return await self.async_data_service.run(self.create_daily_meal_plan, daily_mealplan)
+
+    async def create_meal_plans_async(self, mealplans: List[Mealplan], report_errors: bool = False):
+        return await self.async_data_service.run(self.create_meal_plans, mealplans, report_errors)
+
+    async def create_weekly_meal_plans_async(self, weekly_mealplans: List[WeeklyMealplan], report_errors: bool = False):
+        return await self.async_data_service.run(self.create_weekly_meal_plans, weekly_mealplans, report_errors)
+
+    async def create_daily_meal_plans_async(self, daily_mealplans: List[DailyMealplan], report_errors: bool = False):
+        return await self.async_data_service.run(self.create_daily_meal_plans, daily_mealplans, report_errors)
+
+    async def get_daily_meal_plans_by_week_async(self, week_plan_id: Any,
+                                                 fields: Optional[Tuple[str, ...]] = None) -> List[DailyMealplan]:
+        return await self._read_async(self.get_daily_meal_plans_by_week, week_plan_id, fields)
+
+    # With a recipe service, the recipe names come from it rather than from a join to its database.
+    async def get_daily_meal_plans_by_date_async(self, date: str):
+        if not self.recipe_client.enabled:
+            return await self._read_async(self.get_daily_meal_plans_by_date, date)
+        return await self._with_recipe_names(await self._read_async(self.get_daily_meal_plans_by_date, date, False))
+
+    async def get_daily_meal_plans_by_date_range_async(self, start_date: str, end_date: str):
+        if not self.recipe_client.enabled:
+            return await self._read_async(self.get_daily_meal_plans_by_date_range, start_date, end_date)
+        return await self._with_recipe_names(
+            await self._read_async(self.get_daily_meal_plans_by_date_range, start_date, end_date, False)
+        )
+
+    async def update_meal_plan_async(self, meal_id: Any, data: dict) -> Mealplan:
+        return await self.async_data_service.run(self.update_meal_plan, meal_id, data)
+
+    async def update_daily_meal_plan_async(self, day_plan_id: int, data: dict) -> DailyMealplan:
+        return await self.async_data_service.run(self.update_daily_meal_plan, day_plan_id, data)
+
+    async def update_weekly_meal_plan_async(self, week_plan_id: int, data: dict) -> WeeklyMealplan:
+        return await self.async_data_service.run(self.update_weekly_meal_plan, week_plan_id, data)
+
+    async def run_batch_async(self, operations: List[Tuple[str, str, Any, Any]], atomic: bool = True):
+        return await self.async_data_service.run(self.run_batch, operations, atomic)
+
+    async def delete_meal_plan_async(self, meal_id: int) -> None:
+        return await self.async_data_service.run(self.delete_meal_plan, meal_id)
+
+    async def delete_daily_meal_plan_async(self, day_plan_id: int) -> None:
+        return await self.async_data_service.run(self.delete_daily_meal_plan, day_plan_id)
+
+    async def delete_weekly_meal_plan_async(self, week_plan_id: int) -> None:
+        return await self.async_data_service.run(self.delete_weekly_meal_plan, week_plan_id)
+
+    async def get_all_meal_plans_async(self, skip: int = 0, limit: int = 10,
+                                    fields: Optional[Tuple[str, ...]] = None) -> List[Mealplan]:
+        return await self._read_async(self.get_all_meal_plans, skip=skip, limit=limit, fields=fields)
+
+    async def get_all_weekly_meal_plans_async(self, skip: int = 0, limit: int = 10,
+                                           fields: Optional[Tuple[str, ...]] = None) -> List[WeeklyMealplan]:
+        return await self._read_async(self.get_all_weekly_meal_plans, skip=skip, limit=limit, fields=fields)
+
+    async def get_all_daily_meal_plans_async(self, skip: int = 0, limit: int = 10,
+                                          fields: Optional[Tuple[str, ...]] = None) -> List[DailyMealplan]:
+        return await self._read_async(self.get_all_daily_meal_plans, skip=skip, limit=limit, fields=fields)
+
+    async def get_meal_plans_page_async(self, limit: int = 10, cursor: Optional[str] = None,
+                                     fields: Optional[Tuple[str, ...]] = None):
+        return await self._read_async(self.get_meal_plans_page, limit=limit, cursor=cursor, fields=fields)
+
+    async def get_weekly_meal_plans_page_async(self, limit: int = 10, cursor: Optional[str] = None,
+                                            fields: Optional[Tuple[str, ...]] = None):
+        return await self._read_async(self.get_weekly_meal_plans_page, limit=limit, cursor=cursor, fields=fields)
 
+    async def get_daily_meal_plans_page_async(self, limit: int = 10, cursor: Optional[str] = None,
+                                           fields: Optional[Tuple[str, ...]] = None):
+        return await self._read_async(self.get_daily_meal_plans_page, limit=limit, cursor=cursor, fields=fields)
@@ -1,18 +1,139 @@
 # mealplan_router.py
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request
-from fastapi.responses import JSONResponse
-from typing import List, Dict
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Any, List, Dict, Optional, Tuple, Union
 
-from app.models.mealplan_model import Mealplan, DailyMealplan, WeeklyMealplan, PaginatedResponse
-from app.resources.mealplan_resource import MealplanResource
+from app.models.mealplan_model import Mealplan, DailyMealplan, WeeklyMealplan, PaginatedResponse, BatchResponse, \
+    BulkCreateResponse, BatchOperation, BatchRequest, BatchOperationResult, BatchOperationsResponse
+from app.resources.mealplan_resource import MealplanResource, BatchAbortedError
 from app.services.service_factory import ServiceFactory
+from framework.services.jobs.job_engine import JobQueueFullError
+from framework.services.jobs.job_store import QUEUED, RUNNING, COMPLETED, FAILED
+from framework.utils.cursor import encode_cursor, LAST
+from framework.utils.etag import compute_etag, etag_matches
+from framework.utils.json_response import FastJSONResponse
 import asyncio
-import time
-import httpx
-import requests
+import datetime
+import json
+import os
+import logging
+from pydantic import ValidationError
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# The maximum number of ids accepted by the batch GET endpoints.
+MAX_BATCH_IDS = 500
+# The maximum number of rows accepted by the bulk create endpoints.
+MAX_BULK_ROWS = 1000
+
+# The response model of each collection, for validating sparse fieldsets.
+COLLECTION_MODELS = {
+    "meal_plans": Mealplan,
+    "weekly_meal_plans": WeeklyMealplan,
+    "daily_meal_plans": DailyMealplan,
+}
+
+FIELDS_DESCRIPTION = "Comma-separated fields to include in each item, e.g. meal_id,lunch_recipe"
+
+# Keyset pagination is opt-in: existing clients page with skip/limit.
+CURSOR_DESCRIPTION = ("Opaque cursor from the links of a previous page. Send an empty cursor "
+                      "to start keyset pagination on the first page")
+
+# The related objects each collection can embed with ?expand=. recipes come from the recipe service.
+EXPANSIONS = {
+    "meal_plans": ("recipes",),
+    "weekly_meal_plans": ("daily", "meals", "recipes"),
+    "daily_meal_plans": ("meals", "recipes"),
+}
+
+def _parse_fields(fields: Optional[str], collection: str) -> Optional[Tuple[str, ...]]:
+    """
+    Parse the fields query parameter into the fieldset of a collection's model, or None for all fields.
+    """
+    if fields is None:
+        return None
+    try:
+        return COLLECTION_MODELS[collection].parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _parse_expand(expand: Optional[str], collection: str) -> Optional[Tuple[str, ...]]:
+    """
+    Parse the expand query parameter, e.g. "daily,meals", or None for no expansion.
+    """
+    if expand is None:
+        return None
+    requested = tuple(dict.fromkeys(name.strip() for name in expand.split(",") if name.strip()))
+    valid = EXPANSIONS.get(collection, ())
+    unknown = [name for name in requested if name not in valid]
+    if not requested or unknown:
+        raise HTTPException(status_code=400, detail=f"expand must be a comma-separated list of: {', '.join(valid)}")
+    return requested
+
+async def _expand(items: List[Any], collection: str, expansions: Tuple[str, ...]) -> List[dict]:
+    """
+    Embed the related objects of response items (see MealplanResource.expand).
+    """
+    res = ServiceFactory.get_service("MealplanResource")
+    try:
+        return await res.expand_async(items, collection, expansions)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _not_modified(request: Request, etag: str) -> Optional[Response]:
+    """
+    A 304 response if the request's If-None-Match matches etag, else None.
+    """
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+async def _get_object(request: Request, key: int, collection: str, not_found: str,
+                      fields: Optional[str] = None, expand: Optional[str] = None) -> Response:
+    """
+    Serve a single-object GET with an ETag. The ETag is a hash of the row, which usually comes
+    from the object cache, so a conditional request that matches is answered without a query
+    or building the model. Otherwise the model is built from the trusted row and encoded
+    directly, without response_model validation. With fields, only those fields are selected
+    and returned, and the ETag covers only them. With expand, the related objects are embedded
+    and the ETag covers the whole body.
+    """
+    fieldset, expansions = _parse_fields(fields, collection), _parse_expand(expand, collection)
+    res = ServiceFactory.get_service("MealplanResource")
+    row = await res.get_row_async(key, collection, fieldset)
+    if not row:
+        raise HTTPException(status_code=404, detail=not_found)
+    if expansions:
+        items = await _expand([res.to_model(row, collection, fieldset)], collection, expansions)
+        return _etag_json(request, items[0])
+
+    etag = compute_etag(row)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+    return FastJSONResponse(res.to_model(row, collection, fieldset), headers={"ETag": etag})
+
+def _etag_json(request: Request, content: Any) -> Response:
+    """
+    Serialize a list response and tag it with a hash of the body, so the ETag covers every item
+    and link of the page. A matching If-None-Match gets a 304 without the body.
+    """
+    response = FastJSONResponse(content)
+    etag = compute_etag(response.body)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+    response.headers["ETag"] = etag
+    return response
+
+def _check_bulk_size(rows: list) -> None:
+    if not rows:
+        raise HTTPException(status_code=400, detail="The request body must contain at least one item")
+    if len(rows) > MAX_BULK_ROWS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_ROWS} items can be created at once")
+
 @router.post("/mealplans", tags=["mealplans"], status_code=201, response_model=Mealplan)
 async def create_mealplan(mealplan: Mealplan) -> Mealplan:
     """
@@ -21,30 +142,39 @@ async def create_mealplan(mealplan: Mealplan) -> Mealplan:
     res = ServiceFactory.get_service("MealplanResource")
     try:
         # Log the input for debugging
-        print("Creating new meal plan:", mealplan)
+        logger.debug("Creating new meal plan: %s", mealplan)
         
         # Pass the meal plan data to the service for creation
-        new_mealplan = res.create_meal_plan(mealplan)
+        new_mealplan = await res.create_meal_plan_async(mealplan)
         return new_mealplan
     except HTTPException as e:
         raise e
     except Exception as e:
-        print(f"Error in create_mealplan endpoint: {e}")
+        logger.error("Error in create_mealplan endpoint: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to create meal plan: {e}")
 
-@router.get("/mealplans/{meal_id}", tags=["mealplans"], response_model=Mealplan)
-async def get_mealplan_by_id(meal_id: int) -> Mealplan:
+@router.post("/mealplans/bulk", tags=["mealplans"], status_code=201, response_model=BulkCreateResponse)
+async def create_mealplans_bulk(mealplans: List[Mealplan], report_errors: bool = False) -> BulkCreateResponse:
     """
-    Retrieve a meal plan by its ID.
+    Create many meal plans in one request and one transaction.
+    With report_errors, rows that fail are listed in errors and the others are still created.
     """
+    _check_bulk_size(mealplans)
     res = ServiceFactory.get_service("MealplanResource")
-    result = res.get_by_key(meal_id, "meal_plans")
-    print(result)
+    items, errors = await res.create_meal_plans_async(mealplans, report_errors)
+    return BulkCreateResponse(items=items, errors=errors)
 
-    if not result:
-        raise HTTPException(status_code=404, detail="Meal plan not found")
-
-    return result
+@router.get("/mealplans/{meal_id}", tags=["mealplans"], response_model=Mealplan)
+async def get_mealplan_by_id(
+    meal_id: int,
+    request: Request,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    expand: Optional[str] = Query(None, description="Embed related objects: recipes")
+) -> Mealplan:
+    """
+    Retrieve a meal plan by its ID.
+    """
+    return await _get_object(request, meal_id, "meal_plans", "Meal plan not found", fields, expand)
 
 # @router.get("/mealplans/{user_id}/{meal_id}", tags=["mealplans"], response_model=Mealplan)
 # async def get_mealplan_with_user_id(user_id: int, meal_id: int) -> Mealplan:
@@ -67,8 +197,8 @@ async def update_mealplan_by_id(meal_id: int, mealplan: Mealplan) -> Mealplan:
     Update a meal plan by its ID.
     """
     res = ServiceFactory.get_service("MealplanResource")
-    update_data = mealplan.dict(exclude_unset=True)
-    updated_mealplan = res.update_meal_plan(meal_id, update_data)
+    update_data = mealplan.model_dump(exclude_unset=True)
+    updated_mealplan = await res.update_meal_plan_async(meal_id, update_data)
 
     if not updated_mealplan:
         raise HTTPException(status_code=404, detail="Meal plan not found")
@@ -76,39 +206,91 @@ async def update_mealplan_by_id(meal_id: int, mealplan: Mealplan) -> Mealplan:
     return updated_mealplan
 
 
-tasks_status: Dict[str, dict] = {}
+# Simulated duration of the meal plan fetch run by /mealplans/start-task, in seconds.
+TASK_DELAY_SECONDS = float(os.environ.get("MEALPLAN_TASK_DELAY", 30))
 
-async def get_mealplan_async(background_tasks: BackgroundTasks, task_id: str, meal_id: int):
-    async def fetch_mealplan(meal_id: int):
-        await asyncio.sleep(30)  # Simulating a delay
-        return {"meal_id": meal_id, "status": "fetched"}
-    mealplan = await fetch_mealplan(meal_id)
-    tasks_status[task_id] = {"status": "completed", "mealplan": mealplan}
-
-async def start_task(background_tasks: BackgroundTasks, task_id: str, meal_id: int):
-    tasks_status[task_id] = {"status": "in-progress"}
-    background_tasks.add_task(get_mealplan_async, background_tasks, task_id, meal_id)
+async def fetch_mealplan(meal_id: int) -> dict:
+    await asyncio.sleep(TASK_DELAY_SECONDS)  # Simulating a delay
+    return {"meal_id": meal_id, "status": "fetched"}
 
 @router.post("/mealplans/start-task")
-async def start_mealplans_task(background_tasks: BackgroundTasks, meal_id: int):
-    task_id = str(time.time())
-    await start_task(background_tasks, task_id, meal_id)
-    # return {"message": "Meal plan fetching initiated", "task_id": task_id, "status": 202}
+async def start_mealplans_task(meal_id: int):
+    """
+    Start fetching a meal plan in the background. Poll /mealplans/poll/{task_id} for the result.
+    Returns 429 when too many tasks are already waiting.
+    """
+    engine = ServiceFactory.get_service("MealplanJobEngine")
+    try:
+        task_id = await engine.submit(fetch_mealplan, meal_id)
+    except JobQueueFullError:
+        raise HTTPException(status_code=429, detail="Too many tasks in progress, try again later",
+                            headers={"Retry-After": str(max(int(TASK_DELAY_SECONDS), 1))})
     return JSONResponse(
         status_code=202,  # Set the status code to 202
         content={"message": "Meal plan fetching initiated", "task_id": task_id, "status": 202}
     )
 
+# The longest a poll may wait for a task to finish, and the interval between SSE keep-alives,
+# in seconds.
+MAX_POLL_WAIT = 60
+SSE_KEEPALIVE_SECONDS = 15
+
+def _task_response(task_id: str, task: dict) -> dict:
+    if task["status"] == QUEUED:
+        return {"task_id": task_id, "status": QUEUED, "message": "Task is waiting to run."}
+    if task["status"] == RUNNING:
+        return {"task_id": task_id, "status": RUNNING, "message": "Task is still running."}
+    if task["status"] == COMPLETED:
+        return {"task_id": task_id, "status": COMPLETED, "mealplan": task["result"]}
+    if task["status"] == FAILED:
+        return {"task_id": task_id, "status": FAILED, "error": task["error"]}
+    raise HTTPException(status_code=500, detail="Unknown task status")
+
 @router.get("/mealplans/poll/{task_id}")
-async def poll_task_status(task_id: str):
-    task = tasks_status.get(task_id)
+async def poll_task_status(
+    task_id: str,
+    wait: float = Query(0, ge=0, le=MAX_POLL_WAIT,
+                        description="Seconds to wait for the task to finish before answering")
+):
+    """
+    Return the status of a task. With wait, answer as soon as the task finishes, or with its
+    current status after wait seconds.
+    """
+    engine = ServiceFactory.get_service("MealplanJobEngine")
+    task = await engine.wait(task_id, wait) if wait else await engine.get(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return _task_response(task_id, task)
+
+@router.get("/mealplans/poll/{task_id}/stream")
+async def stream_task_status(task_id: str):
+    """
+    Server-Sent Events stream of a task: one "status" event with the poll response each time
+    the status changes, ending after the task finishes.
+    """
+    engine = ServiceFactory.get_service("MealplanJobEngine")
+    task = await engine.get(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    if task["status"] == "in-progress":
-        return {"task_id": task_id, "status": "in-progress", "message": "Task is still running."}
-    if task["status"] == "completed":
-        return {"task_id": task_id, "status": "completed", "mealplan": task["mealplan"]}
-    raise HTTPException(status_code=500, detail="Unknown task status")
+
+    async def events():
+        current = task
+        status = None
+        while True:
+            if current is None:
+                yield "event: error\ndata: {\"detail\": \"Task not found\"}\n\n"
+                return
+            if current["status"] != status:
+                status = current["status"]
+                yield f"event: status\ndata: {json.dumps(_task_response(task_id, current))}\n\n"
+                if status in (COMPLETED, FAILED):
+                    return
+            else:
+                yield ": keep-alive\n\n"
+            current = await engine.wait(task_id, SSE_KEEPALIVE_SECONDS, status=status)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @router.put("/mealplans/{meal_id}", tags=["mealplans"], response_model=Mealplan)
 async def update_mealplan_by_id(meal_id: int, mealplan: Mealplan) -> Mealplan:
@@ -116,63 +298,14 @@ async def update_mealplan_by_id(meal_id: int, mealplan: Mealplan) -> Mealplan:
     Update a meal plan by its ID.
     """
     res = ServiceFactory.get_service("MealplanResource")
-    update_data = mealplan.dict(exclude_unset=True)
-    updated_mealplan = res.update_meal_plan(meal_id, update_data)
+    update_data = mealplan.model_dump(exclude_unset=True)
+    updated_mealplan = await res.update_meal_plan_async(meal_id, update_data)
 
     if not updated_mealplan:
         raise HTTPException(status_code=404, detail="Meal plan not found")
 
     return updated_mealplan
 
-# @router.get("/mealplans/async/{meal_id}", tags=["mealplans"])
-async def get_mealplans_async():
-    res = ServiceFactory.get_service("MealplanResource")
-
-    async def fetch_mealplan(meal_id):
-        try:
-            return await res.get_by_key_async(meal_id, "meal_plans")
-        except Exception as e:
-            return {"meal_id": meal_id, "error": str(e)}
-
-    meal_ids = [1, 2, 3, 7, 8]
-    mealplans = await asyncio.gather(*(fetch_mealplan(meal_id) for meal_id in meal_ids))
-    return {"mealplans": mealplans}
-
-# @router.get("/mealplans/sync/{meal_id}", tags=["mealplans"])
-def get_mealplans_sync():
-    res = ServiceFactory.get_service("MealplanResource")
-    def fetch_mealplan(meal_id):
-        try:
-            return res.get_by_key(meal_id, "meal_plans")
-        except Exception as e:
-            return {"meal_id": meal_id, "error": str(e)}
-
-    meal_ids = [1, 2, 3, 7,8]
-    mealplans = [fetch_mealplan(meal_id) for meal_id in meal_ids]
-    return {"mealplans": mealplans}
-
-@router.get("/mealplans/test/{meal_id}", tags=["mealplans"])
-async def test_mealplans_performance(meal_id: int):
-    def call_async_mealplans():
-        start_time = time.time()
-        response = get_mealplans_async()
-        async_duration = time.time() - start_time
-        return response, async_duration
-
-    def call_sync_mealplans():
-        start_time = time.time()
-        response = get_mealplans_sync()
-        sync_duration = time.time() - start_time
-        return response, sync_duration
-
-    async_response, async_time = call_async_mealplans()
-    sync_response, sync_time = call_sync_mealplans()
-
-    return {
-        "async_time_taken": async_time,
-        "sync_time_taken": sync_time,
-    }
-
 # END OF MEALPLANS
 
 @router.put("/weekly-mealplans/{week_plan_id}", tags=["weekly-mealplans"], response_model=WeeklyMealplan)
@@ -181,8 +314,8 @@ async def update_weekly_mealplan_by_id(week_plan_id: int, weekly_mealplan: Weekl
     Update a meal plan by its ID.
     """
     res = ServiceFactory.get_service("MealplanResource")
-    update_data = weekly_mealplan.dict(exclude_unset=True)
-    updated_mealplan = res.update_weekly_meal_plan(week_plan_id, update_data)
+    update_data = weekly_mealplan.model_dump(exclude_unset=True)
+    updated_mealplan = await res.update_weekly_meal_plan_async(week_plan_id, update_data)
 
     if not updated_mealplan:
         raise HTTPException(status_code=404, detail="Meal plan not found")
@@ -195,8 +328,8 @@ async def update_daily_mealplan_by_id(day_plan_id: int, daily_mealplan: DailyMea
     Update a meal plan by its ID.
     """
     res = ServiceFactory.get_service("MealplanResource")
-    update_data = daily_mealplan.dict(exclude_unset=True)
-    updated_daily_mealplan = res.update_daily_meal_plan(day_plan_id, update_data)
+    update_data = daily_mealplan.model_dump(exclude_unset=True)
+    updated_daily_mealplan = await res.update_daily_meal_plan_async(day_plan_id, update_data)
 
     if not updated_daily_mealplan:
         raise HTTPException(status_code=404, detail="Meal plan not found")
@@ -211,7 +344,7 @@ async def delete_mealplan_by_id(meal_id: int):
     Delete a meal plan by its ID.
     """
     res = ServiceFactory.get_service("MealplanResource")
-    res.delete_meal_plan(meal_id)
+    await res.delete_meal_plan_async(meal_id)
     return {"message": f"Meal plan with ID {meal_id} has been deleted"}
 
 @router.delete("/daily-mealplans/{day_plan_id}", tags=["daily-mealplans"])
@@ -220,7 +353,7 @@ async def delete_daily_mealplan_by_id(day_plan_id: int):
     Delete a daily meal plan by its ID.
     """
     res = ServiceFactory.get_service("MealplanResource")
-    res.delete_daily_meal_plan(day_plan_id)
+    await res.delete_daily_meal_plan_async(day_plan_id)
     return {"message": f"Meal plan with ID {day_plan_id} has been deleted"}
 
 @router.delete("/weekly-mealplans/{weekly_meal_id}", tags=["weekly-mealplans"])
@@ -229,7 +362,7 @@ async def delete_weekly_mealplan_by_id(weekly_meal_id: int):
     Delete a weekly meal plan by its ID.
     """
     res = ServiceFactory.get_service("MealplanResource")
-    res.delete_weekly_meal_plan(weekly_meal_id)
+    await res.delete_weekly_meal_plan_async(weekly_meal_id)
     return {"message": f"Meal plan with ID {weekly_meal_id} has been deleted"}
 
 @router.post("/weekly-mealplans", tags=["weekly-mealplans"], status_code=201, response_model=WeeklyMealplan)
@@ -239,23 +372,50 @@ async def create_weekly_mealplan(weekly_mealplan: WeeklyMealplan) -> WeeklyMealp
     """
     res = ServiceFactory.get_service("MealplanResource")
     try:
-        new_weekly_plan = res.create_weekly_meal_plan(weekly_mealplan)
+        new_weekly_plan = await res.create_weekly_meal_plan_async(weekly_mealplan)
         return new_weekly_plan
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create weekly meal plan: {e}")
 
-@router.get("/weekly-mealplans/{week_plan_id}", tags=["weekly-mealplans"], response_model=WeeklyMealplan)
-async def get_weekly_mealplan_by_id(week_plan_id: int) -> WeeklyMealplan:
+# Registered before /weekly-mealplans/{week_plan_id}, which would otherwise match "all".
+@router.get("/weekly-mealplans/all", tags=["weekly-mealplans"], response_model=PaginatedResponse)
+async def get_all_weekly_mealplans(
+    request: Request,
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(10, ge=1, le=100, description="Number of records to retrieve"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    expand: Optional[str] = Query(None, description="Embed related objects: daily, meals, recipes")
+) -> PaginatedResponse:
     """
-    Retrieve a weekly meal plan by its ID.
+    Retrieve all meal plans with pagination.
     """
     res = ServiceFactory.get_service("MealplanResource")
-    result = res.get_by_key(week_plan_id, "weekly_meal_plans")
+    return await _get_page(request, "weekly_meal_plans", skip, limit, cursor, fields, expand,
+                           res.get_weekly_meal_plans_page_async, res.get_all_weekly_meal_plans_async)
 
-    if not result:
-        raise HTTPException(status_code=404, detail="Weekly meal plan not found")
+@router.post("/weekly-mealplans/bulk", tags=["weekly-mealplans"], status_code=201, response_model=BulkCreateResponse)
+async def create_weekly_mealplans_bulk(weekly_mealplans: List[WeeklyMealplan], report_errors: bool = False) -> BulkCreateResponse:
+    """
+    Create many weekly meal plans in one request and one transaction.
+    With report_errors, rows that fail are listed in errors and the others are still created.
+    """
+    _check_bulk_size(weekly_mealplans)
+    res = ServiceFactory.get_service("MealplanResource")
+    items, errors = await res.create_weekly_meal_plans_async(weekly_mealplans, report_errors)
+    return BulkCreateResponse(items=items, errors=errors)
 
-    return result
+@router.get("/weekly-mealplans/{week_plan_id}", tags=["weekly-mealplans"], response_model=WeeklyMealplan)
+async def get_weekly_mealplan_by_id(
+    week_plan_id: int,
+    request: Request,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    expand: Optional[str] = Query(None, description="Embed related objects: daily, meals, recipes")
+) -> WeeklyMealplan:
+    """
+    Retrieve a weekly meal plan by its ID.
+    """
+    return await _get_object(request, week_plan_id, "weekly_meal_plans", "Weekly meal plan not found", fields, expand)
 
 @router.post("/daily-mealplans", tags=["daily-mealplans"], status_code=201, response_model=DailyMealplan)
 async def create_daily_mealplan(daily_mealplan: DailyMealplan) -> DailyMealplan:
@@ -264,125 +424,344 @@ async def create_daily_mealplan(daily_mealplan: DailyMealplan) -> DailyMealplan:
     """
     res = ServiceFactory.get_service("MealplanResource")
     try:
-        new_daily_plan = res.create_daily_meal_plan(daily_mealplan)
+        new_daily_plan = await res.create_daily_meal_plan_async(daily_mealplan)
         return new_daily_plan
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create daily meal plan: {e}")
 
-@router.get("/daily-mealplans/{day_plan_id}", tags=["daily-mealplans"], response_model=DailyMealplan)
-async def get_daily_mealplan_by_id(day_plan_id: int) -> DailyMealplan:
+@router.post("/daily-mealplans/bulk", tags=["daily-mealplans"], status_code=201, response_model=BulkCreateResponse)
+async def create_daily_mealplans_bulk(daily_mealplans: List[DailyMealplan], report_errors: bool = False) -> BulkCreateResponse:
     """
-    Retrieve a daily meal plan by its ID.
+    Create many daily meal plans in one request, e.g. a month for a user. Weekly plans are
+    created for dates that do not have one yet.
+    With report_errors, rows that fail are listed in errors and the others are still created.
     """
+    _check_bulk_size(daily_mealplans)
     res = ServiceFactory.get_service("MealplanResource")
-    result = res.get_by_key(day_plan_id, "daily_meal_plans")
+    try:
+        items, errors = await res.create_daily_meal_plans_async(daily_mealplans, report_errors)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid daily meal plan: {e}")
+    return BulkCreateResponse(items=items, errors=errors)
+
+# The longest date range accepted by /daily-mealplans/range, in days.
+MAX_RANGE_DAYS = 366
+
+# Registered before /daily-mealplans/{day_plan_id}, which would otherwise match "range".
+@router.get("/daily-mealplans/range", tags=["daily-mealplans"])
+async def get_daily_meal_plans_by_date_range(
+    request: Request,
+    from_date: str = Query(..., alias="from", description="First date, YYYY-MM-DD"),
+    to_date: str = Query(..., alias="to", description="Last date (inclusive), YYYY-MM-DD")
+):
+    """
+    Retrieve the daily meal plans, with their weekly plans and recipes, for every date in a range.
+    The response has the same shape as GET /weekly-mealplans?date=, ordered by date.
+    """
+    try:
+        start, end = datetime.date.fromisoformat(from_date), datetime.date.fromisoformat(to_date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="from and to must be dates in YYYY-MM-DD format")
+    if start > end:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"The range must not exceed {MAX_RANGE_DAYS} days")
 
-    if not result:
-        raise HTTPException(status_code=404, detail="Daily meal plan not found")
+    res = ServiceFactory.get_service("MealplanResource")
+    return _etag_json(request, await res.get_daily_meal_plans_by_date_range_async(start.isoformat(), end.isoformat()))
 
-    return result
+@router.get("/daily-mealplans/{day_plan_id}", tags=["daily-mealplans"], response_model=DailyMealplan)
+async def get_daily_mealplan_by_id(
+    day_plan_id: int,
+    request: Request,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    expand: Optional[str] = Query(None, description="Embed related objects: meals, recipes")
+) -> DailyMealplan:
+    """
+    Retrieve a daily meal plan by its ID.
+    """
+    return await _get_object(request, day_plan_id, "daily_meal_plans", "Daily meal plan not found", fields, expand)
 
 @router.get("/weekly-mealplans/{week_plan_id}/daily-mealplans", tags=["weekly-mealplans"], response_model=List[DailyMealplan])
-async def get_daily_mealplans_by_week(week_plan_id: int) -> List[DailyMealplan]:
+async def get_daily_mealplans_by_week(
+    week_plan_id: int,
+    request: Request,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    expand: Optional[str] = Query(None, description="Embed related objects: meals, recipes")
+) -> List[DailyMealplan]:
     """
     Retrieve all daily meal plans within a weekly plan by the weekly plan ID.
     """
+    fieldset, expansions = _parse_fields(fields, "daily_meal_plans"), _parse_expand(expand, "daily_meal_plans")
     res = ServiceFactory.get_service("MealplanResource")
-    daily_mealplans = res.get_daily_meal_plans_by_week(week_plan_id)
+    daily_mealplans = await res.get_daily_meal_plans_by_week_async(week_plan_id, fieldset)
 
     if not daily_mealplans:
         raise HTTPException(status_code=404, detail="No daily meal plans found for this weekly plan")
 
-    return daily_mealplans
+    if expansions:
+        daily_mealplans = await _expand(daily_mealplans, "daily_meal_plans", expansions)
+    return _etag_json(request, daily_mealplans)
 
 @router.get("/weekly-mealplans", tags=["weekly-mealplans"])
-async def get_daily_meal_plans_by_date(date: str):
+async def get_daily_meal_plans_by_date(
+    request: Request,
+    date: Optional[str] = None,
+    ids: Optional[str] = Query(None, description="Comma-separated weekly plan IDs to fetch in one call"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION + " (with ids only)"),
+    expand: Optional[str] = Query(None, description="Embed related objects: daily, meals, recipes (with ids only)")
+):
     """
     Retrieve all daily meal plans within a weekly plan by the weekly plan ID.
+    With ids, retrieve those weekly meal plans instead.
     """
+    if ids is not None:
+        return await _get_batch(request, ids, "weekly_meal_plans", fields, expand)
+    if date is None:
+        raise HTTPException(status_code=400, detail="Either date or ids is required")
+    if fields is not None or expand is not None:
+        raise HTTPException(status_code=400, detail="fields and expand are only supported with ids")
+
     res = ServiceFactory.get_service("MealplanResource")
-    daily_mealplans = res.get_daily_meal_plans_by_date(date)
+    daily_mealplans = await res.get_daily_meal_plans_by_date_async(date)
     # print("DAILY: ", daily_mealplans)
 
     if not daily_mealplans:
         raise HTTPException(status_code=404, detail="No daily meal plans found for this weekly plan")
-    print(daily_mealplans)
-    return daily_mealplans
+    return _etag_json(request, daily_mealplans)
 
-@router.get("/mealplans", tags=["mealplans"], response_model=PaginatedResponse)
-async def get_all_mealplans(
-    request: Request,
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(10, ge=1, le=100, description="Number of records to retrieve")
-) -> PaginatedResponse:
+def _parse_ids(ids: str) -> List[int]:
     """
-    Retrieve all meal plans with pagination.
+    Parse the ids query parameter of the batch GET endpoints, e.g. "1,2,3".
     """
+    try:
+        keys = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    if not keys:
+        raise HTTPException(status_code=400, detail="ids must not be empty")
+    if len(keys) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids can be requested at once")
+    return keys
+
+async def _get_batch(request: Request, ids: str, collection: str, fields: Optional[str] = None,
+                     expand: Optional[str] = None) -> Response:
+    """
+    Serve a batch GET: one lookup for all ids, results in request order plus the missing ids.
+    """
+    keys, fieldset, expansions = _parse_ids(ids), _parse_fields(fields, collection), _parse_expand(expand, collection)
     res = ServiceFactory.get_service("MealplanResource")
-    mealplans = res.get_all_meal_plans(skip=skip, limit=limit)
-    total_count = res.get_total_count()
+    items, missing = await res.get_by_keys_async(keys, collection, fieldset)
+    if expansions:
+        items = await _expand(items, collection, expansions)
+    return _etag_json(request, BatchResponse(items=items, missing=missing))
 
-    base_url = str(request.url).split('?')[0]
+def _link_params(fields: Optional[Tuple[str, ...]], expand: Optional[Tuple[str, ...]]) -> str:
+    """
+    The fields and expand query parameters to carry over to pagination links, or "".
+    """
+    params = ""
+    if fields:
+        params += f"&fields={','.join(fields)}"
+    if expand:
+        params += f"&expand={','.join(expand)}"
+    return params
+
+def _offset_links(base_url: str, skip: int, limit: int, total_count: int,
+                  fields: Optional[Tuple[str, ...]] = None, expand: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
+    """
+    Build first/last/next/previous links for offset (skip/limit) pagination.
+    """
+    extra = _link_params(fields, expand)
     links = {
-        "first": {"href": f"{base_url}?skip=0&limit={limit}"},
-        "last": {"href": f"{base_url}?skip={(total_count // limit) * limit}&limit={limit}"}
+        "first": {"href": f"{base_url}?skip=0&limit={limit}{extra}"},
+        "last": {"href": f"{base_url}?skip={(max(total_count - 1, 0) // limit) * limit}&limit={limit}{extra}"}
     }
 
     if skip + limit < total_count:
-        links["next"] = {"href": f"{base_url}?skip={skip + limit}&limit={limit}"}
+        links["next"] = {"href": f"{base_url}?skip={skip + limit}&limit={limit}{extra}"}
     if skip > 0:
-        links["previous"] = {"href": f"{base_url}?skip={max(skip - limit, 0)}&limit={limit}"}
+        links["previous"] = {"href": f"{base_url}?skip={max(skip - limit, 0)}&limit={limit}{extra}"}
+    return links
 
-    return PaginatedResponse(items=mealplans, links=links)
+def _cursor_links(base_url: str, limit: int, next_cursor: Optional[str], prev_cursor: Optional[str],
+                  fields: Optional[Tuple[str, ...]] = None, expand: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
+    """
+    Build first/last/next/previous links for keyset (cursor) pagination. The next and previous
+    links also carry the raw cursor token.
+    """
+    extra = _link_params(fields, expand)
+    links = {
+        "first": {"href": f"{base_url}?cursor=&limit={limit}{extra}"},
+        "last": {"href": f"{base_url}?cursor={encode_cursor(LAST)}&limit={limit}{extra}"}
+    }
 
-@router.get("/weekly-mealplans/all", tags=["weekly-mealplans"], response_model=PaginatedResponse)
-async def get_all_weekly_mealplans(
-    request: Request,
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(10, ge=1, le=100, description="Number of records to retrieve")
-) -> PaginatedResponse:
+    if next_cursor:
+        links["next"] = {"href": f"{base_url}?cursor={next_cursor}&limit={limit}{extra}", "cursor": next_cursor}
+    if prev_cursor:
+        links["previous"] = {"href": f"{base_url}?cursor={prev_cursor}&limit={limit}{extra}", "cursor": prev_cursor}
+    return links
+
+async def _get_page(request: Request, collection: str, skip: int, limit: int, cursor: Optional[str],
+                    fields: Optional[str], expand: Optional[str], get_page_async, get_all_async) -> Response:
     """
-    Retrieve all meal plans with pagination.
+    Serve a list endpoint. Requests with a cursor use keyset pagination, so following the links
+    costs the same on every page; an empty cursor asks for the first page. Other requests use
+    offset pagination, with a total count, as before. With fields, only those columns are selected; with
+    expand, related objects are embedded with one query per level. The links keep both.
     """
+    fieldset, expansions = _parse_fields(fields, collection), _parse_expand(expand, collection)
     res = ServiceFactory.get_service("MealplanResource")
-    weekly_mealplans = res.get_all_weekly_meal_plans(skip=skip, limit=limit)
-    total_count = res.get_total_count()
-
     base_url = str(request.url).split('?')[0]
-    links = {
-        "first": {"href": f"{base_url}?skip=0&limit={limit}"},
-        "last": {"href": f"{base_url}?skip={(total_count // limit) * limit}&limit={limit}"}
-    }
 
-    if skip + limit < total_count:
-        links["next"] = {"href": f"{base_url}?skip={skip + limit}&limit={limit}"}
-    if skip > 0:
-        links["previous"] = {"href": f"{base_url}?skip={max(skip - limit, 0)}&limit={limit}"}
+    if cursor is not None:
+        try:
+            items, next_cursor, prev_cursor = await get_page_async(limit=limit, cursor=cursor or None, fields=fieldset)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if expansions:
+            items = await _expand(items, collection, expansions)
+        links = _cursor_links(base_url, limit, next_cursor, prev_cursor, fieldset, expansions)
+        return _etag_json(request, PaginatedResponse(items=items, links=links))
+
+    items, total_count = await asyncio.gather(
+        get_all_async(skip=skip, limit=limit, fields=fieldset),
+        res.get_total_count_async(collection)
+    )
+    if expansions:
+        items = await _expand(items, collection, expansions)
+    links = _offset_links(base_url, skip, limit, total_count, fieldset, expansions)
+    return _etag_json(request, PaginatedResponse(items=items, links=links))
 
-    return PaginatedResponse(items=weekly_mealplans, links=links)
+@router.get("/mealplans", tags=["mealplans"], response_model=Union[PaginatedResponse, BatchResponse])
+async def get_all_mealplans(
+    request: Request,
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(10, ge=1, le=100, description="Number of records to retrieve"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    ids: Optional[str] = Query(None, description="Comma-separated meal plan IDs to fetch in one call"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    expand: Optional[str] = Query(None, description="Embed related objects: recipes")
+) -> Union[PaginatedResponse, BatchResponse]:
+    """
+    Retrieve all meal plans with pagination. With ids, retrieve those meal plans instead.
+    """
+    if ids is not None:
+        return await _get_batch(request, ids, "meal_plans", fields, expand)
+    res = ServiceFactory.get_service("MealplanResource")
+    return await _get_page(request, "meal_plans", skip, limit, cursor, fields, expand,
+                           res.get_meal_plans_page_async, res.get_all_meal_plans_async)
 
-@router.get("/daily-mealplans", tags=["daily-mealplans"], response_model=PaginatedResponse)
+@router.get("/daily-mealplans", tags=["daily-mealplans"], response_model=Union[PaginatedResponse, BatchResponse])
 async def get_all_daily_mealplans(
     request: Request,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(10, ge=1, le=100, description="Number of records to retrieve")
-) -> PaginatedResponse:
+    limit: int = Query(10, ge=1, le=100, description="Number of records to retrieve"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    ids: Optional[str] = Query(None, description="Comma-separated daily plan IDs to fetch in one call"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    expand: Optional[str] = Query(None, description="Embed related objects: meals, recipes")
+) -> Union[PaginatedResponse, BatchResponse]:
     """
-    Retrieve all meal plans with pagination.
+    Retrieve all meal plans with pagination. With ids, retrieve those daily meal plans instead.
     """
+    if ids is not None:
+        return await _get_batch(request, ids, "daily_meal_plans", fields, expand)
     res = ServiceFactory.get_service("MealplanResource")
-    daily_mealplans = res.get_all_daily_meal_plans(skip=skip, limit=limit)
-    total_count = res.get_total_count()
+    return await _get_page(request, "daily_meal_plans", skip, limit, cursor, fields, expand,
+                           res.get_daily_meal_plans_page_async, res.get_all_daily_meal_plans_async)
+
+# The maximum number of operations accepted by POST /batch.
+MAX_BATCH_OPERATIONS = 1000
+
+# The collections POST /batch can write, by the first segment of their endpoint paths.
+BATCH_COLLECTIONS = {
+    "mealplans": "meal_plans",
+    "weekly-mealplans": "weekly_meal_plans",
+    "daily-mealplans": "daily_meal_plans",
+}
+BATCH_ACTIONS = {"POST": "create", "PUT": "update", "DELETE": "delete"}
+
+def _batch_operation(operation: BatchOperation) -> Tuple[str, str, Any, Any]:
+    """
+    Map an operation of POST /batch, e.g. PUT /mealplans/10, to the (action, collection, key,
+    payload) that MealplanResource.run_batch() takes. The body is validated as the single
+    endpoint would validate it.
+    """
+    action = BATCH_ACTIONS.get(operation.method.upper())
+    parts = operation.path.strip("/").split("/")
+    collection = BATCH_COLLECTIONS.get(parts[0])
+    if action is None or collection is None or len(parts) != (1 if action == "create" else 2):
+        raise HTTPException(status_code=400, detail=f"Unsupported operation: {operation.method} {operation.path}")
+
+    key = None
+    if action != "create":
+        try:
+            key = int(parts[1])
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid ID in {operation.path}")
+    if action == "delete":
+        return action, collection, key, None
 
-    base_url = str(request.url).split('?')[0]
-    links = {
-        "first": {"href": f"{base_url}?skip=0&limit={limit}"},
-        "last": {"href": f"{base_url}?skip={(total_count // limit) * limit}&limit={limit}"}
-    }
+    try:
+        body = COLLECTION_MODELS[collection].model_validate(operation.body or {})
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=json.loads(e.json(include_url=False)))
+    return action, collection, key, body if action == "create" else body.model_dump(exclude_unset=True)
+
+def _batch_result(action: str, key: Any, value: Any, error: Optional[Exception]) -> BatchOperationResult:
+    """
+    The result of one operation of POST /batch, with the status and body its single endpoint
+    would have returned.
+    """
+    if isinstance(error, HTTPException):
+        return BatchOperationResult(status=error.status_code, body={"detail": error.detail})
+    if isinstance(error, BatchAbortedError):
+        return BatchOperationResult(status=424, body={"detail": str(error)})
+    if isinstance(error, ValueError):
+        return BatchOperationResult(status=400, body={"detail": str(error)})
+    if error is not None:
+        return BatchOperationResult(status=500, body={"detail": f"Operation failed: {error}"})
+    if action == "create":
+        return BatchOperationResult(status=201, body=value)
+    if action == "delete":
+        return BatchOperationResult(status=200, body={"message": f"Meal plan with ID {key} has been deleted"})
+    return BatchOperationResult(status=200, body=value)
+
+@router.post("/batch", tags=["batch"], response_model=BatchOperationsResponse)
+async def run_batch(batch: BatchRequest) -> BatchOperationsResponse:
+    """
+    Run many POST, PUT and DELETE operations on meal plans, weekly and daily meal plans in one
+    request, on one connection and in one transaction. Each result has the status and body
+    the operation's own endpoint would have returned.
+
+    With atomic (the default), the batch is all or nothing: if an operation fails, nothing is
+    committed, and the other operations get 424. Otherwise failed operations are undone on
+    their own and the rest are committed.
+    """
+    if not batch.operations:
+        raise HTTPException(status_code=400, detail="The batch must contain at least one operation")
+    if len(batch.operations) > MAX_BATCH_OPERATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_OPERATIONS} operations can be run at once")
+
+    results: List[Optional[BatchOperationResult]] = [None] * len(batch.operations)
+    operations = []
+    for index, operation in enumerate(batch.operations):
+        try:
+            operations.append((index, _batch_operation(operation)))
+        except HTTPException as e:
+            results[index] = _batch_result("", None, None, e)
 
-    if skip + limit < total_count:
-        links["next"] = {"href": f"{base_url}?skip={skip + limit}&limit={limit}"}
-    if skip > 0:
-        links["previous"] = {"href": f"{base_url}?skip={max(skip - limit, 0)}&limit={limit}"}
+    if batch.atomic and len(operations) < len(batch.operations):
+        error = BatchAbortedError("The batch was not run: it has invalid operations.")
+        for index, _ in operations:
+            results[index] = _batch_result("", None, None, error)
+        return BatchOperationsResponse(committed=False, results=results)
 
-    return PaginatedResponse(items=daily_mealplans, links=links)
\ No newline at end of file
+    res = ServiceFactory.get_service("MealplanResource")
+    committed, outcomes = await res.run_batch_async([operation for _, operation in operations], batch.atomic)
+    for (index, (action, _, key, _)), (value, error) in zip(operations, outcomes):
+        results[index] = _batch_result(action, key, value, error)
+    return BatchOperationsResponse(committed=committed, results=results)
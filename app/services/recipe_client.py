@@ -0,0 +1,167 @@
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import httpx
+
+from framework.services.cache.object_cache import ObjectCache
+from framework.services.cache.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Cached for recipes the service does not have, so they are not asked for on every request.
+_NOT_FOUND: dict = {}
+
+
+class RecipeClient:
+    """
+    Client of the recipe service, for embedding recipe summaries in meal plan responses.
+
+    All calls share one httpx.AsyncClient, so connections to the recipe service are pooled and
+    kept alive across requests. It is created on first use, on the running event loop.
+
+    get_many() fetches many recipes concurrently. IDs are deduplicated, summaries are served
+    from an LRU cache, and a recipe already being fetched (for this request or another) is
+    awaited rather than fetched again. A recipe that cannot be fetched (not found, timeout,
+    error) is None in the result, so the response is still served without it.
+
+    For tests, point base_url at a local stub server (benchmarks/recipe_stub.py), or pass an
+    httpx transport such as httpx.MockTransport.
+
+    :param base_url: The recipe service, e.g. http://recipes:5001. None disables the client.
+    :param path: The path of one recipe, with a {recipe_id} placeholder.
+    :param summary_fields: The fields of a recipe kept in its summary. None keeps them all.
+    :param max_connections: Connections open to the recipe service at most, which is also the
+        number of calls in flight at once.
+    :param max_keepalive: Idle connections kept open.
+    :param keepalive_expiry: Seconds an idle connection is kept open.
+    :param timeout: Seconds allowed for each call, end to end.
+    :param connect_timeout: Seconds allowed to open a connection.
+    :param cache_size: Recipe summaries kept in the LRU cache.
+    :param cache_ttl: Seconds a summary is served from the cache.
+    :param transport: An httpx async transport to use instead of the network.
+    """
+
+    def __init__(self, base_url: Optional[str], path: str = "/recipes/{recipe_id}",
+                 summary_fields: Optional[Sequence[str]] = ("recipe_id", "name"),
+                 max_connections: int = 20, max_keepalive: int = 10, keepalive_expiry: float = 30.0,
+                 timeout: float = 2.0, connect_timeout: float = 1.0,
+                 cache_size: int = 4096, cache_ttl: float = 600.0,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.base_url = base_url
+        self.path = path
+        self.summary_fields = tuple(summary_fields) if summary_fields else None
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.transport = transport
+        self.cache = ObjectCache(max_size=cache_size, ttl=cache_ttl)
+        self.single_flight = SingleFlight()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self._requests = 0
+        self._not_found = 0
+        self._errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.base_url)
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First use, or a new event loop (e.g. the application was restarted in-process).
+            self._loop = loop
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_keepalive,
+                                    keepalive_expiry=self.keepalive_expiry),
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                transport=self.transport,
+            )
+            # Calls beyond the pool size wait here, so their timeout only starts once they run.
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+        return self._client
+
+    async def _fetch(self, recipe_id: Any) -> Optional[dict]:
+        client = self._ensure_client()
+        async with self._semaphore:
+            self._requests += 1
+            try:
+                # httpx timeouts apply to each network operation; this bounds the whole call.
+                response = await asyncio.wait_for(client.get(self.path.format(recipe_id=recipe_id)), self.timeout)
+            except (httpx.HTTPError, asyncio.TimeoutError) as e:
+                self._errors += 1
+                logger.warning("Recipe %s could not be fetched: %r", recipe_id, e)
+                return None
+
+        if response.status_code == 404:
+            self._not_found += 1
+            self.cache.put(recipe_id, _NOT_FOUND)
+            return None
+        try:
+            response.raise_for_status()
+            recipe = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            self._errors += 1
+            logger.warning("Recipe %s could not be fetched: %r", recipe_id, e)
+            return None
+
+        summary = {name: recipe.get(name) for name in self.summary_fields} if self.summary_fields else recipe
+        self.cache.put(recipe_id, summary)
+        return summary
+
+    async def get_many(self, recipe_ids: Iterable[Any]) -> Dict[Any, Optional[dict]]:
+        """
+        Return the summaries of recipes, by ID, fetching those that are not cached concurrently.
+        None IDs are skipped; recipes that could not be fetched map to None.
+        """
+        summaries: Dict[Any, Optional[dict]] = {}
+        misses = []
+        for recipe_id in dict.fromkeys(recipe_ids):
+            if recipe_id is None:
+                continue
+            summary = self.cache.get(recipe_id)
+            if summary is None:
+                misses.append(recipe_id)
+            else:
+                summaries[recipe_id] = None if summary is _NOT_FOUND else summary
+
+        if misses:
+            fetched = await asyncio.gather(*(
+                self.single_flight.do_async(("recipe", recipe_id), self._fetch, recipe_id) for recipe_id in misses
+            ))
+            summaries.update(zip(misses, fetched))
+        return summaries
+
+    async def get(self, recipe_id: Any) -> Optional[dict]:
+        return (await self.get_many([recipe_id])).get(recipe_id)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self._requests,
+            "not_found": self._not_found,
+            "errors": self._errors,
+            "coalesced": self.single_flight.stats()["coalesced"],
+            "cache": self.cache.stats(),
+        }
+
+    def close(self) -> None:
+        """
+        Close the pooled connections. Must not be called on the event loop's own thread; the
+        service factory closes services from a worker thread.
+        """
+        loop, client = self._loop, self._client
+        self._loop = self._client = None
+        if client is None or loop is None or loop.is_closed() or not loop.is_running():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(timeout=5.0)
+        except Exception as e:
+            logger.warning("Error while closing the recipe client: %r", e)
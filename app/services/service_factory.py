@@ -1,31 +1,141 @@
+import os
+
 from framework.services.service_factory import BaseServiceFactory
 import app.resources.mealplan_resource as mealplan_resource
+from app.services.recipe_client import RecipeClient
 from framework.services.data_access.MySQLRDBDataService import MySQLRDBDataService
+from framework.services.data_access.SQLiteDataService import SQLiteDataService
+from framework.services.data_access.AsyncDataService import AsyncDataService
+from framework.services.data_access.IdAllocator import IdAllocator
+from framework.services.cache.count_cache import CountCache
+from framework.services.cache.object_cache import ObjectCache
+from framework.services.cache.single_flight import SingleFlight
+from framework.services.jobs.job_store import SQLiteJobStore
+from framework.services.jobs.job_engine import JobEngine
+
+
+DATABASE = "mealplan_db"
+COLLECTIONS = ("meal_plans", "weekly_meal_plans", "daily_meal_plans")
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
 
 
-# TODO -- Implement this class
 class ServiceFactory(BaseServiceFactory):
+    """
+    The services are singletons shared by all requests. Data services own a connection pool,
+    the ID allocator holds reserved blocks and the caches hold counts and rows.
+
+    Configuration comes from the environment:
+        DATA_BACKEND: mysql (the default) or sqlite, for local files in SQLITE_PATH.
+        DB_HOST, DB_PORT, DB_USER, DB_PASSWORD: The MySQL server.
+        DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT: The connection pool. min_size
+            connections are opened at startup.
+        DATA_SERVICE_MAX_WORKERS: Threads running blocking data-service calls.
+        ID_BLOCK_SIZE: Keys reserved per ID allocator round trip.
+        COUNT_CACHE_TTL, OBJECT_CACHE_SIZE, OBJECT_CACHE_TTL: The caches.
+        JOB_WORKERS, JOB_QUEUE_SIZE: Background jobs run at once and waiting per process.
+        JOB_STORE_PATH, JOB_TTL: The SQLite file shared by all processes for job results, and
+            how long results are kept.
+        RECIPE_SERVICE_URL: The recipe service that recipe details are fetched from. Without
+            it, recipe names come from the recipes database instead.
+        RECIPE_SERVICE_MAX_CONNECTIONS, RECIPE_SERVICE_TIMEOUT: Connections to the recipe
+            service, and seconds allowed per call.
+        RECIPE_CACHE_SIZE, RECIPE_CACHE_TTL: The cache of recipe summaries.
+    """
 
     def __init__(self):
         super().__init__()
 
+    @staticmethod
+    def _register_invalidation(cache, data_service):
+        # Cached rows are keyed by (database, collection, primary key).
+        def invalidate(database_name, collection_name, key_field, keys):
+            cache.invalidate_many((database_name, collection_name, key) for key in keys)
+        data_service.add_change_listener(invalidate)
+
     @classmethod
-    def get_service(cls, service_name):
-        #
-        # TODO -- The terrible, hardcoding and hacking continues.
-        #
-        if service_name == 'MealplanResource':
-            result = mealplan_resource.MealplanResource(config=None)
-        elif service_name == 'MealplanResourceDataService':
-            context = dict(user="root", password="dbuserdbuser",
-                           host="35.196.59.220", port=3306)
-            data_service = MySQLRDBDataService(context=context)
-            result = data_service
-        else:
-            result = None
+    def _create_data_service(cls):
+        pool = dict(pool_min_size=_env_int("DB_POOL_MIN_SIZE", 1),
+                    pool_max_size=_env_int("DB_POOL_MAX_SIZE", 10),
+                    pool_timeout=_env_float("DB_POOL_TIMEOUT", 10.0))
+        if os.environ.get("DATA_BACKEND", "mysql") == "sqlite":
+            return SQLiteDataService(context=dict(pool, path=os.environ.get("SQLITE_PATH", "local_db")))
 
-        return result
+        context = dict(pool, user=os.environ.get("DB_USER", "root"),
+                       password=os.environ.get("DB_PASSWORD", "dbuserdbuser"),
+                       host=os.environ.get("DB_HOST", "35.196.59.220"),
+                       port=_env_int("DB_PORT", 3306))
+        return MySQLRDBDataService(context=context)
 
+    @classmethod
+    def _create_async_data_service(cls):
+        context = dict(data_service=cls.get_service('MealplanResourceDataService'),
+                       max_workers=_env_int("DATA_SERVICE_MAX_WORKERS", 10))
+        return AsyncDataService(context=context)
+
+    @classmethod
+    def _create_object_cache(cls):
+        cache = ObjectCache(max_size=_env_int("OBJECT_CACHE_SIZE", 4096),
+                            ttl=_env_float("OBJECT_CACHE_TTL", 300.0))
+        cls._register_invalidation(cache, cls.get_service('MealplanResourceDataService'))
+        return cache
+
+    @classmethod
+    def _create_single_flight(cls):
+        single_flight = SingleFlight()
+        # Reads that start after a write must not join reads that started before it.
+        cls.get_service('MealplanResourceDataService').add_change_listener(
+            lambda database_name, collection_name, key_field, keys: single_flight.forget_all())
+        return single_flight
+
+    @classmethod
+    def _create_job_engine(cls):
+        store = SQLiteJobStore(os.environ.get("JOB_STORE_PATH", os.path.join("local_db", "jobs.db")),
+                               ttl=_env_float("JOB_TTL", 3600.0))
+        return JobEngine(store, workers=_env_int("JOB_WORKERS", 4), max_queue=_env_int("JOB_QUEUE_SIZE", 100))
+
+    @classmethod
+    def _create_recipe_client(cls):
+        return RecipeClient(os.environ.get("RECIPE_SERVICE_URL"),
+                            max_connections=_env_int("RECIPE_SERVICE_MAX_CONNECTIONS", 20),
+                            timeout=_env_float("RECIPE_SERVICE_TIMEOUT", 2.0),
+                            cache_size=_env_int("RECIPE_CACHE_SIZE", 4096),
+                            cache_ttl=_env_float("RECIPE_CACHE_TTL", 600.0))
 
+    @staticmethod
+    def _warm_count_cache(cache):
+        for collection in COLLECTIONS:
+            cache.get(DATABASE, collection)
 
 
+ServiceFactory.register(
+    'MealplanResourceDataService', ServiceFactory._create_data_service,
+    warm=lambda data_service: data_service.open(),
+    close=lambda data_service: data_service.close())
+ServiceFactory.register(
+    'MealplanResourceAsyncDataService', ServiceFactory._create_async_data_service,
+    close=lambda async_data_service: async_data_service.close())
+ServiceFactory.register(
+    'MealplanIdAllocator',
+    lambda: IdAllocator(ServiceFactory.get_service('MealplanResourceDataService'),
+                        database_name=DATABASE, block_size=_env_int("ID_BLOCK_SIZE", 50)))
+ServiceFactory.register(
+    'MealplanCountCache',
+    lambda: CountCache(ServiceFactory.get_service('MealplanResourceDataService'),
+                       ttl=_env_float("COUNT_CACHE_TTL", 60.0), approximate=False),
+    warm=ServiceFactory._warm_count_cache)
+ServiceFactory.register('MealplanObjectCache', ServiceFactory._create_object_cache)
+ServiceFactory.register('MealplanSingleFlight', ServiceFactory._create_single_flight)
+ServiceFactory.register(
+    'MealplanJobEngine', ServiceFactory._create_job_engine,
+    close=lambda job_engine: job_engine.close())
+ServiceFactory.register(
+    'RecipeClient', ServiceFactory._create_recipe_client,
+    close=lambda recipe_client: recipe_client.close())
+ServiceFactory.register('MealplanResource', lambda: mealplan_resource.MealplanResource(config=None))
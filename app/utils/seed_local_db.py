@@ -0,0 +1,40 @@
+#
+# Create and fill a local SQLite database for DATA_BACKEND=sqlite.
+#
+#   python -m app.utils.seed_local_db --path local_db --meal-plans 1000000 --days 3650
+#
+import argparse
+import time
+
+from framework.services.data_access.SQLiteDataService import SQLiteDataService
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create and fill a local SQLite meal plan database.")
+    parser.add_argument("--path", default="local_db", help="Directory of the database files.")
+    parser.add_argument("--meal-plans", type=int, default=100000,
+                        help="Number of meal plans, and of daily meal plans.")
+    parser.add_argument("--days", type=int, default=365, help="Number of distinct dates.")
+    parser.add_argument("--recipes", type=int, default=1000, help="Number of recipes.")
+    parser.add_argument("--start-date", default="2024-01-01", help="The first date, YYYY-MM-DD.")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Rows per transaction.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+    args = parser.parse_args(argv)
+
+    data_service = SQLiteDataService(context=dict(path=args.path, pool_min_size=0))
+    try:
+        start = time.perf_counter()
+        counts = data_service.seed(args.meal_plans, days=args.days, recipes=args.recipes,
+                                   start_date=args.start_date, batch_size=args.batch_size,
+                                   rng_seed=args.seed)
+        elapsed = time.perf_counter() - start
+    finally:
+        data_service.close()
+
+    for collection_name, count in counts.items():
+        print(f"{collection_name}: {count} rows")
+    print(f"Seeded {args.path} in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,578 @@
+#
+# Benchmarks for the router endpoints and the data service, against local SQLite databases.
+#
+#   python -m benchmarks.benchmark --sizes 1000,100000 --concurrency 1,8,32 --output results.json
+#
+# For every dataset size a database is seeded once (and kept in --workdir), then copied so
+# each run starts from the same rows. Endpoints are called in-process through the ASGI app,
+# middleware included. Data-service methods are called directly from a thread pool.
+#
+# Each result has p50/p95/p99 latency, throughput and the average number of database round
+# trips (statements, begin/commit/rollback and pings) per request.
+#
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from framework.services.data_access.SQLiteDataService import SQLiteDataService
+
+DATABASE = "mealplan_db"
+START_DATE = "2024-01-01"
+
+
+class _Counter:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def add(self, count: int = 1):
+        with self._lock:
+            self.value += count
+
+
+class _CountingCursor:
+
+    def __init__(self, cursor, counter: _Counter):
+        self._cursor = cursor
+        self._counter = counter
+
+    def execute(self, query, params=None):
+        self._counter.add()
+        return self._cursor.execute(query, params)
+
+    def executemany(self, query, seq_of_params):
+        self._counter.add()
+        return self._cursor.executemany(query, seq_of_params)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class _CountingConnection:
+
+    def __init__(self, connection, counter: _Counter):
+        self._connection = connection
+        self._counter = counter
+
+    def cursor(self):
+        return _CountingCursor(self._connection.cursor(), self._counter)
+
+    def begin(self):
+        self._counter.add()
+        self._connection.begin()
+
+    def commit(self):
+        self._counter.add()
+        self._connection.commit()
+
+    def rollback(self):
+        self._counter.add()
+        self._connection.rollback()
+
+    def ping(self, reconnect=False):
+        self._counter.add()
+        self._connection.ping(reconnect=reconnect)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+class CountingDataService(SQLiteDataService):
+    """
+    SQLiteDataService that counts the round trips a MySQL server would see.
+    """
+
+    def __init__(self, context):
+        self.round_trips = _Counter()
+        super().__init__(context)
+
+    def _connect(self):
+        return _CountingConnection(super()._connect(), self.round_trips)
+
+    def allocate_id_block(self, *args, **kwargs):
+        self.round_trips.add()
+        return super().allocate_id_block(*args, **kwargs)
+
+
+class Dataset:
+    """
+    The shape of a seeded database, so scenarios can pick existing keys and rebuild rows.
+    """
+
+    def __init__(self, meal_plans: int, days: int):
+        self.meal_plans = meal_plans
+        self.days = days
+        self.weeks = math.ceil(days / 7)
+        self.per_day = math.ceil(meal_plans / days)
+        self.first_day = date.fromisoformat(START_DATE)
+        # Keys created by the POST scenarios, consumed by the DELETE scenarios.
+        self.created: Dict[str, List[int]] = {"meal_plans": [], "weekly_meal_plans": [], "daily_meal_plans": []}
+        # Task IDs returned by the start-task scenario, polled by the poll scenario.
+        self.tasks: List[str] = []
+
+    def week(self, week_plan_id: int) -> dict:
+        start = self.first_day + timedelta(days=7 * (week_plan_id - 1))
+        return {"week_plan_id": week_plan_id, "start_date": start.isoformat(),
+                "end_date": (start + timedelta(days=6)).isoformat()}
+
+    def day(self, day_plan_id: int) -> dict:
+        offset = (day_plan_id - 1) // self.per_day
+        return {"day_plan_id": day_plan_id, "week_plan_id": offset // 7 + 1,
+                "date": (self.first_day + timedelta(days=offset)).isoformat(), "meal_id": day_plan_id}
+
+    def date(self, rng: random.Random) -> str:
+        return (self.first_day + timedelta(days=rng.randrange(self.days))).isoformat()
+
+    def future_date(self, rng: random.Random) -> str:
+        # After the seeded range, so new daily plans also create weeks.
+        return (self.first_day + timedelta(days=self.days + rng.randrange(3650))).isoformat()
+
+
+def _days_for(meal_plans: int) -> int:
+    return min(3650, max(28, meal_plans // 100))
+
+
+def _prepare_database(workdir: str, size: int) -> str:
+    """
+    Seed the database for a size once, and return a fresh copy of it for one run.
+    """
+    seed_path = os.path.join(workdir, f"seed-{size}")
+    if not os.path.exists(os.path.join(seed_path, "done")):
+        shutil.rmtree(seed_path, ignore_errors=True)
+        data_service = SQLiteDataService(context=dict(path=seed_path, pool_min_size=0))
+        try:
+            print(f"Seeding {size} meal plans into {seed_path}...", file=sys.stderr)
+            data_service.seed(size, days=_days_for(size), start_date=START_DATE)
+        finally:
+            data_service.close()
+        open(os.path.join(seed_path, "done"), "w").close()
+
+    run_path = os.path.join(workdir, f"run-{size}")
+    shutil.rmtree(run_path, ignore_errors=True)
+    shutil.copytree(seed_path, run_path)
+    return run_path
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(percent / 100.0 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def _summarize(kind: str, name: str, size: int, concurrency: int, latencies: List[float], errors: int,
+               elapsed: float, round_trips: int) -> dict:
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        "kind": kind,
+        "name": name,
+        "size": size,
+        "concurrency": concurrency,
+        "requests": count,
+        "errors": errors,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "mean_ms": (sum(latencies) / count * 1000) if count else 0.0,
+        "max_ms": latencies[-1] * 1000 if count else 0.0,
+        "throughput_rps": count / elapsed if elapsed > 0 else 0.0,
+        "round_trips_per_request": round_trips / count if count else 0.0,
+    }
+
+
+#
+# Endpoint scenarios: (name, make request, accepted statuses). make request returns (method,
+# url, json body), or None when there is nothing left to do. Any status below 400 is accepted
+# unless the scenario lists the statuses it expects.
+#
+
+def _endpoint_scenarios(ds: Dataset) -> List[tuple]:
+    def key(rng, limit):
+        return rng.randint(1, limit)
+
+    def pop(collection):
+        def request(rng):
+            created = ds.created[collection]
+            return created.pop() if created else None
+        return request
+
+    def ids(rng, limit, count=20):
+        return ",".join(str(key(rng, limit)) for _ in range(count))
+
+    def daily_body(rng):
+        return {"day_plan_id": 0, "week_plan_id": 0, "date": ds.future_date(rng), "meal_id": key(rng, ds.meal_plans)}
+
+    def new_week(rng):
+        start = date.fromisoformat(ds.future_date(rng))
+        return {"week_plan_id": 0, "start_date": start.isoformat(), "end_date": (start + timedelta(days=6)).isoformat()}
+
+    def range_url(rng):
+        start = date.fromisoformat(ds.date(rng))
+        return f"/daily-mealplans/range?from={start.isoformat()}&to={(start + timedelta(days=6)).isoformat()}"
+
+    def poll_url(rng):
+        return f"/mealplans/poll/{rng.choice(ds.tasks) if ds.tasks else 'unknown'}"
+
+    def delete(path, collection):
+        take = pop(collection)
+
+        def request(rng):
+            key_value = take(rng)
+            return ("DELETE", f"{path}/{key_value}", None) if key_value is not None else None
+        return request
+
+    return [
+        ("GET /", lambda rng: ("GET", "/", None)),
+        ("GET /mealplans/{id}", lambda rng: ("GET", f"/mealplans/{key(rng, ds.meal_plans)}", None)),
+        ("GET /weekly-mealplans/{id}", lambda rng: ("GET", f"/weekly-mealplans/{key(rng, ds.weeks)}", None)),
+        ("GET /daily-mealplans/{id}", lambda rng: ("GET", f"/daily-mealplans/{key(rng, ds.meal_plans)}", None)),
+        ("GET /mealplans (first page)", lambda rng: ("GET", "/mealplans?limit=20", None)),
+        ("GET /mealplans (offset page)",
+         lambda rng: ("GET", f"/mealplans?skip={rng.randrange(1, ds.meal_plans)}&limit=20", None)),
+        ("GET /mealplans?ids", lambda rng: ("GET", f"/mealplans?ids={ids(rng, ds.meal_plans)}", None)),
+        ("GET /daily-mealplans (first page)", lambda rng: ("GET", "/daily-mealplans?limit=20", None)),
+        ("GET /daily-mealplans (offset page)",
+         lambda rng: ("GET", f"/daily-mealplans?skip={rng.randrange(1, ds.meal_plans)}&limit=20", None)),
+        ("GET /daily-mealplans?ids", lambda rng: ("GET", f"/daily-mealplans?ids={ids(rng, ds.meal_plans)}", None)),
+        ("GET /weekly-mealplans/all", lambda rng: ("GET", f"/weekly-mealplans/all?skip={rng.randrange(ds.weeks)}&limit=20", None)),
+        ("GET /weekly-mealplans?ids", lambda rng: ("GET", f"/weekly-mealplans?ids={ids(rng, ds.weeks, 5)}", None)),
+        ("GET /weekly-mealplans?date", lambda rng: ("GET", f"/weekly-mealplans?date={ds.date(rng)}", None)),
+        ("GET /weekly-mealplans/{id}/daily-mealplans",
+         lambda rng: ("GET", f"/weekly-mealplans/{key(rng, ds.weeks)}/daily-mealplans", None)),
+        ("GET /daily-mealplans/range", lambda rng: ("GET", range_url(rng), None)),
+        ("POST /mealplans", lambda rng: ("POST", "/mealplans", {"meal_id": 0, "breakfast_recipe": key(rng, 1000)})),
+        ("POST /weekly-mealplans", lambda rng: ("POST", "/weekly-mealplans", new_week(rng))),
+        ("POST /daily-mealplans", lambda rng: ("POST", "/daily-mealplans", daily_body(rng))),
+        ("POST /mealplans/bulk",
+         lambda rng: ("POST", "/mealplans/bulk", [{"meal_id": 0, "lunch_recipe": key(rng, 1000)} for _ in range(10)])),
+        ("POST /weekly-mealplans/bulk", lambda rng: ("POST", "/weekly-mealplans/bulk", [new_week(rng) for _ in range(10)])),
+        ("POST /daily-mealplans/bulk", lambda rng: ("POST", "/daily-mealplans/bulk", [daily_body(rng) for _ in range(10)])),
+        ("POST /mealplans/start-task",
+         lambda rng: ("POST", f"/mealplans/start-task?meal_id={key(rng, ds.meal_plans)}", None), {202, 429}),
+        ("GET /mealplans/poll/{task_id}", lambda rng: ("GET", poll_url(rng), None), {200, 404}),
+        ("PUT /mealplans/{id}",
+         lambda rng: (lambda k: ("PUT", f"/mealplans/{k}", {"meal_id": k, "dinner_recipe": key(rng, 1000)}))(key(rng, ds.meal_plans))),
+        ("PUT /weekly-mealplans/{id}",
+         lambda rng: (lambda k: ("PUT", f"/weekly-mealplans/{k}", ds.week(k)))(key(rng, ds.weeks))),
+        ("PUT /daily-mealplans/{id}",
+         lambda rng: (lambda k: ("PUT", f"/daily-mealplans/{k}", ds.day(k)))(key(rng, ds.meal_plans))),
+        ("DELETE /mealplans/{id}", delete("/mealplans", "meal_plans")),
+        ("DELETE /daily-mealplans/{id}", delete("/daily-mealplans", "daily_meal_plans")),
+        ("DELETE /weekly-mealplans/{id}", delete("/weekly-mealplans", "weekly_meal_plans")),
+    ]
+
+
+# Where the keys returned by POST scenarios are recorded.
+_CREATED_KEYS = {
+    "/mealplans": ("meal_plans", "meal_id"),
+    "/weekly-mealplans": ("weekly_meal_plans", "week_plan_id"),
+    "/daily-mealplans": ("daily_meal_plans", "day_plan_id"),
+}
+
+
+def _record_created(ds: Dataset, method: str, url: str, response: httpx.Response) -> None:
+    if response.status_code == 202:
+        ds.tasks.append(response.json()["task_id"])
+        return
+    if method != "POST" or response.status_code != 201:
+        return
+    path = url.split("?")[0]
+    if path.endswith("/bulk"):
+        collection, key_field = _CREATED_KEYS[path[:-len("/bulk")]]
+        ds.created[collection].extend(item[key_field] for item in response.json()["items"])
+    elif path in _CREATED_KEYS:
+        collection, key_field = _CREATED_KEYS[path]
+        ds.created[collection].append(response.json()[key_field])
+
+
+async def _run_endpoint(client: httpx.AsyncClient, ds: Dataset, counter: _Counter, name: str, make: Callable,
+                        accepted: Optional[set], size: int, concurrency: int, requests: int, warmup: int) -> dict:
+    rng = random.Random(f"{name}/{size}/{concurrency}")
+    latencies = []
+    errors = 0
+    remaining = itertools.count()
+
+    async def worker(limit: int, record: bool):
+        nonlocal errors
+        while next(remaining) < limit:
+            request = make(rng)
+            if request is None:
+                break
+            method, url, body = request
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, json=body)
+                ok = response.status_code in accepted if accepted else response.status_code < 400
+            except Exception:
+                response, ok = None, False
+            elapsed = time.perf_counter() - start
+            if response is not None:
+                _record_created(ds, method, url, response)
+            if record:
+                latencies.append(elapsed)
+                errors += 0 if ok else 1
+
+    await asyncio.gather(*(worker(warmup, False) for _ in range(concurrency)))
+    remaining = itertools.count()
+    round_trips = counter.value
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(requests, True) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return _summarize("endpoint", name, size, concurrency, latencies, errors, elapsed, counter.value - round_trips)
+
+
+#
+# Data-service scenarios. Each calls one method of the data service.
+#
+
+def _data_service_scenarios(ds: Dataset, data_service: SQLiteDataService) -> List[tuple]:
+    def key(rng, limit):
+        return rng.randint(1, limit)
+
+    inserted = []
+    next_meal_id = itertools.count(ds.meal_plans * 10)
+
+    def insert(rng):
+        meal_id = next(next_meal_id)
+        data_service.insert_data(DATABASE, "meal_plans", {"meal_id": meal_id, "breakfast_recipe": key(rng, 1000)})
+        inserted.append(meal_id)
+
+    def delete(rng):
+        if inserted:
+            data_service.delete_data(DATABASE, "meal_plans", "meal_id", inserted.pop())
+
+    def date_range(rng):
+        start = date.fromisoformat(ds.date(rng))
+        data_service.get_daily_meal_plans_by_date_range(start.isoformat(), (start + timedelta(days=6)).isoformat())
+
+    week_query = "SELECT week_plan_id FROM mealplan_db.weekly_meal_plans WHERE %s BETWEEN start_date AND end_date"
+
+    return [
+        ("get_data_object", lambda rng: data_service.get_data_object(DATABASE, "meal_plans", "meal_id", key(rng, ds.meal_plans))),
+        ("get_data_objects (20 keys)",
+         lambda rng: data_service.get_data_objects(DATABASE, "daily_meal_plans", "day_plan_id",
+                                                   [key(rng, ds.meal_plans) for _ in range(20)])),
+        ("get_all_data (offset)",
+         lambda rng: data_service.get_all_data(DATABASE, "meal_plans", skip=rng.randrange(ds.meal_plans), limit=20,
+                                               key_field="meal_id")),
+        ("get_all_data (keyset)",
+         lambda rng: data_service.get_all_data(DATABASE, "meal_plans", limit=20, key_field="meal_id",
+                                               after=rng.randrange(ds.meal_plans))),
+        ("get_all_data (filter)",
+         lambda rng: data_service.get_all_data(DATABASE, "daily_meal_plans", limit=100,
+                                               filters={"week_plan_id": key(rng, ds.weeks)}, key_field="day_plan_id")),
+        ("get_total_count", lambda rng: data_service.get_total_count(DATABASE, "daily_meal_plans")),
+        ("get_approximate_count", lambda rng: data_service.get_approximate_count(DATABASE, "daily_meal_plans")),
+        ("get_max_value", lambda rng: data_service.get_max_value("meal_id", DATABASE, "meal_plans")),
+        ("get_daily_meal_plans_by_date", lambda rng: data_service.get_daily_meal_plans_by_date(ds.date(rng))),
+        ("get_daily_meal_plans_by_date_range", date_range),
+        ("execute_query (week lookup)", lambda rng: data_service.execute_query(week_query, (ds.date(rng),))),
+        ("insert_data", insert),
+        ("update_data",
+         lambda rng: (lambda k: data_service.update_data(DATABASE, "meal_plans", {"lunch_recipe": key(rng, 1000)},
+                                                         "meal_id", k))(key(rng, ds.meal_plans))),
+        ("delete_data", delete),
+    ]
+
+
+def _run_data_service(counter: _Counter, name: str, call: Callable, size: int, concurrency: int,
+                      requests: int, warmup: int) -> dict:
+    rng = random.Random(f"{name}/{size}/{concurrency}")
+    rng_lock = threading.Lock()
+    latencies = []
+    errors = 0
+    errors_lock = threading.Lock()
+
+    def run(limit: int, record: bool):
+        nonlocal errors
+        remaining = itertools.count()
+
+        def worker():
+            nonlocal errors
+            local = []
+            while next(remaining) < limit:
+                with rng_lock:
+                    call_rng = random.Random(rng.random())
+                start = time.perf_counter()
+                try:
+                    call(call_rng)
+                    ok = True
+                except Exception:
+                    ok = False
+                local.append(time.perf_counter() - start)
+                if not ok:
+                    with errors_lock:
+                        errors += 1 if record else 0
+            if record:
+                latencies.extend(local)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for future in [executor.submit(worker) for _ in range(concurrency)]:
+                future.result()
+
+    run(warmup, False)
+    round_trips = counter.value
+    start = time.perf_counter()
+    run(requests, True)
+    elapsed = time.perf_counter() - start
+    return _summarize("data_service", name, size, concurrency, latencies, errors, elapsed, counter.value - round_trips)
+
+
+#
+# Driver
+#
+
+def _install(path: str, pool_size: int) -> CountingDataService:
+    """
+    Point the service factory at a counting SQLite data service on path.
+    """
+    from app.services.service_factory import ServiceFactory
+
+    ServiceFactory.shutdown()
+    ServiceFactory.register(
+        'MealplanResourceDataService',
+        lambda: CountingDataService(context=dict(path=path, pool_min_size=pool_size, pool_max_size=pool_size)),
+        warm=lambda data_service: data_service.open(),
+        close=lambda data_service: data_service.close())
+    ServiceFactory.startup()
+    return ServiceFactory.get_service('MealplanResourceDataService')
+
+
+def _matches(name: str, only: Optional[List[str]]) -> bool:
+    return not only or any(pattern.lower() in name.lower() for pattern in only)
+
+
+async def _run_endpoints(app, ds: Dataset, counter: _Counter, size: int, concurrencies: List[int], args,
+                         out) -> List[dict]:
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for name, make, *accepted in _endpoint_scenarios(ds):
+            if not _matches(name, args.only):
+                continue
+            for concurrency in concurrencies:
+                result = await _run_endpoint(client, ds, counter, name, make, accepted[0] if accepted else None,
+                                             size, concurrency, args.requests, args.warmup)
+                if not result["requests"]:
+                    # A DELETE scenario without rows created by the POST scenarios.
+                    continue
+                results.append(result)
+                _print_result(result, out)
+    return results
+
+
+def _print_result(result: dict, out) -> None:
+    print(f"{result['kind']:<12} {result['name']:<45} size={result['size']:<9} c={result['concurrency']:<4} "
+          f"p50={result['p50_ms']:8.2f}ms p95={result['p95_ms']:8.2f}ms p99={result['p99_ms']:8.2f}ms "
+          f"{result['throughput_rps']:9.1f} req/s  {result['round_trips_per_request']:5.2f} rt/req"
+          f"{'  errors=' + str(result['errors']) if result['errors'] else ''}", file=out, flush=True)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except Exception:
+        return None
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the meal plan endpoints and data service.")
+    parser.add_argument("--sizes", type=_int_list, default=[1000, 100000],
+                        help="Comma-separated dataset sizes (meal plans, and daily meal plans).")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 8, 32],
+                        help="Comma-separated numbers of concurrent clients.")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario.")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests before each scenario.")
+    parser.add_argument("--pool-size", type=int, default=10, help="Database connections in the pool.")
+    parser.add_argument("--only", action="append", help="Run only scenarios whose name contains this text.")
+    parser.add_argument("--skip-endpoints", action="store_true", help="Only benchmark the data service.")
+    parser.add_argument("--skip-data-service", action="store_true", help="Only benchmark the endpoints.")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "mealplan-benchmark"),
+                        help="Directory for the seeded databases. Seeded databases are reused.")
+    parser.add_argument("--output", default="benchmark-results.json", help="Where to write the JSON results.")
+    parser.add_argument("--log-level", default="WARNING", help="Log level while benchmarking.")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.workdir, exist_ok=True)
+    os.environ["DATA_BACKEND"] = "sqlite"
+    # Measure the job machinery, not the simulated fetch delay.
+    os.environ.setdefault("MEALPLAN_TASK_DELAY", "0")
+    os.environ.setdefault("JOB_STORE_PATH", os.path.join(args.workdir, "jobs.db"))
+
+    import app.main
+    from app.services.service_factory import ServiceFactory
+    logging.getLogger().setLevel(args.log_level)
+    for name in list(logging.root.manager.loggerDict):
+        logging.getLogger(name).setLevel(args.log_level)
+
+    out = sys.stdout
+    results = []
+    for size in args.sizes:
+        path = _prepare_database(args.workdir, size)
+        ds = Dataset(size, _days_for(size))
+        data_service = _install(path, args.pool_size)
+        try:
+            if not args.skip_endpoints:
+                print(f"# endpoints, {size} meal plans", file=out, flush=True)
+                results.extend(asyncio.run(
+                    _run_endpoints(app.main.app, ds, data_service.round_trips, size, args.concurrency, args, out)))
+            if not args.skip_data_service:
+                print(f"# data service, {size} meal plans", file=out, flush=True)
+                for name, call in _data_service_scenarios(ds, data_service):
+                    if not _matches(name, args.only):
+                        continue
+                    for concurrency in args.concurrency:
+                        result = _run_data_service(data_service.round_trips, name, call, size, concurrency,
+                                                   args.requests, args.warmup)
+                        results.append(result)
+                        _print_result(result, out)
+        finally:
+            ServiceFactory.shutdown()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "sizes": args.sizes,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "pool_size": args.pool_size,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
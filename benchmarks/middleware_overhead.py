@@ -0,0 +1,145 @@
+#
+# Per-request overhead of the observability middleware, compared with the middleware stack it
+# replaced and with no middleware at all.
+#
+#   python -m benchmarks.middleware_overhead --requests 5000 --output middleware.json
+#
+# Each variant wraps the same trivial FastAPI app and is called in-process through ASGI, so the
+# difference between variants is the middleware cost.
+#
+import argparse
+import asyncio
+import json
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, List
+
+import httpx
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from benchmarks.benchmark import _percentile
+from framework.middleware.observability import ObservabilityMiddleware
+
+logger = logging.getLogger("benchmarks.middleware")
+
+
+#
+# The previous stack: two BaseHTTPMiddleware classes and an @app.middleware("http") function.
+#
+
+class _LegacyCorrelationIdMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        correlation_id = request.headers.get('X-Correlation-ID')
+        if not correlation_id:
+            correlation_id = str(uuid.uuid4())
+            logger.info(f"Generated new Correlation ID: {correlation_id}")
+        else:
+            logger.info(f"Received Correlation ID from header: {correlation_id}")
+        request.state.correlation_id = correlation_id
+        response: Response = await call_next(request)
+        response.headers['X-Correlation-ID'] = correlation_id
+        logger.info(f"Set Correlation ID in response headers: {correlation_id}")
+        return response
+
+
+class _LegacyLogRequestsMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        correlation_id = getattr(request.state, 'correlation_id', 'N/A')
+        logger.info(f"Request: {request.method} {request.url} | Correlation ID: {correlation_id}")
+        start_time = time.time()
+        response: Response = await call_next(request)
+        process_time = time.time() - start_time
+        logger.info(f"Response status: {response.status_code} | Time: {process_time:.4f}s | Correlation ID: {correlation_id}")
+        return response
+
+
+def _build_app(variant: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    def ping():
+        return {"status": "ok"}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((b"x" * 1024 for _ in range(64)), media_type="application/octet-stream")
+
+    if variant == "legacy":
+        app.add_middleware(_LegacyLogRequestsMiddleware)
+        app.add_middleware(_LegacyCorrelationIdMiddleware)
+
+        @app.middleware("http")
+        async def log_requests(request: Request, call_next):
+            logger.info(f"Request: {request.method} {request.url}")
+            start_time = time.time()
+            response = await call_next(request)
+            process_time = time.time() - start_time
+            logger.info(f"Response status: {response.status_code} | Time: {process_time:.4f}s")
+            return response
+    elif variant == "observability":
+        app.add_middleware(ObservabilityMiddleware, access_logger=logger)
+    return app
+
+
+async def _measure(app: FastAPI, path: str, requests: int, warmup: int) -> List[float]:
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for i in range(warmup + requests):
+            start = time.perf_counter()
+            response = await client.get(path)
+            await response.aread()
+            if i >= warmup:
+                latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the request middleware overhead.")
+    parser.add_argument("--requests", type=int, default=5000, help="Measured requests per variant and path.")
+    parser.add_argument("--warmup", type=int, default=200, help="Unmeasured requests before each run.")
+    parser.add_argument("--log-level", default="INFO",
+                        help="Level of the middleware logger. INFO includes the cost of formatting log lines.")
+    parser.add_argument("--output", default="middleware-overhead.json", help="Where to write the JSON results.")
+    args = parser.parse_args(argv)
+
+    # Format log records, as a deployment would, but do not write them anywhere.
+    logger.setLevel(args.log_level)
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+
+    results = []
+    for path in ("/ping", "/stream"):
+        baseline = None
+        for variant in ("none", "legacy", "observability"):
+            latencies = sorted(asyncio.run(_measure(_build_app(variant), path, args.requests, args.warmup)))
+            mean = sum(latencies) / len(latencies)
+            if baseline is None:
+                baseline = mean
+            result = {
+                "variant": variant,
+                "path": path,
+                "requests": len(latencies),
+                "p50_us": _percentile(latencies, 50) * 1e6,
+                "p95_us": _percentile(latencies, 95) * 1e6,
+                "p99_us": _percentile(latencies, 99) * 1e6,
+                "mean_us": mean * 1e6,
+                "overhead_us": (mean - baseline) * 1e6,
+            }
+            results.append(result)
+            print(f"{path:<8} {variant:<14} p50={result['p50_us']:8.1f}us p95={result['p95_us']:8.1f}us "
+                  f"p99={result['p99_us']:8.1f}us overhead={result['overhead_us']:8.1f}us", flush=True)
+
+    with open(args.output, "w") as f:
+        json.dump({"meta": {"timestamp": datetime.now(timezone.utc).isoformat(), "requests": args.requests,
+                            "log_level": args.log_level},
+                   "results": results}, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
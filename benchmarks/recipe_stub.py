@@ -0,0 +1,62 @@
+#
+# A stand-in for the recipe service, for running the app and its RecipeClient locally.
+#
+#   python -m benchmarks.recipe_stub --sqlite-path local_db --port 5003 --delay 0.02
+#   RECIPE_SERVICE_URL=http://127.0.0.1:5003 DATA_BACKEND=sqlite SQLITE_PATH=local_db python -m app.main
+#
+# GET /recipes/{recipe_id} answers {"recipe_id", "name"} from the recipes table of the SQLite
+# files that SQLiteDataService.seed() writes, after --delay seconds, or 404. --fail-rate makes
+# that share of calls answer 503, to exercise the client's error handling.
+#
+# create_app() can also be called in-process, through httpx.ASGITransport:
+#
+#   RecipeClient("http://recipes", transport=httpx.ASGITransport(app=create_app("local_db")))
+#
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+
+import uvicorn
+from fastapi import FastAPI, HTTPException
+
+
+def create_app(sqlite_path: str, delay: float = 0.0, fail_rate: float = 0.0) -> FastAPI:
+    connection = sqlite3.connect(os.path.join(sqlite_path, "recipes_database.db"), check_same_thread=False)
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.get("/recipes/{recipe_id}")
+    async def get_recipe(recipe_id: int):
+        app.state.calls += 1
+        if delay:
+            await asyncio.sleep(delay)
+        if fail_rate and random.random() < fail_rate:
+            raise HTTPException(status_code=503, detail="Injected failure")
+        row = connection.execute("SELECT recipe_id, name FROM recipes WHERE recipe_id = ?", [recipe_id]).fetchone()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Recipe not found")
+        return {"recipe_id": row[0], "name": row[1]}
+
+    @app.get("/stats")
+    async def stats():
+        return {"calls": app.state.calls}
+
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve recipes from local SQLite files, like the recipe service.")
+    parser.add_argument("--sqlite-path", default="local_db", help="Directory holding recipes_database.db.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5003)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds added to every call.")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of calls that answer 503.")
+    args = parser.parse_args(argv)
+    uvicorn.run(create_app(args.sqlite_path, args.delay, args.fail_rate), host=args.host, port=args.port,
+                log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
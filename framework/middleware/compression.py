@@ -0,0 +1,211 @@
+import gzip
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+
+# brotli and zstandard are optional; without them only gzip is offered.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Content types worth compressing. text/event-stream is excluded: it must not be buffered.
+_COMPRESSIBLE_TYPES = ("application/json", "application/problem+json", "application/javascript",
+                       "application/xml", "text/html", "text/plain", "text/css", "text/csv", "text/xml")
+
+
+class CompressionStats:
+    """
+    Counters of a CompressionMiddleware. ratio is compressed bytes over original bytes, for the
+    responses that were compressed; cpu_seconds is the thread CPU time spent compressing them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.compressed = 0
+        self.offloaded = 0
+        self.skipped_small = 0
+        self.skipped_incompressible = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+        self.by_encoding: Dict[str, int] = {}
+
+    def record(self, encoding: str, bytes_in: int, bytes_out: int, cpu_seconds: float, offloaded: bool) -> None:
+        with self._lock:
+            self.compressed += 1
+            self.offloaded += offloaded
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.cpu_seconds += cpu_seconds
+            self.by_encoding[encoding] = self.by_encoding.get(encoding, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "compressed": self.compressed,
+                "offloaded": self.offloaded,
+                "skipped_small": self.skipped_small,
+                "skipped_incompressible": self.skipped_incompressible,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "ratio": self.bytes_out / self.bytes_in if self.bytes_in else None,
+                "cpu_seconds": self.cpu_seconds,
+                "by_encoding": dict(self.by_encoding),
+            }
+
+
+# Shared by the middleware instances that are not given their own.
+compression_stats = CompressionStats()
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """
+    The encodings this process can produce, most preferred first.
+    """
+    return tuple(name for name, module in (("br", brotli), ("zstd", zstandard), ("gzip", gzip)) if module)
+
+
+def _parse_accept_encoding(header: str) -> Dict[str, float]:
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+class CompressionMiddleware:
+    """
+    Raw ASGI middleware that compresses responses with the best encoding the client accepts
+    (Accept-Encoding): br, then zstd, then gzip, as available.
+
+    Only complete (single-message) responses of a compressible content type are compressed;
+    streaming responses pass through unchanged. Bodies under minimum_size are left alone,
+    since the headers would cost more than the compression saves. Bodies of offload_size or
+    more are compressed on a worker thread so the event loop keeps serving other requests.
+
+    A compressed response gets Content-Encoding, Vary: Accept-Encoding and, as it is a
+    different representation, its strong ETag is made weak.
+
+    :param app: The ASGI application to wrap.
+    :param minimum_size: Smallest body, in bytes, that is compressed.
+    :param offload_size: Smallest body, in bytes, that is compressed off the event loop.
+    :param gzip_level: gzip compression level, 1-9.
+    :param brotli_quality: brotli quality, 0-11.
+    :param zstd_level: zstd compression level.
+    :param stats: Where to count. Defaults to the module's compression_stats.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, offload_size: int = 64 * 1024, gzip_level: int = 6,
+                 brotli_quality: int = 4, zstd_level: int = 3, stats: Optional[CompressionStats] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.zstd_level = zstd_level
+        self.stats = stats or compression_stats
+        self.encodings = available_encodings()
+
+    def _negotiate(self, accept_encoding: Optional[str]) -> Optional[str]:
+        if not accept_encoding:
+            return None
+        accepted = _parse_accept_encoding(accept_encoding)
+        best, best_q = None, 0.0
+        for encoding in self.encodings:
+            q = accepted.get(encoding, accepted.get("*", 0.0))
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+
+    def _encode(self, encoding: str, body: bytes) -> Tuple[bytes, float]:
+        start = time.thread_time()
+        if encoding == "br":
+            data = brotli.compress(body, quality=self.brotli_quality)
+        elif encoding == "zstd":
+            data = zstandard.ZstdCompressor(level=self.zstd_level).compress(body)
+        else:
+            data = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+        return data, time.thread_time() - start
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._negotiate(Headers(scope=scope).get("accept-encoding"))
+        start_message = None
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # Held back until the first body message shows whether to compress.
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = MutableHeaders(raw=start.setdefault("headers", []))
+            body = message.get("body", b"")
+            content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+            if (message.get("more_body", False) or content_type not in _COMPRESSIBLE_TYPES
+                    or "content-encoding" in headers or start["status"] < 200 or start["status"] in (204, 304)
+                    or "no-transform" in headers.get("cache-control", "")):
+                await send(start)
+                await send(message)
+                return
+
+            # The representation depends on Accept-Encoding even when this one is not compressed.
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is None:
+                await send(start)
+                await send(message)
+                return
+            if len(body) < self.minimum_size:
+                self.stats.skipped_small += 1
+                await send(start)
+                await send(message)
+                return
+
+            offloaded = len(body) >= self.offload_size
+            if offloaded:
+                data, cpu_seconds = await anyio.to_thread.run_sync(self._encode, encoding, body)
+            else:
+                data, cpu_seconds = self._encode(encoding, body)
+            if len(data) >= len(body):
+                self.stats.skipped_incompressible += 1
+                await send(start)
+                await send(message)
+                return
+
+            self.stats.record(encoding, len(body), len(data), cpu_seconds, offloaded)
+            headers["content-encoding"] = encoding
+            headers["content-length"] = str(len(data))
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["etag"] = "W/" + etag
+            await send(start)
+            await send({"type": "http.response.body", "body": data, "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
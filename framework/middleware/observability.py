@@ -0,0 +1,80 @@
+import logging
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# The correlation ID of the request being handled. Propagated to data-service worker threads
+# by AsyncDataService.run().
+correlation_id: ContextVar[Optional[str]] = ContextVar("correlation_id", default=None)
+
+
+def get_correlation_id() -> Optional[str]:
+    return correlation_id.get()
+
+
+class ObservabilityMiddleware:
+    """
+    Raw ASGI middleware that does, in one pass:
+
+        - Correlation ID: taken from the request header, or generated. It is stored in
+          request.state.correlation_id and the correlation_id context variable, and echoed in
+          the response header.
+        - Timing with time.perf_counter, from the request until the last body chunk is sent.
+        - One access log line per request, with method, path, status and duration_ms fields.
+          The correlation ID is added to every record by the logging pipeline.
+
+    The response is passed through message by message, so bodies are never buffered and
+    streaming responses keep streaming.
+
+    :param app: The ASGI application to wrap.
+    :param header_name: The correlation ID header.
+    :param access_logger: Logger for the access lines. Defaults to this module's logger.
+    """
+
+    def __init__(self, app, header_name: str = "X-Correlation-ID", access_logger: Optional[logging.Logger] = None):
+        self.app = app
+        self.header_name = header_name
+        self._header_key = header_name.lower().encode("latin-1")
+        self.logger = access_logger or logger
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == self._header_key:
+                request_id = value.decode("latin-1")
+                break
+        if not request_id:
+            request_id = str(uuid.uuid4())
+
+        scope.setdefault("state", {})["correlation_id"] = request_id
+        token = correlation_id.set(request_id)
+        status_code = 500
+        response_header = (self._header_key, request_id.encode("latin-1"))
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [response_header]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if self.logger.isEnabledFor(logging.INFO):
+                elapsed = time.perf_counter() - start
+                query = scope.get("query_string", b"")
+                path = scope["path"] + ("?" + query.decode("latin-1") if query else "")
+                duration_ms = round(elapsed * 1000, 2)
+                self.logger.info("%s %s %s | Time: %.2fms", scope["method"], path, status_code, duration_ms,
+                                 extra={"method": scope["method"], "path": path, "status": status_code,
+                                        "duration_ms": duration_ms})
+            correlation_id.reset(token)
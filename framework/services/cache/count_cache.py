@@ -0,0 +1,92 @@
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+class _CountEntry:
+    __slots__ = ("value", "exact", "expires_at")
+
+    def __init__(self, value: int, exact: bool, expires_at: float):
+        self.value = value
+        self.exact = exact
+        self.expires_at = expires_at
+
+
+class CountCache:
+    """
+    Cache of row counts per collection, so paginated responses do not run COUNT(*) on every
+    request.
+
+    Writers keep the cache current: inserts call adjust(), and deletes (which may cascade)
+    call invalidate(). The TTL limits how stale a count can get if rows change outside this
+    process.
+
+    In approximate mode, counts are read from table statistics (get_approximate_count() on the
+    data service) instead of being counted. This is cheap on large tables but not exact.
+
+    :param data_service: A data service implementing get_total_count() and, for approximate
+        mode, get_approximate_count().
+    :param ttl: Seconds a count is served before it is loaded again.
+    :param approximate: Use table statistics instead of COUNT(*) by default.
+    """
+
+    def __init__(self, data_service, ttl: float = 60.0, approximate: bool = False):
+        self.data_service = data_service
+        self.ttl = ttl
+        self.approximate = approximate
+        self._entries: Dict[Tuple[str, str], _CountEntry] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, database_name: str, collection_name: str, approximate: Optional[bool] = None) -> int:
+        """
+        Return the row count of a collection, from the cache if possible.
+
+        :param approximate: Overrides the cache default. An exact request is never answered
+            with an approximate count.
+        """
+        approximate = self.approximate if approximate is None else approximate
+        key = (database_name, collection_name)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > now and (entry.exact or approximate):
+                self.hits += 1
+                return entry.value
+            self.misses += 1
+
+        if approximate:
+            value = self.data_service.get_approximate_count(database_name, collection_name)
+        else:
+            value = self.data_service.get_total_count(database_name, collection_name)
+
+        with self._lock:
+            self._entries[key] = _CountEntry(value, not approximate, time.monotonic() + self.ttl)
+        return value
+
+    def adjust(self, database_name: str, collection_name: str, delta: int) -> None:
+        """
+        Apply a known change (e.g. +1 after an insert) to a cached count. Does nothing if the
+        count is not cached.
+        """
+        with self._lock:
+            entry = self._entries.get((database_name, collection_name))
+            if entry is not None:
+                entry.value = max(entry.value + delta, 0)
+
+    def invalidate(self, database_name: str, collection_name: Optional[str] = None) -> None:
+        """
+        Drop the cached count of a collection, or of every collection in the database.
+        """
+        with self._lock:
+            if collection_name is not None:
+                self._entries.pop((database_name, collection_name), None)
+            else:
+                for key in [k for k in self._entries if k[0] == database_name]:
+                    del self._entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
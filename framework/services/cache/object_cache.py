@@ -0,0 +1,139 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+
+class ObjectCache:
+    """
+    Bounded in-process cache with LRU eviction and a TTL, for single-object lookups.
+
+    Values are whatever the loader returns (e.g. row dicts); callers should not mutate them.
+    None is never cached, so lookups of missing keys always reach the loader.
+
+    get_or_load() does not store a value if any invalidation happened while it was loading,
+    so a read that races with a write cannot put the pre-write value back in the cache.
+
+    :param max_size: The maximum number of entries. The least recently used one is evicted.
+    :param ttl: Seconds an entry is served before it expires.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 300.0):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Return the cached value, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if value is None:
+            return
+        with self._lock:
+            self._put_locked(key, value)
+
+    def _put_locked(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Optional[Any]:
+        """
+        Return the cached value, or call loader() on a miss and cache what it returns.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            generation = self._generation
+        value = loader()
+        if value is not None:
+            with self._lock:
+                if self._generation == generation:
+                    self._put_locked(key, value)
+        return value
+
+    def get_many_or_load(self, keys: Iterable[Hashable],
+                         loader: Callable[[List[Hashable]], Dict[Hashable, Any]]) -> Dict[Hashable, Any]:
+        """
+        Look up many keys at once. The keys that miss are passed to a single loader() call,
+        which returns a dict of the values it found; those are cached.
+
+        :return: A dict of the keys that were found, cached or loaded.
+        """
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+            else:
+                missing.append(key)
+        if not missing:
+            return found
+
+        with self._lock:
+            generation = self._generation
+        loaded = loader(missing)
+        with self._lock:
+            if self._generation == generation:
+                for key, value in loaded.items():
+                    if value is not None:
+                        self._put_locked(key, value)
+        found.update(loaded)
+        return found
+
+    def invalidate(self, key: Hashable) -> None:
+        self.invalidate_many((key,))
+
+    def invalidate_many(self, keys: Iterable[Hashable]) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent calls: while a call for a key is in flight, other callers
+    for the same key wait for it and get its result (or exception) instead of running their
+    own. Nothing is kept once the call returns; this is not a cache.
+
+    Calls are coroutines on an event loop. Callers share the result object, so they must not
+    mutate it. forget_all() may be called from any thread.
+
+    Keys are tuples whose first item names the operation, e.g. ("get_by_key", 7,
+    "meal_plans"); coalesced calls are also counted per operation name.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+        self.calls = 0
+        self.coalesced = 0
+        self._coalesced_by_name = Counter()
+
+    async def do_async(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Return await fn(*args, **kwargs), or the result of the identical call already in flight
+        on this event loop. The call runs as its own task, so a caller that is cancelled (e.g.
+        the client disconnected) does not cancel it for the others.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self.calls += 1
+            task = self._tasks.get(key)
+            if task is not None and task.get_loop() is loop:
+                self.coalesced += 1
+                self._coalesced_by_name[key[0]] += 1
+            else:
+                task = self._tasks[key] = loop.create_task(fn(*args, **kwargs))
+                task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        with self._lock:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+
+    def forget_all(self) -> None:
+        """
+        Make later callers start new calls instead of joining the ones in flight, e.g. after a
+        write, so no caller gets a result read before the write. Callers already waiting still
+        get the in-flight results.
+        """
+        with self._lock:
+            self._tasks.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._tasks),
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "coalesced_by_operation": dict(self._coalesced_by_name),
+            }
+
+
+def _hashable(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _hashable(item)) for key, item in value.items()))
+    return value
+
+
+def call_key(name: str, args: tuple, kwargs: dict) -> Tuple:
+    """
+    The single-flight key of a call: its name and arguments, with lists and dicts made hashable.
+    """
+    return (name,) + _hashable(args) + _hashable(kwargs)
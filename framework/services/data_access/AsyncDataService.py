@@ -0,0 +1,106 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence
+
+from .BaseDataService import DataDataService
+
+
+class AsyncDataService(DataDataService):
+    """
+    Non-blocking facade over a blocking DataDataService (e.g. MySQLRDBDataService).
+
+    Every call runs on a bounded thread pool, so coroutines awaiting the database never stall
+    the event loop. An asyncio semaphore caps how many calls are in flight at once; callers
+    beyond the limit wait on the event loop rather than piling up in the executor queue.
+
+    The context holds:
+        data_service: The blocking data service to delegate to.
+        max_workers: Size of the thread pool. Should not exceed the connection pool size.
+        max_concurrency: Maximum number of calls in flight. Defaults to max_workers.
+    """
+
+    def __init__(self, context):
+        super().__init__(context)
+        self.data_service = context["data_service"]
+        self.max_workers = context.get("max_workers", 10)
+        self.max_concurrency = context.get("max_concurrency", self.max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="data-service")
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    def _get_connection(self):
+        """
+        Blocking. Returns a connection from the wrapped data service.
+        """
+        return self.data_service._get_connection()
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking callable on the executor and await its result. Context variables
+        (e.g. the request correlation ID) are propagated to the worker thread.
+        """
+        loop = asyncio.get_running_loop()
+        call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+        async with self._semaphore:
+            return await loop.run_in_executor(self._executor, call)
+
+    async def get_data_object(self, database_name: str, collection_name: str, key_field: str, key_value: Any,
+                              fields: Optional[Sequence[str]] = None):
+        return await self.run(self.data_service.get_data_object,
+                              database_name, collection_name, key_field, key_value, fields=fields)
+
+    async def get_data_objects(self, database_name: str, collection_name: str, key_field: str, keys: List[Any],
+                               chunk_size: int = 500, fields: Optional[Sequence[str]] = None) -> List[dict]:
+        return await self.run(self.data_service.get_data_objects,
+                              database_name, collection_name, key_field, keys, chunk_size=chunk_size, fields=fields)
+
+    async def get_all_data(self, database_name: str, collection_name: str, skip: int = 0, limit: int = 10,
+                           filters: Optional[dict] = None, key_field: Optional[str] = None,
+                           after: Any = None, before: Any = None, descending: bool = False,
+                           fields: Optional[Sequence[str]] = None) -> List[dict]:
+        return await self.run(self.data_service.get_all_data,
+                              database_name, collection_name, skip=skip, limit=limit, filters=filters,
+                              key_field=key_field, after=after, before=before, descending=descending,
+                              fields=fields)
+
+    async def get_total_count(self, database_name: str, collection_name: str) -> int:
+        return await self.run(self.data_service.get_total_count, database_name, collection_name)
+
+    async def get_approximate_count(self, database_name: str, collection_name: str) -> int:
+        return await self.run(self.data_service.get_approximate_count, database_name, collection_name)
+
+    async def get_max_value(self, parameter_name: str, database: str, collection: str) -> int:
+        return await self.run(self.data_service.get_max_value, parameter_name, database, collection)
+
+    async def insert_data(self, database_name: str, collection_name: str, data: dict):
+        return await self.run(self.data_service.insert_data, database_name, collection_name, data)
+
+    async def insert_many(self, database_name: str, collection_name: str, rows: List[dict], chunk_size: int = 500,
+                          report_errors: bool = False):
+        return await self.run(self.data_service.insert_many, database_name, collection_name, rows,
+                              chunk_size=chunk_size, report_errors=report_errors)
+
+    async def update_data(self, database_name: str, collection_name: str, data: dict, key_field: str, key_value: Any):
+        return await self.run(self.data_service.update_data,
+                              database_name, collection_name, data, key_field, key_value)
+
+    async def delete_data(self, database_name: str, collection_name: str, key_field: str, key_value: Any):
+        return await self.run(self.data_service.delete_data, database_name, collection_name, key_field, key_value)
+
+    async def get_daily_meal_plans_by_date(self, date: str, with_recipes: bool = True):
+        return await self.run(self.data_service.get_daily_meal_plans_by_date, date, with_recipes)
+
+    async def get_daily_meal_plans_by_date_range(self, start_date: str, end_date: str, with_recipes: bool = True):
+        return await self.run(self.data_service.get_daily_meal_plans_by_date_range, start_date, end_date,
+                              with_recipes)
+
+    async def execute_query(self, query: str, params: Optional[tuple] = None) -> List[dict]:
+        return await self.run(self.data_service.execute_query, query, params)
+
+    def close(self):
+        """
+        Wait for in-flight calls to finish and stop the worker threads.
+        """
+        self._executor.shutdown(wait=True)
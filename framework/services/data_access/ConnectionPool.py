@@ -0,0 +1,365 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+
+class PoolError(Exception):
+    """
+    Base class for connection pool errors.
+    """
+    pass
+
+
+class PoolTimeoutError(PoolError):
+    """
+    Raised when a connection could not be checked out of the pool before the timeout expired.
+    """
+    pass
+
+
+class PoolClosedError(PoolError):
+    """
+    Raised when a connection is requested from a pool that has been closed.
+    """
+    pass
+
+
+class _PoolEntry:
+    """
+    Book-keeping for one physical connection owned by the pool.
+    """
+
+    __slots__ = ("raw", "created_at", "last_used")
+
+    def __init__(self, raw):
+        now = time.monotonic()
+        self.raw = raw
+        self.created_at = now
+        self.last_used = now
+
+
+class PooledConnection:
+    """
+    Proxy for a connection checked out of a ConnectionPool. Everything is delegated to the
+    underlying DB-API connection, except close(), which returns the connection to the pool.
+    This lets existing code that calls connection.close() in a finally block use the pool
+    without changes. close() is idempotent.
+
+    If the connection is returned while a transaction started with begin() is still open,
+    the transaction is rolled back before the connection is reused.
+    """
+
+    def __init__(self, pool: "ConnectionPool", entry: _PoolEntry):
+        self._pool = pool
+        self._entry = entry
+        self._in_transaction = False
+
+    def __getattr__(self, name):
+        entry = self.__dict__.get("_entry")
+        if entry is None:
+            raise PoolError("Connection has already been returned to the pool.")
+        return getattr(entry.raw, name)
+
+    @property
+    def raw(self):
+        return self._entry.raw if self._entry else None
+
+    def begin(self):
+        self._entry.raw.begin()
+        self._in_transaction = True
+
+    def commit(self):
+        self._entry.raw.commit()
+        self._in_transaction = False
+
+    def rollback(self):
+        self._in_transaction = False
+        self._entry.raw.rollback()
+
+    def discard(self):
+        """
+        Close the physical connection instead of returning it to the pool. Use this when the
+        connection is known to be broken.
+        """
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool._release(entry, broken=True)
+
+    def close(self):
+        entry, self._entry = self._entry, None
+        if entry is None:
+            return
+        broken = False
+        if self._in_transaction:
+            self._in_transaction = False
+            try:
+                entry.raw.rollback()
+            except Exception:
+                broken = True
+        self._pool._release(entry, broken=broken)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _default_ping(raw) -> None:
+    ping = getattr(raw, "ping", None)
+    if ping is not None:
+        ping(reconnect=False)
+
+
+def _close_quietly(raw) -> None:
+    try:
+        raw.close()
+    except Exception:
+        pass
+
+
+class ConnectionPool:
+    """
+    A bounded, thread-safe pool of DB-API connections.
+
+    :param connect: Callable that opens and returns a new physical connection.
+    :param min_size: Number of connections opened by open() and kept even when idle.
+    :param max_size: Maximum number of connections open at any time (idle + in use).
+    :param timeout: Seconds acquire() waits for a free connection before raising PoolTimeoutError.
+    :param recycle: Connections older than this many seconds are closed instead of reused.
+    :param max_idle: Connections idle longer than this many seconds are closed, down to min_size.
+    :param ping_interval: Connections idle longer than this many seconds are pinged on checkout.
+        Use 0 to ping on every checkout.
+    :param ping: Callable that raises if a raw connection is no longer usable.
+    """
+
+    def __init__(self,
+                 connect: Callable[[], Any],
+                 min_size: int = 1,
+                 max_size: int = 10,
+                 timeout: float = 10.0,
+                 recycle: float = 3600.0,
+                 max_idle: float = 300.0,
+                 ping_interval: float = 5.0,
+                 ping: Optional[Callable[[Any], None]] = None):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if min_size < 0 or min_size > max_size:
+            raise ValueError("min_size must be between 0 and max_size")
+
+        self._connect = connect
+        self._ping = ping or _default_ping
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.max_idle = max_idle
+        self.ping_interval = ping_interval
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # Most recently used connections are at the right.
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+
+        self._checkouts = 0
+        self._timeouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._broken = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+
+    def open(self) -> None:
+        """
+        Open connections until the pool holds at least min_size of them.
+        """
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise PoolClosedError("Connection pool is closed.")
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                entry = _PoolEntry(self._connect())
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._created += 1
+                self._idle.append(entry)
+                self._cond.notify()
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledConnection:
+        """
+        Check out a connection, waiting up to timeout seconds for one to become free.
+
+        :param timeout: Overrides the pool timeout for this call.
+        :return: A PooledConnection. Call close() on it to return it to the pool.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        deadline = start + timeout
+
+        while True:
+            entry, stale = self._checkout(deadline, timeout)
+            for raw in stale:
+                _close_quietly(raw)
+
+            if entry is None:
+                # A slot was reserved for a new connection.
+                try:
+                    entry = _PoolEntry(self._connect())
+                except Exception:
+                    self._release_slot()
+                    raise
+                with self._cond:
+                    self._created += 1
+                break
+
+            if time.monotonic() - entry.last_used <= self.ping_interval:
+                break
+            try:
+                self._ping(entry.raw)
+                break
+            except Exception:
+                # Dead connection, drop it and try again.
+                _close_quietly(entry.raw)
+                self._release_slot(broken=True)
+
+        waited = time.perf_counter() - start
+        with self._cond:
+            self._checkouts += 1
+            self._wait_time_total += waited
+            self._wait_time_max = max(self._wait_time_max, waited)
+
+        return PooledConnection(self, entry)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """
+        Context manager that checks out a connection and always returns it to the pool.
+        """
+        conn = self.acquire(timeout=timeout)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _checkout(self, deadline: float, timeout: float):
+        """
+        Take an idle connection or reserve a slot for a new one. Returns (entry, stale) where
+        entry is None if the caller must open a new connection, and stale is a list of raw
+        connections the caller must close outside the lock.
+        """
+        stale = []
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolClosedError("Connection pool is closed.")
+
+                now = time.monotonic()
+                while self._idle:
+                    entry = self._idle.pop()
+                    if now - entry.created_at > self.recycle:
+                        self._size -= 1
+                        self._recycled += 1
+                        stale.append(entry.raw)
+                        continue
+                    self._in_use += 1
+                    return entry, stale
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    self._in_use += 1
+                    return None, stale
+
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    for raw in stale:
+                        _close_quietly(raw)
+                    raise PoolTimeoutError(
+                        f"Timed out after {timeout:.2f}s waiting for a database "
+                        f"connection; all {self.max_size} pooled connections are in use."
+                    )
+                self._cond.wait(remaining)
+
+    def _release_slot(self, broken: bool = False) -> None:
+        with self._cond:
+            self._size -= 1
+            self._in_use -= 1
+            if broken:
+                self._broken += 1
+            self._cond.notify()
+
+    def _release(self, entry: _PoolEntry, broken: bool = False) -> None:
+        now = time.monotonic()
+        stale = []
+        with self._cond:
+            self._in_use -= 1
+            if broken or self._closed or now - entry.created_at > self.recycle:
+                self._size -= 1
+                if broken:
+                    self._broken += 1
+                elif not self._closed:
+                    self._recycled += 1
+                stale.append(entry.raw)
+            else:
+                entry.last_used = now
+                self._idle.append(entry)
+                # Least recently used connections sit at the left; trim the ones idle too long.
+                while self._idle and self._size > self.min_size and now - self._idle[0].last_used > self.max_idle:
+                    self._size -= 1
+                    self._recycled += 1
+                    stale.append(self._idle.popleft().raw)
+            self._cond.notify()
+
+        for raw in stale:
+            _close_quietly(raw)
+
+    def close(self) -> None:
+        """
+        Close all idle connections and refuse new checkouts. Connections still in use are
+        closed when they are returned.
+        """
+        with self._cond:
+            self._closed = True
+            stale = [entry.raw for entry in self._idle]
+            self._size -= len(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+
+        for raw in stale:
+            _close_quietly(raw)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def stats(self) -> dict:
+        """
+        Return a snapshot of the pool state and counters.
+        """
+        with self._cond:
+            checkouts = self._checkouts
+            return {
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "checkouts": checkouts,
+                "timeouts": self._timeouts,
+                "created": self._created,
+                "recycled": self._recycled,
+                "broken": self._broken,
+                "wait_time_total": self._wait_time_total,
+                "wait_time_avg": self._wait_time_total / checkouts if checkouts else 0.0,
+                "wait_time_max": self._wait_time_max,
+            }
@@ -0,0 +1,80 @@
+import threading
+from typing import Dict, List
+
+
+class _Block:
+    """
+    The range of reserved IDs [next_value, end) held in memory for one sequence.
+    """
+
+    __slots__ = ("next_value", "end", "lock")
+
+    def __init__(self):
+        self.next_value = 0
+        self.end = 0
+        self.lock = threading.Lock()
+
+
+class IdAllocator:
+    """
+    Hands out unique integer keys with the hi/lo pattern. Blocks of IDs are reserved from a
+    sequence table through the data service's allocate_id_block() and then handed out from
+    memory, so most creates need no extra round trip to the database.
+
+    The reservation is atomic in the database, so several processes can share a sequence.
+    Each process gets its own blocks. IDs are unique and increasing within a process, but
+    processes interleave, and IDs left in a block when a process exits are never used.
+
+    :param data_service: A data service implementing allocate_id_block().
+    :param database_name: The database holding the sequence table.
+    :param block_size: The number of IDs reserved per round trip.
+    """
+
+    def __init__(self, data_service, database_name: str, block_size: int = 50):
+        if block_size < 1:
+            raise ValueError("block_size must be at least 1")
+        self.data_service = data_service
+        self.database_name = database_name
+        self.block_size = block_size
+        self._blocks: Dict[str, _Block] = {}
+        self._lock = threading.Lock()
+
+    def _get_block(self, sequence_name: str) -> _Block:
+        block = self._blocks.get(sequence_name)
+        if block is None:
+            with self._lock:
+                block = self._blocks.setdefault(sequence_name, _Block())
+        return block
+
+    def next_id(self, collection_name: str, key_field: str) -> int:
+        """
+        Return the next unused ID for a collection.
+
+        :param collection_name: The collection the ID is for. Also the sequence name.
+        :param key_field: The key column, used to seed the sequence the first time.
+        :return: A unique ID.
+        """
+        return self.next_ids(collection_name, key_field, 1)[0]
+
+    def next_ids(self, collection_name: str, key_field: str, count: int) -> List[int]:
+        """
+        Return count unused IDs for a collection, in increasing order. At most one round trip
+        to the database is made, even when count is larger than the block size.
+        """
+        block = self._get_block(collection_name)
+        ids = []
+        with block.lock:
+            take = min(count, block.end - block.next_value)
+            ids.extend(range(block.next_value, block.next_value + take))
+            block.next_value += take
+
+            missing = count - len(ids)
+            if missing:
+                size = max(self.block_size, missing)
+                first = self.data_service.allocate_id_block(
+                    self.database_name, collection_name, size, collection_name, key_field
+                )
+                ids.extend(range(first, first + missing))
+                block.next_value = first + missing
+                block.end = first + size
+        return ids
@@ -1,20 +1,120 @@
+import logging
+import threading
 import pymysql
+from contextlib import contextmanager
+from datetime import date, datetime
 from .BaseDataService import DataDataService
-from typing import Any, List, Optional
+from .ConnectionPool import ConnectionPool
+from typing import Any, List, Optional, Sequence, Tuple
 from fastapi import HTTPException
 
+logger = logging.getLogger(__name__)
+
+# Errors after which a connection cannot be trusted: the connection was lost or closed, or the
+# protocol is out of sync. Other errors (e.g. a constraint violation) leave it usable.
+CONNECTION_ERRORS = (pymysql.err.OperationalError, pymysql.err.InterfaceError)
+
+
+def _discard_if_broken(connection, error: BaseException) -> bool:
+    """
+    Discard a connection that raised one of CONNECTION_ERRORS, so the pool does not hand it
+    out again. Its close() in the caller's finally block is then a no-op.
+
+    :return: True if the connection was discarded; it must not be rolled back.
+    """
+    if connection is not None and isinstance(error, CONNECTION_ERRORS):
+        logger.warning("Discarding a broken connection: %r", error)
+        connection.discard()
+        return True
+    return False
+
+
+class _UnitOfWork:
+    """
+    The transaction bound to the current thread by MySQLRDBDataService.transaction().
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rollback_only = False
+        self.broken = False
+        self.changes = []
+        self.savepoints = 0
+
+
+class _UnitOfWorkConnection:
+    """
+    The connection handed to data-service methods that run inside a unit of work. begin(),
+    commit() and close() are left to the unit of work. rollback() marks the unit of work
+    rollback-only, so a failure that a method handled itself still undoes the transaction.
+    discard() also makes the unit of work discard the connection when it ends.
+    """
+
+    def __init__(self, uow: _UnitOfWork):
+        self._uow = uow
+
+    def __getattr__(self, name):
+        return getattr(self._uow.connection, name)
+
+    def begin(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        self._uow.rollback_only = True
+
+    def discard(self):
+        self._uow.rollback_only = True
+        self._uow.broken = True
+
+    def close(self):
+        pass
+
 
 class MySQLRDBDataService(DataDataService):
     """
     A generic data service for MySQL databases. The class implement common
     methods from BaseDataService and other methods for MySQL. More complex use cases
     can subclass, reuse methods and extend.
+
+    Connections come from a bounded ConnectionPool. The pool is configured from optional
+    context keys: pool_min_size, pool_max_size, pool_timeout, pool_recycle, pool_max_idle
+    and pool_ping_interval.
+
+    Calls made inside a transaction() block share one connection and one transaction.
     """
 
+    # The columns returned for each collection.
+    COLLECTION_COLUMNS = {
+        "meal_plans": ("meal_id", "breakfast_recipe", "lunch_recipe", "dinner_recipe"),
+        "weekly_meal_plans": ("week_plan_id", "start_date", "end_date"),
+        "daily_meal_plans": ("day_plan_id", "week_plan_id", "date", "meal_id"),
+    }
+
     def __init__(self, context):
         super().__init__(context)
-
-    def _get_connection(self):
+        self._pool = ConnectionPool(
+            self._connect,
+            min_size=context.get("pool_min_size", 1),
+            max_size=context.get("pool_max_size", 10),
+            timeout=context.get("pool_timeout", 10.0),
+            recycle=context.get("pool_recycle", 3600.0),
+            max_idle=context.get("pool_max_idle", 300.0),
+            ping_interval=context.get("pool_ping_interval", 5.0),
+        )
+        self._seeded_sequences = set()
+        # allocate_id_block() runs on a connection of its own, outside the pool.
+        self._sequence_connection = None
+        self._sequence_lock = threading.Lock()
+        self._change_listeners = []
+        self._local = threading.local()
+
+    def _connect(self):
+        """
+        Open a new physical connection. Only the pool calls this.
+        """
         connection = pymysql.connect(
             host=self.context["host"],
             port=self.context["port"],
@@ -25,6 +125,135 @@ class MySQLRDBDataService(DataDataService):
         )
         return connection
 
+    def _get_connection(self):
+        """
+        Check out a connection from the pool. Calling close() on it returns it to the pool.
+        Inside a transaction() block, return the unit of work's connection instead.
+        """
+        uow = getattr(self._local, "uow", None)
+        if uow is not None:
+            return _UnitOfWorkConnection(uow)
+        return self._pool.acquire()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Unit of work. Every data-service call made inside the block on this thread runs on one
+        pooled connection in one transaction. The transaction is committed once at the end, or
+        rolled back if the block raises or an operation in it failed. Nested blocks join the
+        outer one. Change listeners are notified only after the commit.
+
+        Yields the connection, for statements that are not covered by a data-service method.
+        """
+        uow = getattr(self._local, "uow", None)
+        if uow is not None:
+            yield _UnitOfWorkConnection(uow)
+            return
+
+        connection = self._pool.acquire()
+        uow = _UnitOfWork(connection)
+        self._local.uow = uow
+        try:
+            connection.begin()
+            yield _UnitOfWorkConnection(uow)
+            if uow.rollback_only:
+                raise HTTPException(status_code=500, detail="Transaction rolled back after a failed operation.")
+            connection.commit()
+        except BaseException:
+            if uow.broken:
+                connection.discard()
+            else:
+                try:
+                    connection.rollback()
+                except Exception:
+                    connection.discard()
+            raise
+        finally:
+            self._local.uow = None
+            connection.close()
+
+        for database_name, changes in uow.changes:
+            self._notify_changes(database_name, changes)
+
+    @contextmanager
+    def savepoint(self):
+        """
+        A savepoint in the current transaction() block. If the block raises, or an operation in
+        it failed, only the statements of the block are rolled back (and their changes are not
+        reported to the listeners); the transaction goes on and may still commit. Outside a
+        transaction() block, the block runs in a transaction of its own.
+
+        Yields the connection, as transaction() does.
+        """
+        uow = getattr(self._local, "uow", None)
+        if uow is None:
+            with self.transaction() as connection:
+                yield connection
+            return
+
+        uow.savepoints += 1
+        name = f"savepoint_{uow.savepoints}"
+        rollback_only, change_count = uow.rollback_only, len(uow.changes)
+        cursor = uow.connection.cursor()
+        cursor.execute(f"SAVEPOINT {name}")
+        try:
+            yield _UnitOfWorkConnection(uow)
+            if uow.rollback_only and not rollback_only:
+                raise HTTPException(status_code=500, detail="Savepoint rolled back after a failed operation.")
+            cursor.execute(f"RELEASE SAVEPOINT {name}")
+        except BaseException:
+            if uow.broken:
+                # The connection is gone; the whole transaction is rolled back and discarded.
+                raise
+            cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
+            cursor.execute(f"RELEASE SAVEPOINT {name}")
+            uow.rollback_only = rollback_only
+            del uow.changes[change_count:]
+            raise
+
+    def add_change_listener(self, listener) -> None:
+        """
+        Register a callable that is told about rows changed by update_data() and delete_data(),
+        including rows removed by cascading deletes. It is called after the change is committed
+        as listener(database_name, collection_name, key_field, keys).
+        """
+        self._change_listeners.append(listener)
+
+    def _notify_changes(self, database_name: str, changes: list) -> None:
+        uow = getattr(self._local, "uow", None)
+        if uow is not None:
+            # Deferred until the unit of work commits.
+            uow.changes.append((database_name, changes))
+            return
+        for collection_name, key_field, keys in changes:
+            for listener in self._change_listeners:
+                try:
+                    listener(database_name, collection_name, key_field, keys)
+                except Exception as e:
+                    logger.exception("Error in change listener: %s", e)
+
+    def open(self):
+        """
+        Open the pool's minimum number of connections ahead of the first request.
+        """
+        self._pool.open()
+
+    def get_pool_stats(self) -> dict:
+        """
+        Return connection pool statistics (size, in use, idle, checkouts, wait times, ...).
+        """
+        return self._pool.stats()
+
+    def close(self):
+        """
+        Close the connection pool and the sequence connection.
+        """
+        self._pool.close()
+        with self._sequence_lock:
+            if self._sequence_connection is not None:
+                self._sequence_connection.close()
+                self._sequence_connection = None
+
     def get_total_count(self, database_name: str, collection_name: str) -> int:
         connection = None
         try:
@@ -37,40 +266,70 @@ class MySQLRDBDataService(DataDataService):
                 return result["count"]
             return 0
         except Exception as e:
-            print(f"Error in get_total_count: {e}")
+            logger.error("Error in get_total_count: %s", e)
+            _discard_if_broken(connection, e)
+            raise e
+        finally:
+            if connection:
+                connection.close()
+
+    def get_approximate_count(self, database_name: str, collection_name: str) -> int:
+        """
+        Return the row count estimate kept in the table statistics. This reads metadata only,
+        so it is fast on large tables, but InnoDB estimates can be off by a wide margin.
+        """
+        connection = None
+        try:
+            connection = self._get_connection()
+            cursor = connection.cursor()
+            sql = ("SELECT TABLE_ROWS AS count FROM information_schema.TABLES "
+                   "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s")
+            cursor.execute(sql, [database_name, collection_name])
+            result = cursor.fetchone()
+            if result and result["count"] is not None:
+                return result["count"]
+            return 0
+        except Exception as e:
+            logger.error("Error in get_approximate_count: %s", e)
+            _discard_if_broken(connection, e)
             raise e
         finally:
             if connection:
                 connection.close()
 
-    def get_data_object(self, database_name: str, collection_name: str, key_field: str, key_value: any):
+    def _select_list(self, collection_name: str, fields: Optional[Sequence[str]] = None,
+                     required: Sequence[str] = ()) -> str:
+        """
+        The SELECT column list of a collection: all its columns, or only those in fields plus the
+        required ones (e.g. the key a caller orders or matches rows by), in table order.
+
+        :raises ValueError: If the collection or a field is unknown.
+        """
+        columns = self.COLLECTION_COLUMNS.get(collection_name)
+        if columns is None:
+            raise ValueError("Invalid collection name")
+        if fields is not None:
+            unknown = set(fields) - set(columns)
+            if unknown:
+                raise ValueError(f"Invalid fields for {collection_name}: {', '.join(sorted(unknown))}")
+            wanted = set(fields) | set(required)
+            columns = [column for column in columns if column in wanted] or [columns[0]]
+        return ", ".join(f"m.`{column}`" for column in columns)
+
+    def get_data_object(self, database_name: str, collection_name: str, key_field: str, key_value: any,
+                        fields: Optional[Sequence[str]] = None):
+        """
+        :param fields: Only select these columns. Defaults to all columns of the collection.
+        """
         connection = None
         result = None
         
         try:
-            if collection_name == "meal_plans":
-                sql_statement = f"""
-                    SELECT m.meal_id, m.breakfast_recipe, m.lunch_recipe, m.dinner_recipe
-                    FROM `{database_name}`.`{collection_name}` m
-                    WHERE m.{key_field}=%s
-                """
-                
-            elif collection_name == "weekly_meal_plans":
-                sql_statement = f"""
-                    SELECT w.week_plan_id, w.start_date, w.end_date
-                    FROM `{database_name}`.`{collection_name}` w
-                    WHERE w.{key_field}=%s
-                """
-                
-            elif collection_name == "daily_meal_plans":
-                sql_statement = f"""
-                    SELECT d.day_plan_id, d.week_plan_id, d.date, d.meal_id
-                    FROM `{database_name}`.`{collection_name}` d
-                    WHERE d.{key_field}=%s
-                """
-            
-            else:
-                raise ValueError("Invalid collection name")
+            sql_statement = (
+                f"SELECT {self._select_list(collection_name, fields)} "
+                f"FROM `{database_name}`.`{collection_name}` m "
+                f"WHERE m.`{key_field}`=%s"
+            )
 
             connection = self._get_connection()
             cursor = connection.cursor()  # Use dictionary cursor for easier row handling
@@ -78,30 +337,14 @@ class MySQLRDBDataService(DataDataService):
             row = cursor.fetchone()
 
             if row:
-                # Structure data based on the collection
-                if collection_name == "meal_plans":
-                    result = {
-                        "meal_id": row["meal_id"],
-                        "breakfast_recipe": row["breakfast_recipe"],
-                        "lunch_recipe": row["lunch_recipe"],
-                        "dinner_recipe": row["dinner_recipe"]
-                    }
-                elif collection_name == "weekly_meal_plans":
-                    result = {
-                        "week_plan_id": row["week_plan_id"],
-                        "start_date": row["start_date"].isoformat(),
-                        "end_date": row["end_date"].isoformat()
-                    }
-                elif collection_name == "daily_meal_plans":
-                    result = {
-                        "day_plan_id": row["day_plan_id"],
-                        "week_plan_id": row["week_plan_id"],
-                        "date": row["date"].isoformat(),
-                        "meal_id": row["meal_id"]
-                    }
+                result = {
+                    column: value.isoformat() if isinstance(value, (date, datetime)) else value
+                    for column, value in row.items()
+                }
 
         except Exception as e:
-            print(f"An error occurred: {e}")
+            logger.error("Error in get_data_object: %s", e)
+            _discard_if_broken(connection, e)
             if connection:
                 connection.close()
             raise
@@ -112,44 +355,95 @@ class MySQLRDBDataService(DataDataService):
         return result
 
 
-    def get_all_data(self, database_name: str, collection_name: str, skip: int = 0, limit: int = 10, filters: Optional[dict] = None) -> list[dict]:
+    def get_data_objects(self, database_name: str, collection_name: str, key_field: str, keys: List[Any],
+                         chunk_size: int = 500, fields: Optional[Sequence[str]] = None) -> List[dict]:
+        """
+        Get many data objects by key with WHERE key IN (...) queries. Large key lists are split
+        into chunks of chunk_size keys, all sent on one connection.
+
+        :param key_field: Usually a unique column. Otherwise every row matching a key is returned.
+        :param keys: The key values. Duplicates are fetched once.
+        :param chunk_size: The maximum number of keys per query.
+        :param fields: Only select these columns, and key_field. Defaults to all columns.
+        :return: The rows found, shaped like get_data_object() results, in no particular order.
+            Keys that do not exist are simply absent.
+        """
+        select_list = self._select_list(collection_name, fields, required=(key_field,))
+
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return []
+
+        connection = None
+        results = []
+        try:
+            connection = self._get_connection()
+            cursor = connection.cursor()
+            for start in range(0, len(keys), chunk_size):
+                chunk = keys[start:start + chunk_size]
+                placeholders = ", ".join(["%s"] * len(chunk))
+                sql_statement = (
+                    f"SELECT {select_list} FROM `{database_name}`.`{collection_name}` m "
+                    f"WHERE m.`{key_field}` IN ({placeholders})"
+                )
+                cursor.execute(sql_statement, chunk)
+                for row in cursor.fetchall():
+                    results.append({
+                        column: value.isoformat() if isinstance(value, (date, datetime)) else value
+                        for column, value in row.items()
+                    })
+        except Exception as e:
+            logger.error("Error in get_data_objects: %s", e)
+            _discard_if_broken(connection, e)
+            raise
+        finally:
+            if connection:
+                connection.close()
+
+        return results
+
+    def get_all_data(self, database_name: str, collection_name: str, skip: int = 0, limit: int = 10,
+                     filters: Optional[dict] = None, key_field: Optional[str] = None,
+                     after: Any = None, before: Any = None, descending: bool = False,
+                     fields: Optional[Sequence[str]] = None) -> list[dict]:
         """
         Retrieve all data objects from the specified database and collection/table with pagination,
         including related ingredients.
+
+        Pagination is by offset (skip) or, when key_field is given, by seeking on that key. Keyset
+        pages cost the same wherever they are in the table because they start from an index lookup.
+
+        :param key_field: Order rows by this unique column.
+        :param after: Only return rows whose key is greater than this value.
+        :param before: Only return rows whose key is less than this value.
+        :param descending: Order by key_field descending instead of ascending.
+        :param fields: Only select these columns, and key_field. Defaults to all columns.
         """
         connection = None
-        results = []
+        select_list = self._select_list(collection_name, fields, required=(key_field,) if key_field else ())
 
         try:
             connection = self._get_connection()
             cursor = connection.cursor()
             
 
-            if collection_name == "weekly_meal_plans":
-                mealplan_sql = (
-                    f"SELECT m.week_plan_id, m.start_date, m.end_date "
-                    f"FROM `{database_name}`.`{collection_name}` m "
-                )
-            elif collection_name == "meal_plans":
-                mealplan_sql = (
-                    f"SELECT m.meal_id, m.breakfast_recipe, m.lunch_recipe, m.dinner_recipe "
-                    f"FROM `{database_name}`.`{collection_name}` m "
-                )
-            elif collection_name == "daily_meal_plans":
-                mealplan_sql = (
-                    f"SELECT m.day_plan_id, m.week_plan_id, m.date, m.meal_id "
-                    f"FROM `{database_name}`.`{collection_name}` m "
-                )
+            mealplan_sql = f"SELECT {select_list} FROM `{database_name}`.`{collection_name}` m "
 
-            if filters:
-                filter_conditions = " AND ".join(
-                    f"{field} = %s" for field in filters.keys()
-                )
-                mealplan_sql += f"WHERE {filter_conditions} "
+            conditions = [f"m.`{field}` = %s" for field in filters.keys()] if filters else []
+            values = list(filters.values()) if filters else []
+            if key_field and after is not None:
+                conditions.append(f"m.`{key_field}` > %s")
+                values.append(after)
+            if key_field and before is not None:
+                conditions.append(f"m.`{key_field}` < %s")
+                values.append(before)
+
+            if conditions:
+                mealplan_sql += f"WHERE {' AND '.join(conditions)} "
+            if key_field:
+                mealplan_sql += f"ORDER BY m.`{key_field}` {'DESC' if descending else 'ASC'} "
 
             mealplan_sql += "LIMIT %s OFFSET %s "
-
-            values = list(filters.values()) if filters else []
             values.extend([limit, skip])
             # print(f"{mealplan_sql}",values)
 
@@ -165,15 +459,14 @@ class MySQLRDBDataService(DataDataService):
 
 
         except Exception as e:
-            print(f"Error in get_all_data: {e}")
-            if connection:
+            logger.error("Error in get_all_data: %s", e)
+            if connection and not _discard_if_broken(connection, e):
                 connection.rollback()
+            raise
         finally:
             if connection:
                 connection.close()
 
-        return results
-
     def update_data(self, database_name: str, collection_name: str, data: dict, key_field: str, key_value: any):
         """
         Update a data object in the specified database and collection/table.
@@ -189,7 +482,7 @@ class MySQLRDBDataService(DataDataService):
             
             # Handle updating logic based on collection type
             if collection_name == 'weekly_meal_plans':
-                print(data)
+                logger.debug("Updating weekly meal plan: %s", data)
                 # For weekly_meal_plans, remove unsupported fields
                 data.pop('week_plan_id', None)
 
@@ -207,79 +500,76 @@ class MySQLRDBDataService(DataDataService):
             values = list(data.values()) + [key_value]
 
             # Execute update statement
-            print("Data before SQL execution:", data)
-            print("Values before SQL execution:", values)
+            logger.debug("Update values: %s", values)
             cursor.execute(sql_statement, values)
-            print(f"Updated {collection_name} table for {key_field}={key_value}")
+            logger.debug("Updated %s table for %s=%s", collection_name, key_field, key_value)
 
             connection.commit()
-            print("Transaction committed successfully.")
+            self._notify_changes(database_name, [(collection_name, key_field, [key_value])])
 
         except Exception as e:
-            print(f"Error in update_data: {e}")
-            if connection:
+            logger.error("Error in update_data: %s", e)
+            if connection and not _discard_if_broken(connection, e):
                 connection.rollback()
-                print("Transaction rolled back due to error.")
             raise HTTPException(status_code=500, detail="Failed to update record.")
         finally:
             if connection:
                 connection.close()
-                print("Database connection closed.")
 
 
     def delete_data(self, database_name: str, collection_name: str, key_field: str, key_value: any):
         """
         Delete a data object from the specified database and collection/table,
         including any related data such as nutrition information, ingredients, or daily meal plans.
+        The record and its related data are deleted in one unit of work.
         """
 
-        connection = None
+        changes = [(collection_name, key_field, [key_value])]
         try:
-            connection = self._get_connection()
-            cursor = connection.cursor()
-            connection.begin()
-
-            # Determine related data handling based on collection name
-            if collection_name == 'weekly_meal_plans':
-                # Delete associated daily meal plans first
-                delete_daily_plans_sql = f"DELETE FROM `{database_name}`.`daily_meal_plans` WHERE `{key_field}`=%s"
-                cursor.execute(delete_daily_plans_sql, [key_value])
-                print(f"Deleted daily meal plans for week_plan_id={key_value}")
-
-            elif collection_name == 'daily_meal_plans':
-                # Delete associated meal if `meal_id` exists in `daily_meal_plans`
-                select_meal_id_sql = f"SELECT `meal_id` FROM `{database_name}`.`{collection_name}` WHERE `{key_field}`=%s"
-                cursor.execute(select_meal_id_sql, [key_value])
-                meal_id_result = cursor.fetchone()
-
-                if meal_id_result:
-                    meal_id = meal_id_result['meal_id']
-                    delete_meal_sql = f"DELETE FROM `{database_name}`.`meal_plans` WHERE `meal_id`=%s"
-                    cursor.execute(delete_meal_sql, [meal_id])
-                    print(f"Deleted meal with meal_id={meal_id}")
-
-            elif collection_name == 'meal_plans':                
-                delete_mealplan_sql = f"DELETE FROM `{database_name}`.`{collection_name}` WHERE `{key_field}`=%s"
-                cursor.execute(delete_mealplan_sql, [key_value])
-                print(f"Deleted meal plan with {key_field}={key_value}")
-            delete_main_record_sql = f"DELETE FROM `{database_name}`.`{collection_name}` WHERE `{key_field}`=%s"
-            cursor.execute(delete_main_record_sql, [key_value])
-            print(f"Deleted record with {key_field}={key_value} from {collection_name}.")
-
-            # Commit the transaction
-            connection.commit()
-            print("Transaction committed successfully.")
+            with self.transaction() as connection:
+                cursor = connection.cursor()
+
+                # Determine related data handling based on collection name
+                if collection_name == 'weekly_meal_plans':
+                    if self._change_listeners:
+                        # Collect the daily meal plans removed by the cascade for the listeners
+                        select_daily_plans_sql = f"SELECT `day_plan_id` FROM `{database_name}`.`daily_meal_plans` WHERE `{key_field}`=%s"
+                        cursor.execute(select_daily_plans_sql, [key_value])
+                        day_plan_ids = [row['day_plan_id'] for row in cursor.fetchall()]
+                        changes.append(('daily_meal_plans', 'day_plan_id', day_plan_ids))
+
+                    # Delete associated daily meal plans first
+                    delete_daily_plans_sql = f"DELETE FROM `{database_name}`.`daily_meal_plans` WHERE `{key_field}`=%s"
+                    cursor.execute(delete_daily_plans_sql, [key_value])
+                    logger.debug("Deleted daily meal plans for week_plan_id=%s", key_value)
+
+                elif collection_name == 'daily_meal_plans':
+                    # Delete associated meal if `meal_id` exists in `daily_meal_plans`
+                    select_meal_id_sql = f"SELECT `meal_id` FROM `{database_name}`.`{collection_name}` WHERE `{key_field}`=%s"
+                    cursor.execute(select_meal_id_sql, [key_value])
+                    meal_id_result = cursor.fetchone()
+
+                    if meal_id_result:
+                        meal_id = meal_id_result['meal_id']
+                        delete_meal_sql = f"DELETE FROM `{database_name}`.`meal_plans` WHERE `meal_id`=%s"
+                        cursor.execute(delete_meal_sql, [meal_id])
+                        logger.debug("Deleted meal with meal_id=%s", meal_id)
+                        changes.append(('meal_plans', 'meal_id', [meal_id]))
+
+                elif collection_name == 'meal_plans':
+                    delete_mealplan_sql = f"DELETE FROM `{database_name}`.`{collection_name}` WHERE `{key_field}`=%s"
+                    cursor.execute(delete_mealplan_sql, [key_value])
+                    logger.debug("Deleted meal plan with %s=%s", key_field, key_value)
+                delete_main_record_sql = f"DELETE FROM `{database_name}`.`{collection_name}` WHERE `{key_field}`=%s"
+                cursor.execute(delete_main_record_sql, [key_value])
+                logger.debug("Deleted record with %s=%s from %s.", key_field, key_value, collection_name)
+
+                # Listeners are notified once the unit of work commits
+                self._notify_changes(database_name, changes)
 
         except Exception as e:
-            print(f"Error in delete_data: {e}")
-            if connection:
-                connection.rollback()
-                print("Transaction rolled back due to error.")
+            logger.error("Error in delete_data: %s", e)
             raise HTTPException(status_code=500, detail="Failed to delete record.")
-        finally:
-            if connection:
-                connection.close()
-                print("Database connection closed.")
 
 
     def get_max_value(self, parameter_name: str, database: str, collection: str) -> int:
@@ -299,7 +589,7 @@ class MySQLRDBDataService(DataDataService):
 
             # SQL query to find the maximum value
             query = f"SELECT MAX(`{parameter_name}`) FROM `{database}`.`{collection}`"
-            print("query: ", query)
+            logger.debug("Executing query: %s", query)
             cursor.execute(query)
             max_value_row = cursor.fetchone()
             # print("max val row: ", max_value_row)
@@ -309,13 +599,80 @@ class MySQLRDBDataService(DataDataService):
             return max_value
 
         except Exception as e:
-            print(f"Error while fetching max value for {parameter_name}: {e}")
+            logger.error("Error while fetching max value for %s: %s", parameter_name, e)
+            _discard_if_broken(connection, e)
             raise HTTPException(status_code=500, detail=f"Failed to fetch max value for {parameter_name}.")
         finally:
             # Ensure the connection is closed
             if connection:
                 connection.close()
 
+    def allocate_id_block(self, database_name: str, sequence_name: str, block_size: int,
+                          seed_collection: str, seed_field: str) -> int:
+        """
+        Atomically reserve block_size consecutive IDs from the `id_sequences` table and return
+        the first one. The reservation is a single UPDATE on one row, so it is safe across
+        threads and across processes. The first time a sequence is used in a process, the
+        table is created if needed and the sequence is seeded from MAX(seed_field) + 1.
+
+        :param database_name: The database holding the sequence table and seed collection.
+        :param sequence_name: The name of the sequence, usually the collection name.
+        :param block_size: The number of IDs to reserve.
+        :param seed_collection: The collection used to seed a new sequence.
+        :param seed_field: The key column used to seed a new sequence.
+        :return: The first ID of the reserved block.
+        """
+        with self._sequence_lock:
+            try:
+                # A dedicated autocommit connection, not a pooled one. A reservation must be
+                # committed at once, even inside a unit of work, or a rollback would hand the
+                # same IDs out again. And a transaction that needs IDs while every pooled
+                # connection is taken must not wait for one.
+                if self._sequence_connection is None:
+                    self._sequence_connection = self._connect()
+                return self._allocate_id_block(self._sequence_connection.cursor(), database_name, sequence_name,
+                                               block_size, seed_collection, seed_field)
+            except Exception as e:
+                logger.error("Error while allocating ids for %s: %s", sequence_name, e)
+                if isinstance(e, CONNECTION_ERRORS) and self._sequence_connection is not None:
+                    try:
+                        self._sequence_connection.close()
+                    except Exception:
+                        pass
+                    self._sequence_connection = None
+                raise HTTPException(status_code=500, detail=f"Failed to allocate ids for {sequence_name}.")
+
+    def _allocate_id_block(self, cursor, database_name: str, sequence_name: str, block_size: int,
+                           seed_collection: str, seed_field: str) -> int:
+        """
+        Reserve the block with the given cursor. See allocate_id_block().
+        """
+        if (database_name, sequence_name) not in self._seeded_sequences:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS `{database_name}`.`id_sequences` ("
+                f"`name` VARCHAR(64) NOT NULL PRIMARY KEY, `next_value` BIGINT NOT NULL)"
+            )
+            cursor.execute(
+                f"INSERT IGNORE INTO `{database_name}`.`id_sequences` (`name`, `next_value`) "
+                f"SELECT %s, COALESCE(MAX(`{seed_field}`), 0) + 1 FROM `{database_name}`.`{seed_collection}`",
+                [sequence_name]
+            )
+            self._seeded_sequences.add((database_name, sequence_name))
+
+        # LAST_INSERT_ID(expr) makes the new value readable on this connection only.
+        cursor.execute(
+            f"UPDATE `{database_name}`.`id_sequences` "
+            f"SET `next_value` = LAST_INSERT_ID(`next_value` + %s) WHERE `name` = %s",
+            [block_size, sequence_name]
+        )
+        if cursor.rowcount == 0:
+            # The sequence row disappeared; seed it again on the next call.
+            self._seeded_sequences.discard((database_name, sequence_name))
+            raise ValueError(f"Sequence {sequence_name} does not exist")
+        cursor.execute("SELECT LAST_INSERT_ID() AS next_value")
+        row = cursor.fetchone()
+        return row["next_value"] - block_size
+
     def insert_data(self, database_name: str, collection_name: str, data: dict):
         """
         Insert a new meal plan into the database.
@@ -332,7 +689,7 @@ class MySQLRDBDataService(DataDataService):
             # Prepare the fields and values for insertion
             fields = ', '.join([f"`{field}`" for field in data.keys()])
             placeholders = ', '.join(['%s'] * len(data))
-            print("DATA: ", data)
+            logger.debug("Inserting into %s: %s", collection_name, data)
             insert_sql = f"INSERT INTO `{database_name}`.`{collection_name}` ({fields}) VALUES ({placeholders})"
             # Execute the insertion
             cursor.execute(insert_sql, list(data.values()))
@@ -347,23 +704,96 @@ class MySQLRDBDataService(DataDataService):
             return data
 
         except pymysql.err.IntegrityError as e:
-            print(f"Integrity error in insert_data: {e}")
+            logger.warning("Integrity error in insert_data: %s", e)
             if connection:
                 connection.rollback()
-                print("Transaction rolled back due to integrity error.")
             raise HTTPException(status_code=400, detail="Integrity error: Invalid meal plan data.")
         except Exception as e:
-            print(f"Error in insert_data: {e}")
-            if connection:
+            logger.error("Error in insert_data: %s", e)
+            if connection and not _discard_if_broken(connection, e):
                 connection.rollback()
-                print("Transaction rolled back due to error.")
             raise HTTPException(status_code=500, detail="Failed to insert meal plan.")
         finally:
             if connection:
                 connection.close()
-                print("Database connection closed.")
 
 
+    def insert_many(self, database_name: str, collection_name: str, rows: List[dict], chunk_size: int = 500,
+                    report_errors: bool = False) -> Tuple[List[dict], List[dict]]:
+        """
+        Insert many rows in one transaction, using multi-row INSERT statements of up to
+        chunk_size rows.
+
+        :param rows: The rows to insert. Columns missing from a row are inserted as NULL.
+        :param chunk_size: The maximum number of rows per INSERT statement.
+        :param report_errors: If False, any failure rolls back every row and raises. If True,
+            rows that fail are skipped and reported, and the other rows are committed. Chunks
+            are still inserted in one statement; only a chunk that fails is retried row by row.
+        :return: A tuple (inserted, errors). inserted are the rows written, in input order.
+            errors is a list of {"index": ..., "error": ...} for the rows that failed.
+        """
+        rows = [{k: v for k, v in row.items() if k != 'links'} for row in rows]
+        if not rows:
+            return [], []
+
+        # Use the same column list for every row so that each chunk is a single statement.
+        fields = list(dict.fromkeys(field for row in rows for field in row))
+        field_list = ', '.join(f"`{field}`" for field in fields)
+        placeholders = ', '.join(['%s'] * len(fields))
+        insert_sql = f"INSERT INTO `{database_name}`.`{collection_name}` ({field_list}) VALUES ({placeholders})"
+        values = [[row.get(field) for field in fields] for row in rows]
+
+        connection = None
+        inserted = []
+        errors = []
+        try:
+            connection = self._get_connection()
+            cursor = connection.cursor()
+            connection.begin()
+
+            for start in range(0, len(rows), chunk_size):
+                chunk = range(start, min(start + chunk_size, len(rows)))
+                if not report_errors:
+                    cursor.executemany(insert_sql, values[chunk.start:chunk.stop])
+                    inserted.extend(rows[chunk.start:chunk.stop])
+                    continue
+
+                cursor.execute("SAVEPOINT insert_chunk")
+                try:
+                    cursor.executemany(insert_sql, values[chunk.start:chunk.stop])
+                    inserted.extend(rows[chunk.start:chunk.stop])
+                    continue
+                except Exception:
+                    cursor.execute("ROLLBACK TO SAVEPOINT insert_chunk")
+
+                # Find the rows that fail by inserting the chunk one row at a time.
+                for index in chunk:
+                    cursor.execute("SAVEPOINT insert_row")
+                    try:
+                        cursor.execute(insert_sql, values[index])
+                        inserted.append(rows[index])
+                    except Exception as e:
+                        cursor.execute("ROLLBACK TO SAVEPOINT insert_row")
+                        errors.append({"index": index, "error": str(e)})
+
+            connection.commit()
+            logger.debug("Inserted %d rows into %s, %d failed.", len(inserted), collection_name, len(errors))
+            return inserted, errors
+
+        except pymysql.err.IntegrityError as e:
+            logger.warning("Integrity error in insert_many: %s", e)
+            if connection:
+                connection.rollback()
+            raise HTTPException(status_code=400, detail="Integrity error: Invalid meal plan data.")
+        except Exception as e:
+            logger.error("Error in insert_many: %s", e)
+            if connection and not _discard_if_broken(connection, e):
+                connection.rollback()
+            raise HTTPException(status_code=500, detail="Failed to insert meal plans.")
+        finally:
+            if connection:
+                connection.close()
+
     # def get_daily_meal_plans_by_date(self, date: str):
     #     """
     #     Fetches daily meal plans based on the weekly plan ID.
@@ -420,79 +850,111 @@ class MySQLRDBDataService(DataDataService):
     #     cursor.close()
     #     return combined_results
 
-    def get_daily_meal_plans_by_date(self, date: str):
+    # Daily meal plans joined with their week, meal plan and recipe names, in one round trip.
+    DAILY_MEAL_PLANS_WITH_RECIPES_SQL = """
+        SELECT
+            dmp.day_plan_id,
+            dmp.date,
+            dmp.meal_id,
+            wmp.week_plan_id,
+            wmp.start_date,
+            wmp.end_date,
+            recipes_breakfast.name AS breakfast_recipe,
+            recipes_lunch.name AS lunch_recipe,
+            recipes_dinner.name AS dinner_recipe,
+            recipes_breakfast.recipe_id AS breakfast_id,
+            recipes_lunch.recipe_id AS lunch_id,
+            recipes_dinner.recipe_id AS dinner_id
+        FROM mealplan_db.daily_meal_plans dmp
+        JOIN mealplan_db.weekly_meal_plans wmp ON wmp.week_plan_id = dmp.week_plan_id
+        LEFT JOIN mealplan_db.meal_plans mp ON mp.meal_id = dmp.meal_id
+        LEFT JOIN recipes_database.recipes AS recipes_breakfast ON mp.breakfast_recipe = recipes_breakfast.recipe_id
+        LEFT JOIN recipes_database.recipes AS recipes_lunch ON mp.lunch_recipe = recipes_lunch.recipe_id
+        LEFT JOIN recipes_database.recipes AS recipes_dinner ON mp.dinner_recipe = recipes_dinner.recipe_id
+        WHERE dmp.date BETWEEN %s AND %s
+        ORDER BY dmp.date, dmp.day_plan_id
+    """
+
+    # The same without the recipes join, for callers that get recipe names from the recipe
+    # service: the recipe names are NULL and the IDs are those of the meal plan.
+    DAILY_MEAL_PLANS_SQL = """
+        SELECT
+            dmp.day_plan_id,
+            dmp.date,
+            dmp.meal_id,
+            wmp.week_plan_id,
+            wmp.start_date,
+            wmp.end_date,
+            NULL AS breakfast_recipe,
+            NULL AS lunch_recipe,
+            NULL AS dinner_recipe,
+            mp.breakfast_recipe AS breakfast_id,
+            mp.lunch_recipe AS lunch_id,
+            mp.dinner_recipe AS dinner_id
+        FROM mealplan_db.daily_meal_plans dmp
+        JOIN mealplan_db.weekly_meal_plans wmp ON wmp.week_plan_id = dmp.week_plan_id
+        LEFT JOIN mealplan_db.meal_plans mp ON mp.meal_id = dmp.meal_id
+        WHERE dmp.date BETWEEN %s AND %s
+        ORDER BY dmp.date, dmp.day_plan_id
+    """
+
+    @staticmethod
+    def _shape_daily_meal_plans(rows: List[dict]) -> dict:
+        """
+        Split joined rows into the response shape the frontend expects. The three lists are
+        aligned: entry i of each describes the same daily meal plan.
+        """
+        return {
+            "weekly_meal_plan": [
+                {"week_plan_id": row["week_plan_id"], "start_date": row["start_date"], "end_date": row["end_date"]}
+                for row in rows
+            ],
+            "meals": [
+                {
+                    "date": row["date"],
+                    "meal_id": row["meal_id"],
+                    "breakfast_recipe": row["breakfast_recipe"],
+                    "lunch_recipe": row["lunch_recipe"],
+                    "dinner_recipe": row["dinner_recipe"],
+                    "breakfast_id": row["breakfast_id"],
+                    "lunch_id": row["lunch_id"],
+                    "dinner_id": row["dinner_id"]
+                }
+                for row in rows
+            ],
+            "daily_mealplan": [{"day_plan_id": row["day_plan_id"]} for row in rows]
+        }
+
+    def get_daily_meal_plans_by_date(self, date: str, with_recipes: bool = True):
         """
         Fetches daily meal plans based on the date.
         """
-        connection = self._get_connection()  # Ensure the connection includes a default database
-        cursor = connection.cursor()
+        return self.get_daily_meal_plans_by_date_range(date, date, with_recipes)
+
+    def get_daily_meal_plans_by_date_range(self, start_date: str, end_date: str, with_recipes: bool = True):
+        """
+        Fetches the daily meal plans between two dates (inclusive), with their weekly plan and
+        recipe names, in a single query.
 
+        :param with_recipes: Join the recipes database for the recipe names. Otherwise the names
+            are None and the recipe IDs come from the meal plans.
+        :return: {"weekly_meal_plan": [...], "meals": [...], "daily_mealplan": [...]}, ordered by date.
+        """
+        connection = None
         try:
-            # Query 1: Fetch weekly meal plan information
-            query1 = """
-            SELECT wmp.*
-            FROM mealplan_db.weekly_meal_plans wmp
-            JOIN mealplan_db.daily_meal_plans dmp ON wmp.week_plan_id = dmp.week_plan_id
-            WHERE dmp.date = %s;
-            """
-            cursor.execute(query1, (date,))
-            weekly_meal_plans = cursor.fetchall()
-
-            # Get column names and convert to dict
-            weekly_column_names = [column[0] for column in cursor.description]
-            weekly_results = [dict(zip(weekly_column_names, row)) for row in weekly_meal_plans]
-
-            # Query 2: Fetch meals with recipes
-            query2 = """
-            SELECT
-                dmp.date,
-                dmp.meal_id,
-                recipes_breakfast.name AS breakfast_recipe,
-                recipes_lunch.name AS lunch_recipe,
-                recipes_dinner.name AS dinner_recipe,
-                recipes_breakfast.recipe_id as breakfast_id,
-                recipes_lunch.recipe_id as lunch_id,
-                recipes_dinner.recipe_id as dinner_id
-            FROM mealplan_db.meal_plans
-            JOIN mealplan_db.daily_meal_plans dmp ON dmp.meal_id = meal_plans.meal_id
-            LEFT JOIN recipes_database.recipes AS recipes_breakfast ON meal_plans.breakfast_recipe = recipes_breakfast.recipe_id
-            LEFT JOIN recipes_database.recipes AS recipes_lunch ON meal_plans.lunch_recipe = recipes_lunch.recipe_id
-            LEFT JOIN recipes_database.recipes AS recipes_dinner ON meal_plans.dinner_recipe = recipes_dinner.recipe_id
-            WHERE dmp.date = %s;
-            """
-            cursor.execute(query2, (date,))
-            meals = cursor.fetchall()
-
-            # Get column names and convert to dict
-            meals_column_names = [column[0] for column in cursor.description]
-            meals_results = [dict(zip(meals_column_names, row)) for row in meals]
-
-            query3 = """
-            SELECT day_plan_id 
-            FROM mealplan_db.daily_meal_plans
-            WHERE date = %s;
-            """
-            cursor.execute(query3, (date,))
-            all_mealplandb_data = cursor.fetchall()
-            print("Mealplan mealplan: ", all_mealplandb_data)
-
-            combined_results = {
-                "weekly_meal_plan": weekly_meal_plans,
-                "meals": meals,
-                "daily_mealplan": all_mealplandb_data
-            }
-            return combined_results
-
-            # Return as a tuple to match Angular app's expected format
-            # return [weekly_results, meals_results]
+            connection = self._get_connection()
+            cursor = connection.cursor()
+            sql_statement = self.DAILY_MEAL_PLANS_WITH_RECIPES_SQL if with_recipes else self.DAILY_MEAL_PLANS_SQL
+            cursor.execute(sql_statement, (start_date, end_date))
+            return self._shape_daily_meal_plans(cursor.fetchall())
 
         except Exception as e:
-            connection.rollback()
-            print(f"Error in get_daily_meal_plans_by_date: {e}")
+            logger.error("Error in get_daily_meal_plans_by_date_range: %s", e)
+            _discard_if_broken(connection, e)
             raise HTTPException(status_code=500, detail="Failed to fetch daily meal plans.")
         finally:
-            cursor.close()
-            connection.close()
+            if connection:
+                connection.close()
 
     def execute_query(self, query: str, params: Optional[tuple] = None) -> List[dict]:
         """
@@ -502,12 +964,13 @@ class MySQLRDBDataService(DataDataService):
         try:
             connection = self._get_connection()
             cursor = connection.cursor()
-            print(f"Executing query: {query} with params: {params}")  # Debugging
+            logger.debug("Executing query: %s with params: %s", query, params)
             cursor.execute(query, params or ())
             result = cursor.fetchall()
             return result
         except Exception as e:
-            print(f"Error executing query: {e}")  # Debugging
+            logger.error("Error executing query: %s", e)
+            _discard_if_broken(connection, e)
             raise HTTPException(status_code=500, detail="Failed to execute query.")
         finally:
             if connection:
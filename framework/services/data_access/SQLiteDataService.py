@@ -0,0 +1,320 @@
+import logging
+import math
+import os
+import random
+import sqlite3
+from datetime import date, timedelta
+from typing import Iterator, List
+
+import pymysql
+from fastapi import HTTPException
+
+from .MySQLRDBDataService import MySQLRDBDataService
+
+logger = logging.getLogger(__name__)
+
+
+# DATE columns come back as datetime.date, as they do from MySQL.
+sqlite3.register_converter("DATE", lambda value: date.fromisoformat(value.decode()))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+
+
+SCHEMA = {
+    "mealplan_db": """
+        CREATE TABLE IF NOT EXISTS mealplan_db.meal_plans (
+            meal_id INTEGER PRIMARY KEY,
+            breakfast_recipe INTEGER,
+            lunch_recipe INTEGER,
+            dinner_recipe INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS mealplan_db.weekly_meal_plans (
+            week_plan_id INTEGER PRIMARY KEY,
+            start_date DATE NOT NULL,
+            end_date DATE NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS mealplan_db.daily_meal_plans (
+            day_plan_id INTEGER PRIMARY KEY,
+            week_plan_id INTEGER REFERENCES weekly_meal_plans (week_plan_id) ON DELETE CASCADE,
+            date DATE NOT NULL,
+            meal_id INTEGER REFERENCES meal_plans (meal_id) ON DELETE CASCADE
+        );
+        CREATE INDEX IF NOT EXISTS mealplan_db.weekly_meal_plans_dates ON weekly_meal_plans (start_date, end_date);
+        CREATE INDEX IF NOT EXISTS mealplan_db.daily_meal_plans_date ON daily_meal_plans (date);
+        CREATE INDEX IF NOT EXISTS mealplan_db.daily_meal_plans_week ON daily_meal_plans (week_plan_id);
+        CREATE INDEX IF NOT EXISTS mealplan_db.daily_meal_plans_meal ON daily_meal_plans (meal_id);
+    """,
+    "recipes_database": """
+        CREATE TABLE IF NOT EXISTS recipes_database.recipes (
+            recipe_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL
+        );
+    """,
+}
+
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+class _SQLiteCursor:
+    """
+    Makes a sqlite3 cursor look like a pymysql DictCursor: %s placeholders, dict rows and
+    pymysql IntegrityError, so MySQLRDBDataService code runs unchanged.
+    """
+
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+
+    def execute(self, query: str, params=None):
+        try:
+            self._cursor.execute(query.replace("%s", "?"), list(params or ()))
+        except sqlite3.IntegrityError as e:
+            raise pymysql.err.IntegrityError(0, str(e)) from e
+        return self._cursor.rowcount
+
+    def executemany(self, query: str, seq_of_params):
+        try:
+            self._cursor.executemany(query.replace("%s", "?"), seq_of_params)
+        except sqlite3.IntegrityError as e:
+            raise pymysql.err.IntegrityError(0, str(e)) from e
+        return self._cursor.rowcount
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class _SQLiteConnection:
+    """
+    A sqlite3 connection with every database file of the service attached under its MySQL
+    database name, and the pymysql connection methods MySQLRDBDataService uses.
+    """
+
+    def __init__(self, path: str, databases, busy_timeout: float):
+        self._connection = sqlite3.connect(":memory:", timeout=busy_timeout, isolation_level=None,
+                                           detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+        self._connection.row_factory = _dict_row
+        for database_name in databases:
+            self._connection.execute("ATTACH DATABASE ? AS " + database_name,
+                                     [os.path.join(path, f"{database_name}.db")])
+            self._connection.execute(f"PRAGMA {database_name}.journal_mode = WAL")
+            self._connection.execute(f"PRAGMA {database_name}.synchronous = NORMAL")
+        self._connection.execute("PRAGMA foreign_keys = ON")
+
+    def cursor(self):
+        return _SQLiteCursor(self._connection.cursor())
+
+    def begin(self):
+        # Take the write lock up front. A deferred transaction that reads first and writes later
+        # fails instead of waiting if another connection committed in between.
+        self._connection.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        if self._connection.in_transaction:
+            self._connection.execute("COMMIT")
+
+    def rollback(self):
+        if self._connection.in_transaction:
+            self._connection.execute("ROLLBACK")
+
+    def ping(self, reconnect=False):
+        self._connection.execute("SELECT 1")
+
+    def close(self):
+        self._connection.close()
+
+
+class SQLiteDataService(MySQLRDBDataService):
+    """
+    MySQLRDBDataService against local SQLite files, for benchmarks and offline runs. Every
+    MySQL database becomes one file in a directory, attached under the same name, so the SQL
+    of MySQLRDBDataService and MealplanResource runs unchanged. The tables are created if
+    they do not exist.
+
+    The context holds:
+        path: Directory of the database files. Created if missing.
+        databases: The databases to attach. Defaults to mealplan_db and recipes_database.
+        busy_timeout: Seconds a writer waits for the write lock. Defaults to 10.
+        and the pool_* keys of MySQLRDBDataService.
+
+    SQLite allows one writer per file at a time. Transactions take the write lock in begin(),
+    so concurrent writes queue instead of failing.
+    """
+
+    def __init__(self, context):
+        context = dict(context, host=None, port=None, user=None, password=None)
+        super().__init__(context)
+        self.path = context.get("path", "local_db")
+        self.databases = tuple(context.get("databases", SCHEMA.keys()))
+        self.busy_timeout = context.get("busy_timeout", 10.0)
+
+        os.makedirs(self.path, exist_ok=True)
+        self.create_schema()
+
+    def _connect(self):
+        return _SQLiteConnection(self.path, self.databases, self.busy_timeout)
+
+    def create_schema(self):
+        """
+        Create the tables and indexes that do not exist yet.
+        """
+        connection = _SQLiteConnection(self.path, self.databases, self.busy_timeout)
+        try:
+            for database_name in self.databases:
+                if database_name in SCHEMA:
+                    connection._connection.executescript(SCHEMA[database_name])
+        finally:
+            connection.close()
+
+    def get_approximate_count(self, database_name: str, collection_name: str) -> int:
+        """
+        Return the largest rowid, which is the row count when keys are dense. It is read from
+        the end of the table index, so it costs the same on any table size.
+        """
+        result = self.execute_query(f"SELECT MAX(rowid) AS count FROM `{database_name}`.`{collection_name}`")
+        return result[0]["count"] or 0
+
+    def allocate_id_block(self, database_name: str, sequence_name: str, block_size: int,
+                          seed_collection: str, seed_field: str) -> int:
+        """
+        Reserve block_size consecutive IDs, as in MySQLRDBDataService.
+
+        The sequences live in a file of their own (id_sequences.db), written on a dedicated
+        connection in single autocommit statements. That keeps reservations out of any open
+        transaction, and a transaction holding the write lock on the data files never blocks one.
+        """
+        with self._sequence_lock:
+            try:
+                if self._sequence_connection is None:
+                    connection = sqlite3.connect(os.path.join(self.path, "id_sequences.db"),
+                                                 timeout=self.busy_timeout, isolation_level=None,
+                                                 check_same_thread=False)
+                    connection.execute("PRAGMA journal_mode = WAL")
+                    connection.execute(
+                        "CREATE TABLE IF NOT EXISTS id_sequences (name TEXT PRIMARY KEY, next_value INTEGER NOT NULL)")
+                    connection.execute("ATTACH DATABASE ? AS " + database_name,
+                                       [os.path.join(self.path, f"{database_name}.db")])
+                    self._sequence_connection = connection
+                connection = self._sequence_connection
+
+                if (database_name, sequence_name) not in self._seeded_sequences:
+                    connection.execute(
+                        f"INSERT OR IGNORE INTO id_sequences (name, next_value) "
+                        f"SELECT ?, COALESCE(MAX(`{seed_field}`), 0) + 1 FROM `{database_name}`.`{seed_collection}`",
+                        [sequence_name])
+                    self._seeded_sequences.add((database_name, sequence_name))
+
+                row = connection.execute(
+                    "UPDATE id_sequences SET next_value = next_value + ? WHERE name = ? RETURNING next_value",
+                    [block_size, sequence_name]).fetchone()
+                if row is None:
+                    self._seeded_sequences.discard((database_name, sequence_name))
+                    raise ValueError(f"Unknown ID sequence: {sequence_name}")
+                return row[0] - block_size
+            except Exception as e:
+                logger.error("Error in allocate_id_block: %s", e)
+                raise HTTPException(status_code=500, detail="Failed to allocate IDs.")
+
+    def delete_data(self, database_name: str, collection_name: str, key_field: str, key_value: any):
+        """
+        Delete as in MySQLRDBDataService. Here the meal_id foreign key of daily_meal_plans
+        cascades, so deleting a meal plan, directly or through one of its days, also deletes
+        the days that refer to it. Those are reported to the change listeners as well.
+        """
+        with self.transaction() as connection:
+            if self._change_listeners and collection_name in ("meal_plans", "daily_meal_plans"):
+                if collection_name == "meal_plans":
+                    sql = f"SELECT `day_plan_id` FROM `{database_name}`.`daily_meal_plans` WHERE `meal_id`=%s"
+                else:
+                    sql = (f"SELECT d.`day_plan_id` FROM `{database_name}`.`daily_meal_plans` d "
+                           f"JOIN `{database_name}`.`daily_meal_plans` m ON m.`meal_id` = d.`meal_id` "
+                           f"WHERE m.`{key_field}`=%s")
+                cursor = connection.cursor()
+                cursor.execute(sql, [key_value])
+                day_plan_ids = [row["day_plan_id"] for row in cursor.fetchall()]
+                if day_plan_ids:
+                    # Sent once the unit of work commits
+                    self._notify_changes(database_name, [("daily_meal_plans", "day_plan_id", day_plan_ids)])
+            super().delete_data(database_name, collection_name, key_field, key_value)
+
+    def seed(self, meal_plans: int, days: int = 365, recipes: int = 1000, start_date: str = "2024-01-01",
+             batch_size: int = 10000, rng_seed: int = 0) -> dict:
+        """
+        Fill empty tables with generated data. One daily meal plan is created per meal plan,
+        spread evenly over days consecutive days, and one weekly meal plan per 7 days. Rows
+        are generated lazily and written in batches, so millions of rows fit in constant memory.
+        Tables that already have rows are left as they are, so seeding again is a no-op.
+
+        :param meal_plans: Number of meal plans, and of daily meal plans.
+        :param days: Number of distinct dates.
+        :param recipes: Number of recipes the meal plans draw from.
+        :param start_date: The first date, YYYY-MM-DD.
+        :param batch_size: Rows per executemany call and per transaction.
+        :param rng_seed: Seed for the recipe choices, so runs are reproducible.
+        :return: The number of rows written per table, 0 for the tables that were skipped.
+        """
+        rng = random.Random(rng_seed)
+        first_day = date.fromisoformat(start_date)
+        weeks = math.ceil(days / 7)
+        per_day = math.ceil(meal_plans / days)
+
+        def recipe_rows() -> Iterator[tuple]:
+            for recipe_id in range(1, recipes + 1):
+                yield recipe_id, f"Recipe {recipe_id}"
+
+        def meal_plan_rows() -> Iterator[tuple]:
+            for meal_id in range(1, meal_plans + 1):
+                yield meal_id, rng.randint(1, recipes), rng.randint(1, recipes), rng.randint(1, recipes)
+
+        def weekly_rows() -> Iterator[tuple]:
+            for week in range(weeks):
+                start = first_day + timedelta(days=7 * week)
+                yield week + 1, start.isoformat(), (start + timedelta(days=6)).isoformat()
+
+        def daily_rows() -> Iterator[tuple]:
+            for day_plan_id in range(1, meal_plans + 1):
+                offset = (day_plan_id - 1) // per_day
+                yield (day_plan_id, offset // 7 + 1,
+                       (first_day + timedelta(days=offset)).isoformat(), day_plan_id)
+
+        tables = [
+            ("recipes_database", "recipes", 2, recipe_rows()),
+            ("mealplan_db", "meal_plans", 4, meal_plan_rows()),
+            ("mealplan_db", "weekly_meal_plans", 3, weekly_rows()),
+            ("mealplan_db", "daily_meal_plans", 4, daily_rows()),
+        ]
+
+        counts = {}
+        connection = _SQLiteConnection(self.path, self.databases, self.busy_timeout)
+        try:
+            raw = connection._connection
+            raw.execute("PRAGMA foreign_keys = OFF")
+            for database_name, collection_name, width, rows in tables:
+                if raw.execute(f"SELECT 1 FROM `{database_name}`.`{collection_name}` LIMIT 1").fetchone():
+                    counts[collection_name] = 0
+                    continue
+                raw.execute(f"PRAGMA {database_name}.synchronous = OFF")
+                placeholders = ", ".join(["?"] * width)
+                sql = f"INSERT INTO `{database_name}`.`{collection_name}` VALUES ({placeholders})"
+                count = 0
+                while True:
+                    batch = _take(rows, batch_size)
+                    if not batch:
+                        break
+                    raw.execute("BEGIN")
+                    raw.executemany(sql, batch)
+                    raw.execute("COMMIT")
+                    count += len(batch)
+                raw.execute(f"ANALYZE {database_name}")
+                counts[collection_name] = count
+        finally:
+            connection.close()
+        return counts
+
+
+def _take(rows: Iterator[tuple], count: int) -> List[tuple]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == count:
+            break
+    return batch
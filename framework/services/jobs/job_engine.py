@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .job_store import SQLiteJobStore, RUNNING, COMPLETED, FAILED, FINISHED
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFullError(Exception):
+    """
+    Raised by submit() when the queue already holds max_queue jobs.
+    """
+    pass
+
+
+class JobEngineClosedError(Exception):
+    """
+    Raised by submit() after close().
+    """
+    pass
+
+
+class JobEngine:
+    """
+    Runs coroutine jobs on a fixed number of asyncio workers, with a bounded queue in front.
+    Status and results are written to a job store, so any worker process can answer a poll.
+    Store calls block, so they run in threads (asyncio.to_thread), never on the event loop.
+
+    The workers start on the first submit(), on the running event loop.
+
+    wait() returns as soon as a job changes status: jobs run by this process signal an
+    asyncio.Event; jobs run by another process are re-read from the store every
+    remote_poll_interval seconds.
+
+    :param store: Where job status and results are kept.
+    :param workers: Number of jobs run at the same time.
+    :param max_queue: Number of jobs that may wait for a worker. submit() raises
+        JobQueueFullError beyond it, so callers can push back (HTTP 429).
+    :param purge_interval: Minimum seconds between purges of expired jobs.
+    :param remote_poll_interval: Seconds between store reads when waiting on another process's job.
+    """
+
+    def __init__(self, store: SQLiteJobStore, workers: int = 4, max_queue: int = 100,
+                 purge_interval: float = 60.0, remote_poll_interval: float = 0.5):
+        self.store = store
+        self.workers = workers
+        self.max_queue = max_queue
+        self.purge_interval = purge_interval
+        self.remote_poll_interval = remote_poll_interval
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self._pending = set()
+        # Jobs being written to the store by submit(), which count against max_queue.
+        self._submitting = 0
+        # Set when the job changes status, then replaced, for jobs run by this process.
+        self._events: Dict[str, asyncio.Event] = {}
+        self._running = 0
+        self._closed = False
+        self._last_purge = time.monotonic()
+
+        self._submitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._failed = 0
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # First use, or a new event loop (e.g. the application was restarted in-process).
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def submit(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> str:
+        """
+        Queue fn(*args, **kwargs) and return the new job ID.
+
+        :raises JobQueueFullError: If max_queue jobs are already waiting.
+        """
+        if self._closed:
+            raise JobEngineClosedError("The job engine is closed.")
+        self._ensure_started()
+        if self._queue.qsize() + self._submitting >= self.max_queue:
+            self._rejected += 1
+            raise JobQueueFullError(f"{self.max_queue} jobs are already waiting.")
+
+        job_id = uuid.uuid4().hex
+        self._submitting += 1
+        try:
+            await asyncio.to_thread(self.store.create, job_id)
+        finally:
+            self._submitting -= 1
+        self._queue.put_nowait((job_id, fn, args, kwargs))
+        self._pending.add(job_id)
+        self._events[job_id] = asyncio.Event()
+        self._submitted += 1
+
+        if time.monotonic() - self._last_purge > self.purge_interval:
+            self._last_purge = time.monotonic()
+            await asyncio.to_thread(self.store.purge_expired)
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        """
+        Return the job (see SQLiteJobStore.get), or None if it is unknown or expired.
+        """
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def wait(self, job_id: str, timeout: float, status: Optional[str] = None) -> Optional[dict]:
+        """
+        Wait until the job's status is no longer status, or until it finishes if status is None,
+        then return the job. Returns the job as it is after timeout seconds, or None if it is
+        unknown or expired.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            job = await self.get(job_id)
+            if job is None or job["status"] in FINISHED:
+                return job
+            if status is not None and job["status"] != status:
+                return job
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return job
+            event = self._events.get(job_id)
+            if event is None:
+                await asyncio.sleep(min(remaining, self.remote_poll_interval))
+                continue
+            try:
+                await asyncio.wait_for(event.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    def _notify(self, job_id: str, finished: bool = False) -> None:
+        event = self._events.pop(job_id, None) if finished else self._events.get(job_id)
+        if event is not None:
+            event.set()
+            if not finished:
+                self._events[job_id] = asyncio.Event()
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, fn, args, kwargs = await self._queue.get()
+            self._running += 1
+            try:
+                await asyncio.to_thread(self.store.update, job_id, RUNNING)
+                self._notify(job_id)
+                result = await fn(*args, **kwargs)
+                await asyncio.to_thread(self.store.update, job_id, COMPLETED, result=result)
+                self._completed += 1
+            except asyncio.CancelledError:
+                # Only on shutdown, when the default executor may already be gone.
+                self.store.update(job_id, FAILED, error="The job was cancelled.")
+                self._failed += 1
+                raise
+            except Exception as e:
+                logger.exception("Job %s failed: %s", job_id, e)
+                await asyncio.to_thread(self.store.update, job_id, FAILED, error=str(e))
+                self._failed += 1
+            finally:
+                self._running -= 1
+                self._pending.discard(job_id)
+                self._notify(job_id, finished=True)
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": self._running,
+            "submitted": self._submitted,
+            "rejected": self._rejected,
+            "completed": self._completed,
+            "failed": self._failed,
+        }
+
+    def close(self) -> None:
+        """
+        Stop the workers and mark unfinished jobs as failed. May be called from any thread.
+        """
+        self._closed = True
+        loop, tasks = self._loop, self._tasks
+        self._tasks = []
+        if loop is not None and not loop.is_closed():
+            for task in tasks:
+                loop.call_soon_threadsafe(task.cancel)
+        self.store.fail_unfinished(list(self._pending), "The server shut down before the job finished.")
+        self._pending.clear()
+        events, self._events = self._events, {}
+        if loop is not None and not loop.is_closed():
+            for event in events.values():
+                loop.call_soon_threadsafe(event.set)
@@ -0,0 +1,116 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Job states.
+QUEUED = "queued"
+RUNNING = "in-progress"
+COMPLETED = "completed"
+FAILED = "failed"
+
+FINISHED = (COMPLETED, FAILED)
+
+
+class SQLiteJobStore:
+    """
+    Job status and results in a local SQLite file, so every worker process on the host sees
+    every job. Each write pushes the job's expiry ttl seconds ahead; expired jobs are invisible
+    to get() and removed by purge_expired().
+
+    Lookups are primary-key reads on a WAL database, but a write waits up to busy_timeout
+    seconds while another process holds the write lock, so calls are blocking: JobEngine runs
+    them in worker threads, off the event loop.
+
+    :param path: The database file. Its directory is created if missing.
+    :param ttl: Seconds a job is kept after its last update.
+    :param busy_timeout: Seconds a call waits for another process's write to finish.
+    """
+
+    def __init__(self, path: str, ttl: float = 3600.0, busy_timeout: float = 1.0):
+        self.path = path
+        self.ttl = ttl
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, result TEXT, error TEXT, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL, expires_at REAL NOT NULL)")
+        connection.execute("CREATE INDEX IF NOT EXISTS jobs_expires_at ON jobs (expires_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections may not be shared between threads; keep one per thread.
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def create(self, job_id: str, status: str = QUEUED) -> None:
+        now = time.time()
+        self._connection().execute(
+            "INSERT INTO jobs (id, status, created_at, updated_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+            [job_id, status, now, now, now + self.ttl])
+
+    def update(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        now = time.time()
+        self._connection().execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ?, expires_at = ? WHERE id = ?",
+            [status, json.dumps(result, default=str) if result is not None else None, error, now, now + self.ttl,
+             job_id])
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """
+        Return the job as a dict (id, status, result, error, created_at, updated_at), or None if
+        it does not exist or has expired.
+        """
+        row = self._connection().execute(
+            "SELECT id, status, result, error, created_at, updated_at FROM jobs WHERE id = ? AND expires_at > ?",
+            [job_id, time.time()]).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row[0],
+            "status": row[1],
+            "result": json.loads(row[2]) if row[2] is not None else None,
+            "error": row[3],
+            "created_at": row[4],
+            "updated_at": row[5],
+        }
+
+    def fail_unfinished(self, job_ids, error: str) -> None:
+        """
+        Mark the jobs that have not finished as failed.
+        """
+        now = time.time()
+        self._connection().executemany(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ?, expires_at = ? "
+            "WHERE id = ? AND status NOT IN (?, ?)",
+            [(FAILED, error, now, now + self.ttl, job_id) + FINISHED for job_id in job_ids])
+
+    def purge_expired(self) -> int:
+        """
+        Delete expired jobs. Returns how many were deleted.
+        """
+        return self._connection().execute("DELETE FROM jobs WHERE expires_at <= ?", [time.time()]).rowcount
+
+    def close(self) -> None:
+        """
+        Close the calling thread's connection. Other threads' connections close when the
+        threads exit.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
@@ -1,22 +1,123 @@
 #
-# Placeholder for implementing the service factory and service locator patterns.
+# Service factory and service locator.
 #
 # https://medium.com/javarevisited/service-locator-factory-pattern-7bb9e835b709
 #
-from abc import ABC, abstractmethod
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
 
-# TODO -- Implement the framework.
-#
+logger = logging.getLogger(__name__)
+
+
+class _Provider:
+    """
+    How to build, warm up and shut down one registered service.
+    """
+
+    __slots__ = ("name", "create", "warm", "close")
+
+    def __init__(self, name: str, create: Callable[[], Any],
+                 warm: Optional[Callable[[Any], None]] = None,
+                 close: Optional[Callable[[Any], None]] = None):
+        self.name = name
+        self.create = create
+        self.warm = warm
+        self.close = close
+
+
+class BaseServiceFactory:
+    """
+    Registry of lifecycle-managed singletons.
+
+    Subclasses register a provider per service name with register(). Each service is created
+    once, on startup() or on first use, and then shared. get_service() is a dict read once the
+    service exists. shutdown() closes the services in reverse creation order.
 
+    Every subclass has its own registry.
+    """
 
-class BaseServiceFactory(ABC):
+    _providers: Dict[str, _Provider] = {}
+    _services: Dict[str, Any] = {}
+    _created: List[str] = []
+    _lock = threading.RLock()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._providers = {}
+        cls._services = {}
+        cls._created = []
+        cls._lock = threading.RLock()
 
     def __init__(self):
         pass
 
     @classmethod
-    @abstractmethod
+    def register(cls, service_name: str, create: Callable[[], Any],
+                 warm: Optional[Callable[[Any], None]] = None,
+                 close: Optional[Callable[[Any], None]] = None) -> None:
+        """
+        Register how to build a service.
+
+        :param service_name: The name passed to get_service().
+        :param create: Returns the service. May call get_service() for its dependencies.
+        :param warm: Called with the service on startup(), e.g. to open connections or prime caches.
+        :param close: Called with the service on shutdown().
+        """
+        with cls._lock:
+            cls._providers[service_name] = _Provider(service_name, create, warm, close)
+
+    @classmethod
     def get_service(cls, service_name):
-        raise NotImplementedError()
+        service = cls._services.get(service_name)
+        if service is None:
+            service = cls._create(service_name)
+        return service
 
+    @classmethod
+    def _create(cls, service_name):
+        with cls._lock:
+            service = cls._services.get(service_name)
+            if service is None:
+                provider = cls._providers.get(service_name)
+                if provider is None:
+                    return None
+                service = provider.create()
+                cls._services[service_name] = service
+                cls._created.append(service_name)
+            return service
+
+    @classmethod
+    def startup(cls) -> None:
+        """
+        Create every registered service and warm it up. A service whose warm-up fails is kept
+        and logged, so the application still starts when, e.g., the database is briefly down.
+        """
+        with cls._lock:
+            providers = list(cls._providers.values())
+        for provider in providers:
+            service = cls.get_service(provider.name)
+            if provider.warm is None:
+                continue
+            try:
+                provider.warm(service)
+            except Exception as e:
+                logger.warning("Warm-up of %s failed: %s", provider.name, e)
 
+    @classmethod
+    def shutdown(cls) -> None:
+        """
+        Close the services, dependants before their dependencies, and empty the registry so a
+        later get_service() builds new ones.
+        """
+        with cls._lock:
+            created, cls._created = cls._created, []
+            services, cls._services = cls._services, {}
+        for service_name in reversed(created):
+            provider = cls._providers.get(service_name)
+            if provider is None or provider.close is None:
+                continue
+            try:
+                provider.close(services[service_name])
+            except Exception as e:
+                logger.warning("Shutdown of %s failed: %s", service_name, e)
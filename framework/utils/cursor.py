@@ -0,0 +1,43 @@
+import base64
+import json
+from typing import Any, Tuple
+
+# Cursor directions.
+NEXT = "next"
+PREV = "prev"
+LAST = "last"
+
+_DIRECTIONS = (NEXT, PREV, LAST)
+
+
+def encode_cursor(direction: str, key: Any = None) -> str:
+    """
+    Encode a keyset pagination position as an opaque, URL-safe token.
+
+    :param direction: NEXT (rows after key), PREV (rows before key) or LAST (the final page).
+    :param key: The key of the row the page starts after / ends before. Unused for LAST.
+    :return: The token.
+    """
+    if direction not in _DIRECTIONS:
+        raise ValueError(f"Invalid cursor direction: {direction}")
+    payload = json.dumps({"d": direction, "k": key}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str) -> Tuple[str, Any]:
+    """
+    Decode a token produced by encode_cursor().
+
+    :param token: The opaque token.
+    :return: A tuple (direction, key).
+    :raises ValueError: If the token is malformed.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction, key = payload["d"], payload["k"]
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {token}") from e
+    if direction not in _DIRECTIONS or (key is None and direction != LAST):
+        raise ValueError(f"Invalid cursor: {token}")
+    return direction, key
@@ -0,0 +1,40 @@
+import hashlib
+import json
+from typing import Any, Optional
+
+
+def compute_etag(value: Any) -> str:
+    """
+    A strong ETag for a value: a hash of its canonical JSON. Values that are not JSON types
+    (e.g. dates) hash by their str().
+
+    :param value: A row dict, a list of them, or bytes of an encoded body.
+    :return: The quoted ETag, e.g. '"3f2a..."'.
+    """
+    if isinstance(value, bytes):
+        data = value
+    else:
+        data = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str).encode()
+    return '"' + hashlib.blake2b(data, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches etag, using the weak comparison that RFC 9110
+    prescribes for If-None-Match.
+
+    :param if_none_match: The header value, e.g. '"a", W/"b"' or '*'. None if absent.
+    :param etag: The current ETag of the resource.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
@@ -0,0 +1,15 @@
+from typing import Any
+
+import pydantic_core
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse that encodes with pydantic-core's serializer, in one pass. It takes models,
+    row dicts, lists of either, and dates and datetimes as ISO strings, so a handler can
+    return rows and models without jsonable_encoder() or response_model validation.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content)
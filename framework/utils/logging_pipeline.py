@@ -0,0 +1,182 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, TextIO
+
+from framework.middleware.observability import get_correlation_id
+
+# Attributes every LogRecord has. Anything else was passed with extra= and goes into the JSON.
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime",
+                                                                                  "correlation_id"}
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["_NonBlockingQueueHandler"] = None
+_lock = threading.Lock()
+
+
+class CorrelationIdFilter(logging.Filter):
+    """
+    Stamp records with the correlation ID of the current request. Must run on the thread that
+    logs, before the record is queued.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = get_correlation_id()
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of DEBUG records. Records at INFO and above always pass.
+
+    :param rate: Fraction of DEBUG records kept, between 0 and 1.
+    """
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or self.rate >= 1.0 or random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: timestamp, level, logger, message, correlation_id, the fields
+    passed with extra=, and the formatted exception if there is one.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "correlation_id": getattr(record, "correlation_id", None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler over a bounded queue that drops records instead of blocking when the writer
+    falls behind. The number of dropped records is kept in dropped.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments into the message here, so the writer thread never touches
+        # objects that may change after the call. The formatter runs on the writer thread.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _parse_levels(value: str) -> Dict[str, str]:
+    """
+    Parse "app.resources=DEBUG,framework.services=WARNING" into a dict.
+    """
+    levels = {}
+    for item in value.split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(level: Optional[str] = None, json_format: Optional[bool] = None,
+                      levels: Optional[Dict[str, str]] = None, debug_sample_rate: Optional[float] = None,
+                      queue_size: int = 10000, stream: Optional[TextIO] = None) -> None:
+    """
+    Route all logging through a bounded queue to a background writer thread, so logging calls
+    on the request path never wait on stdout. Calling it again replaces the configuration.
+
+    Arguments left as None are read from the environment:
+        LOG_LEVEL: Root level. Defaults to INFO.
+        LOG_FORMAT: json (the default) or text.
+        LOG_LEVELS: Per-logger levels, e.g. "framework.services.data_access=DEBUG,httpx=WARNING".
+        LOG_DEBUG_SAMPLE_RATE: Fraction of DEBUG records kept. Defaults to 1.
+
+    :param queue_size: Records held for the writer. Records beyond it are dropped.
+    :param stream: Where the writer writes. Defaults to stdout.
+    """
+    global _listener, _queue_handler
+
+    level = level or os.environ.get("LOG_LEVEL", "INFO")
+    if json_format is None:
+        json_format = os.environ.get("LOG_FORMAT", "json").lower() == "json"
+    if levels is None:
+        levels = _parse_levels(os.environ.get("LOG_LEVELS", ""))
+    if debug_sample_rate is None:
+        debug_sample_rate = float(os.environ.get("LOG_DEBUG_SAMPLE_RATE", 1.0))
+
+    writer = logging.StreamHandler(stream or sys.stdout)
+    if json_format:
+        writer.setFormatter(JsonFormatter())
+    else:
+        writer.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s [%(correlation_id)s] %(message)s"))
+
+    handler = _NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+    handler.addFilter(DebugSamplingFilter(debug_sample_rate))
+    handler.addFilter(CorrelationIdFilter())
+
+    with _lock:
+        shutdown_logging()
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(handler)
+        root.setLevel(level.upper())
+        for name, logger_level in levels.items():
+            logging.getLogger(name).setLevel(logger_level)
+
+        _listener = QueueListener(handler.queue, writer, respect_handler_level=True)
+        _listener.start()
+        _queue_handler = handler
+
+
+def shutdown_logging() -> None:
+    """
+    Write the queued records and stop the writer thread.
+    """
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+def dropped_records() -> int:
+    """
+    Number of records dropped because the queue was full.
+    """
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+atexit.register(shutdown_logging)
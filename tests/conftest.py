@@ -0,0 +1,47 @@
+#
+# The tests run against SQLiteDataService, in a fresh directory per test, so they need no
+# MySQL server. The services are built by ServiceFactory from the environment, as in the app.
+#
+import pytest
+from fastapi.testclient import TestClient
+
+# As in the app, the resource is imported before the service factory that registers it.
+from app.resources.mealplan_resource import MealplanResource  # noqa: F401
+from app.services.service_factory import ServiceFactory
+
+
+@pytest.fixture
+def service_env(tmp_path, monkeypatch):
+    """
+    Point the services at SQLite files under tmp_path. Tests may set more variables (e.g.
+    DB_POOL_MAX_SIZE) before asking for a service; they are shut down after the test.
+    """
+    monkeypatch.setenv("DATA_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "db"))
+    monkeypatch.setenv("JOB_STORE_PATH", str(tmp_path / "jobs.db"))
+    monkeypatch.delenv("RECIPE_SERVICE_URL", raising=False)
+    yield monkeypatch
+    ServiceFactory.shutdown()
+
+
+@pytest.fixture
+def data_service(service_env):
+    return ServiceFactory.get_service("MealplanResourceDataService")
+
+
+@pytest.fixture
+def resource(service_env):
+    return ServiceFactory.get_service("MealplanResource")
+
+
+@pytest.fixture
+def client(service_env, tmp_path):
+    """
+    A TestClient of the app on the SQLite services, seeded with 30 meal plans and daily plans.
+    """
+    # app.main writes openapi.json to the working directory when it is first imported.
+    service_env.chdir(tmp_path)
+    from app.main import app
+    ServiceFactory.get_service("MealplanResourceDataService").seed(meal_plans=30, days=14, recipes=10)
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,71 @@
+def _create_meal_plan(breakfast_recipe=1):
+    return {"method": "POST", "path": "/mealplans",
+            "body": {"meal_id": 0, "breakfast_recipe": breakfast_recipe, "lunch_recipe": 2, "dinner_recipe": 3}}
+
+
+def test_atomic_batch_rolls_back_every_operation(client):
+    response = client.post("/batch", json={"operations": [
+        _create_meal_plan(),
+        {"method": "PUT", "path": "/mealplans/1", "body": {"meal_id": 1, "breakfast_recipe": 77}},
+        # There is no meal plan 999 for the day to refer to.
+        {"method": "POST", "path": "/daily-mealplans",
+         "body": {"day_plan_id": 0, "week_plan_id": 0, "date": "2030-01-01", "meal_id": 999}},
+        {"method": "DELETE", "path": "/mealplans/2"},
+    ]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["committed"] is False
+    assert [result["status"] for result in body["results"]] == [424, 424, 400, 424]
+
+    assert client.get("/mealplans/1").json()["breakfast_recipe"] != 77
+    assert client.get("/mealplans/2").status_code == 200
+    assert client.get("/mealplans", params={"ids": "31"}).json()["missing"] == [31]
+
+
+def test_best_effort_batch_commits_the_operations_that_succeed(client):
+    response = client.post("/batch", json={"atomic": False, "operations": [
+        _create_meal_plan(),
+        {"method": "PUT", "path": "/mealplans/999", "body": {"meal_id": 999, "breakfast_recipe": 77}},
+        {"method": "PUT", "path": "/mealplans/1", "body": {"meal_id": 1, "breakfast_recipe": 77}},
+    ]})
+
+    body = response.json()
+    assert body["committed"] is True
+    assert [result["status"] for result in body["results"]] == [201, 404, 200]
+    created = body["results"][0]["body"]["meal_id"]
+    assert client.get(f"/mealplans/{created}").status_code == 200
+    assert client.get("/mealplans/1").json()["breakfast_recipe"] == 77
+
+
+def test_batch_with_an_invalid_operation_is_not_run(client):
+    response = client.post("/batch", json={"operations": [
+        {"method": "PUT", "path": "/mealplans/1", "body": {"meal_id": 1, "breakfast_recipe": 77}},
+        {"method": "PATCH", "path": "/mealplans/1"},
+    ]})
+
+    body = response.json()
+    assert body["committed"] is False
+    assert [result["status"] for result in body["results"]] == [424, 400]
+    assert client.get("/mealplans/1").json()["breakfast_recipe"] != 77
+
+
+def test_batch_creates_a_daily_plan_and_its_week(client):
+    response = client.post("/batch", json={"operations": [
+        {"method": "POST", "path": "/daily-mealplans",
+         "body": {"day_plan_id": 0, "week_plan_id": 0, "date": "2030-06-03", "meal_id": 3}},
+        {"method": "DELETE", "path": "/daily-mealplans/1"},
+    ]})
+
+    body = response.json()
+    assert body["committed"] is True
+    assert [result["status"] for result in body["results"]] == [201, 200]
+    day = body["results"][0]["body"]
+    assert client.get(f"/daily-mealplans/{day['day_plan_id']}").json()["week_plan_id"] == day["week_plan_id"]
+    assert client.get(f"/weekly-mealplans/{day['week_plan_id']}").json()["start_date"] == "2030-06-03"
+
+
+def test_batch_with_too_many_operations_is_rejected(client):
+    operations = [{"method": "DELETE", "path": "/mealplans/1"}] * 1001
+
+    assert client.post("/batch", json={"operations": operations}).status_code == 400
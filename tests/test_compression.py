@@ -0,0 +1,84 @@
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from framework.middleware.compression import CompressionMiddleware, CompressionStats
+from framework.utils.etag import compute_etag, etag_matches
+
+BIG = {"items": [{"meal_id": i, "lunch_recipe": i % 7} for i in range(200)]}
+
+
+def _client(stats=None, **options):
+    app = FastAPI()
+
+    @app.get("/big")
+    async def big(request: Request):
+        response = Response(content=str(BIG).encode(), media_type="application/json")
+        response.headers["ETag"] = compute_etag(BIG)
+        if etag_matches(request.headers.get("if-none-match"), response.headers["ETag"]):
+            return Response(status_code=304, headers={"ETag": response.headers["ETag"]})
+        return response
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    app.add_middleware(CompressionMiddleware, stats=stats or CompressionStats(), **options)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("accept_encoding, encoding", [
+    ("gzip, deflate, br, zstd", "br"),
+    ("gzip;q=0.5, zstd;q=0.8", "zstd"),
+    ("br;q=0, *", "zstd"),
+    ("gzip;q=0", None),
+    ("identity", None),
+    ("", None),
+])
+def test_the_best_accepted_encoding_is_chosen(accept_encoding, encoding):
+    middleware = CompressionMiddleware(None)
+    middleware.encodings = ("br", "zstd", "gzip")
+
+    assert middleware._negotiate(accept_encoding) == encoding
+
+
+def test_large_json_is_compressed_and_its_etag_made_weak():
+    stats = CompressionStats()
+    response = _client(stats).get("/big", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.headers["ETag"] == "W/" + compute_etag(BIG)
+    assert response.content == str(BIG).encode()
+    assert stats.stats()["compressed"] == 1
+    assert stats.stats()["ratio"] < 1
+
+
+def test_weak_etag_of_a_compressed_response_revalidates():
+    client = _client()
+    etag = client.get("/big", headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+
+    response = client.get("/big", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert "Content-Encoding" not in response.headers
+
+
+def test_small_and_unaccepted_responses_are_sent_as_is():
+    stats = CompressionStats()
+    client = _client(stats)
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    identity = client.get("/big", headers={"Accept-Encoding": "identity"})
+
+    assert "Content-Encoding" not in small.headers
+    assert "Content-Encoding" not in identity.headers
+    assert identity.headers["ETag"] == compute_etag(BIG)
+    assert identity.headers["Vary"] == "Accept-Encoding"
+    assert stats.stats()["skipped_small"] == 1
+
+
+def test_large_bodies_are_compressed_off_the_event_loop():
+    stats = CompressionStats()
+    _client(stats, offload_size=1024).get("/big", headers={"Accept-Encoding": "gzip"})
+
+    assert stats.stats()["offloaded"] == 1
@@ -0,0 +1,64 @@
+import pytest
+
+from framework.services.data_access.ConnectionPool import ConnectionPool, PoolTimeoutError
+
+
+class _Connection:
+    def __init__(self):
+        self.closed = False
+        self.rolled_back = False
+
+    def begin(self):
+        pass
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        self.closed = True
+
+
+def test_acquire_times_out_when_pool_is_exhausted():
+    pool = ConnectionPool(_Connection, min_size=0, max_size=1, timeout=0.05)
+    held = pool.acquire()
+
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    assert pool.stats()["timeouts"] == 1
+
+    held.close()
+    pool.acquire().close()
+
+
+def test_closed_connection_is_reused():
+    pool = ConnectionPool(_Connection, min_size=0, max_size=2)
+    connection = pool.acquire()
+    raw = connection.raw
+    connection.close()
+
+    assert pool.acquire().raw is raw
+    assert pool.stats()["created"] == 1
+
+
+def test_discarded_connection_is_closed_and_replaced():
+    pool = ConnectionPool(_Connection, min_size=0, max_size=1, timeout=0.05)
+    connection = pool.acquire()
+    raw = connection.raw
+    connection.discard()
+    connection.close()
+
+    assert raw.closed
+    replacement = pool.acquire()
+    assert replacement.raw is not raw
+    stats = pool.stats()
+    assert (stats["broken"], stats["created"], stats["size"]) == (1, 2, 1)
+
+
+def test_open_transaction_is_rolled_back_on_close():
+    pool = ConnectionPool(_Connection, min_size=0, max_size=1)
+    connection = pool.acquire()
+    raw = connection.raw
+    connection.begin()
+    connection.close()
+
+    assert raw.rolled_back and not raw.closed
@@ -0,0 +1,86 @@
+from framework.services.cache.count_cache import CountCache
+
+
+class _FakeCounts:
+    def __init__(self, exact=100, approximate=98):
+        self.exact = exact
+        self.approximate = approximate
+        self.queries = []
+
+    def get_total_count(self, database_name, collection_name):
+        self.queries.append(("exact", collection_name))
+        return self.exact
+
+    def get_approximate_count(self, database_name, collection_name):
+        self.queries.append(("approximate", collection_name))
+        return self.approximate
+
+
+def test_counts_are_cached_per_collection():
+    counts = _FakeCounts()
+    cache = CountCache(counts)
+
+    assert cache.get("mealplan_db", "meal_plans") == 100
+    assert cache.get("mealplan_db", "meal_plans") == 100
+    assert cache.get("mealplan_db", "daily_meal_plans") == 100
+
+    assert counts.queries == [("exact", "meal_plans"), ("exact", "daily_meal_plans")]
+    assert cache.stats() == {"entries": 2, "hits": 1, "misses": 2}
+
+
+def test_adjust_keeps_the_cached_count_current():
+    counts = _FakeCounts()
+    cache = CountCache(counts)
+    cache.adjust("mealplan_db", "meal_plans", 5)  # Not cached yet: nothing to adjust
+    cache.get("mealplan_db", "meal_plans")
+
+    cache.adjust("mealplan_db", "meal_plans", 3)
+    assert cache.get("mealplan_db", "meal_plans") == 103
+    cache.adjust("mealplan_db", "meal_plans", -500)
+    assert cache.get("mealplan_db", "meal_plans") == 0
+    assert len(counts.queries) == 1
+
+
+def test_invalidate_reloads_the_count():
+    counts = _FakeCounts()
+    cache = CountCache(counts)
+    cache.get("mealplan_db", "meal_plans")
+    cache.get("mealplan_db", "weekly_meal_plans")
+
+    counts.exact = 90
+    cache.invalidate("mealplan_db", "meal_plans")
+    assert cache.get("mealplan_db", "meal_plans") == 90
+    assert cache.get("mealplan_db", "weekly_meal_plans") == 100
+
+    cache.invalidate("mealplan_db")
+    assert cache.get("mealplan_db", "weekly_meal_plans") == 90
+
+
+def test_expired_counts_are_reloaded():
+    counts = _FakeCounts()
+    cache = CountCache(counts, ttl=0)
+
+    cache.get("mealplan_db", "meal_plans")
+    cache.get("mealplan_db", "meal_plans")
+
+    assert len(counts.queries) == 2
+
+
+def test_exact_requests_are_not_answered_with_approximate_counts():
+    counts = _FakeCounts()
+    cache = CountCache(counts, approximate=True)
+
+    assert cache.get("mealplan_db", "meal_plans") == 98
+    assert cache.get("mealplan_db", "meal_plans", approximate=False) == 100
+    # An exact count also answers approximate requests.
+    assert cache.get("mealplan_db", "meal_plans") == 100
+    assert counts.queries == [("approximate", "meal_plans"), ("exact", "meal_plans")]
+
+
+def test_list_responses_use_the_cached_total(client):
+    before = client.get("/mealplans", params={"skip": 20, "limit": 10}).json()
+    client.post("/mealplans", json={"meal_id": 0, "breakfast_recipe": 1, "lunch_recipe": 2, "dinner_recipe": 3})
+    after = client.get("/mealplans", params={"skip": 20, "limit": 10}).json()
+
+    assert "next" not in before["links"]
+    assert after["links"]["next"]["href"].endswith("skip=30&limit=10")
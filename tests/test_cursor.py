@@ -0,0 +1,59 @@
+import pytest
+
+from framework.utils.cursor import encode_cursor, decode_cursor, NEXT, PREV, LAST
+
+
+@pytest.mark.parametrize("direction, key", [(NEXT, 10), (PREV, 1), (NEXT, "2024-01-01"), (LAST, None)])
+def test_cursor_round_trip(direction, key):
+    token = encode_cursor(direction, key)
+    assert "=" not in token
+    assert decode_cursor(token) == (direction, key)
+
+
+@pytest.mark.parametrize("token", ["", "not a cursor", encode_cursor(LAST)[:-2] + "!!"])
+def test_malformed_cursor_is_rejected(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+
+def test_cursor_without_key_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(NEXT))
+
+
+def test_invalid_direction_is_rejected():
+    with pytest.raises(ValueError):
+        encode_cursor("sideways", 1)
+
+
+def test_pages_follow_their_cursors(client):
+    first = client.get("/mealplans", params={"limit": 10, "cursor": ""}).json()
+    second = client.get("/mealplans", params={"limit": 10, "cursor": first["links"]["next"]["cursor"]}).json()
+    back = client.get("/mealplans", params={"limit": 10, "cursor": second["links"]["previous"]["cursor"]}).json()
+
+    assert [item["meal_id"] for item in first["items"]] == list(range(1, 11))
+    assert [item["meal_id"] for item in second["items"]] == list(range(11, 21))
+    assert back["items"] == first["items"]
+
+    assert client.get(first["links"]["first"]["href"]).json() == first
+
+
+def test_pages_default_to_offsets(client):
+    first = client.get("/mealplans", params={"limit": 10}).json()
+
+    assert [item["meal_id"] for item in first["items"]] == list(range(1, 11))
+    assert first["links"]["next"]["href"].endswith("/mealplans?skip=10&limit=10")
+    assert first["links"]["last"]["href"].endswith("/mealplans?skip=20&limit=10")
+    assert "previous" not in first["links"]
+
+
+def test_last_link_returns_the_final_page(client):
+    first = client.get("/mealplans", params={"limit": 10, "cursor": ""}).json()
+    last = client.get(first["links"]["last"]["href"]).json()
+
+    assert [item["meal_id"] for item in last["items"]] == list(range(21, 31))
+    assert "next" not in last["links"]
+
+
+def test_invalid_cursor_is_a_bad_request(client):
+    assert client.get("/mealplans", params={"cursor": "not a cursor"}).status_code == 400
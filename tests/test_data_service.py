@@ -0,0 +1,138 @@
+import pymysql
+import pytest
+from fastapi import HTTPException
+
+from framework.services.data_access.MySQLRDBDataService import MySQLRDBDataService
+from framework.services.data_access.SQLiteDataService import _SQLiteCursor
+
+
+def _lose_connection(monkeypatch):
+    # What pymysql raises when the server goes away in the middle of a query.
+    def execute(self, query, params=None):
+        raise pymysql.err.OperationalError(2013, "Lost connection to MySQL server during query")
+    monkeypatch.setattr(_SQLiteCursor, "execute", execute)
+
+
+def test_connection_error_discards_connection(data_service, monkeypatch):
+    data_service.execute_query("SELECT 1")
+    assert data_service.get_pool_stats()["idle"] == 1
+
+    with monkeypatch.context() as patch:
+        _lose_connection(patch)
+        with pytest.raises(HTTPException):
+            data_service.execute_query("SELECT 1")
+
+    stats = data_service.get_pool_stats()
+    assert (stats["broken"], stats["size"], stats["idle"]) == (1, 0, 0)
+    assert data_service.execute_query("SELECT 1 AS one") == [{"one": 1}]
+
+
+def test_connection_error_in_transaction_discards_connection(data_service, monkeypatch):
+    with pytest.raises(pymysql.err.OperationalError):
+        with data_service.transaction():
+            with monkeypatch.context() as patch:
+                _lose_connection(patch)
+                data_service.get_all_data("mealplan_db", "meal_plans")
+
+    stats = data_service.get_pool_stats()
+    assert (stats["broken"], stats["in_use"], stats["idle"]) == (1, 0, 0)
+
+
+def test_meal_plan_delete_reports_its_daily_meal_plans(data_service):
+    data_service.seed(meal_plans=10, days=7, recipes=10)
+    changes = []
+    data_service.add_change_listener(
+        lambda database_name, collection_name, key_field, keys: changes.append((collection_name, list(keys)))
+    )
+
+    # Daily meal plan 3 is the only day of meal plan 3 (see SQLiteDataService.seed).
+    data_service.delete_data("mealplan_db", "meal_plans", "meal_id", 3)
+
+    assert sorted(changes) == [("daily_meal_plans", [3]), ("meal_plans", [3])]
+    assert data_service.get_data_object("mealplan_db", "daily_meal_plans", "day_plan_id", 3) is None
+
+
+def test_daily_plan_delete_reports_days_sharing_its_meal_plan(data_service):
+    data_service.seed(meal_plans=10, days=7, recipes=10)
+    data_service.insert_data("mealplan_db", "daily_meal_plans",
+                             {"day_plan_id": 11, "week_plan_id": 1, "date": "2024-01-02", "meal_id": 3})
+    changes = []
+    data_service.add_change_listener(
+        lambda database_name, collection_name, key_field, keys: changes.append((collection_name, sorted(keys)))
+    )
+
+    # Deleting a day deletes its meal plan, which the schema cascades to day 11.
+    data_service.delete_data("mealplan_db", "daily_meal_plans", "day_plan_id", 3)
+
+    assert ("daily_meal_plans", [3, 11]) in changes and ("meal_plans", [3]) in changes
+    assert data_service.get_data_object("mealplan_db", "daily_meal_plans", "day_plan_id", 11) is None
+
+
+def test_seed_skips_tables_with_rows(data_service):
+    first = data_service.seed(meal_plans=10, days=7, recipes=10)
+    second = data_service.seed(meal_plans=10, days=7, recipes=10)
+
+    assert first == {"recipes": 10, "meal_plans": 10, "weekly_meal_plans": 1, "daily_meal_plans": 10}
+    assert set(second.values()) == {0}
+    assert data_service.execute_query("SELECT COUNT(*) AS count FROM mealplan_db.meal_plans") == [{"count": 10}]
+
+
+class _SequenceCursor:
+    """
+    Just enough of a pymysql cursor for allocate_id_block().
+    """
+
+    def __init__(self, sequences):
+        self.sequences = sequences
+        self.rowcount = 0
+        self.last_insert_id = None
+
+    def execute(self, query, params=None):
+        if query.startswith("INSERT IGNORE"):
+            self.sequences.setdefault(params[0], 1)
+        elif query.startswith("UPDATE"):
+            block_size, name = params
+            self.sequences[name] += block_size
+            self.last_insert_id = self.sequences[name]
+            self.rowcount = 1
+
+    def fetchone(self):
+        return {"next_value": self.last_insert_id}
+
+
+class _SequenceConnection:
+    def __init__(self, sequences):
+        self.sequences = sequences
+
+    def cursor(self):
+        return _SequenceCursor(self.sequences)
+
+    def close(self):
+        pass
+
+
+class _FakeMySQLDataService(MySQLRDBDataService):
+    def __init__(self):
+        self.sequences = {}
+        self.connections = 0
+        super().__init__({"pool_min_size": 0, "pool_max_size": 1, "pool_timeout": 0.1})
+
+    def _connect(self):
+        self.connections += 1
+        return _SequenceConnection(self.sequences)
+
+
+def test_mysql_id_blocks_do_not_wait_for_the_pool():
+    data_service = _FakeMySQLDataService()
+    held = data_service._pool.acquire()
+    try:
+        # The only pooled connection is taken, as inside a transaction.
+        first = data_service.allocate_id_block("mealplan_db", "meal_plans", 10, "meal_plans", "meal_id")
+        second = data_service.allocate_id_block("mealplan_db", "meal_plans", 10, "meal_plans", "meal_id")
+    finally:
+        held.close()
+        data_service.close()
+
+    assert (first, second) == (1, 11)
+    # One connection for the pool, one for the sequences.
+    assert data_service.connections == 2
@@ -0,0 +1,45 @@
+import pytest
+
+from framework.utils.etag import compute_etag, etag_matches
+
+
+def test_etag_is_stable_and_ignores_key_order():
+    assert compute_etag({"a": 1, "b": [1, 2]}) == compute_etag({"b": [1, 2], "a": 1})
+    assert compute_etag({"a": 1}) != compute_etag({"a": 2})
+    assert compute_etag(b"body").startswith('"') and compute_etag(b"body").endswith('"')
+
+
+@pytest.mark.parametrize("if_none_match, matches", [
+    (None, False),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"xyz", W/"abc"', True),
+    ("*", True),
+    ('"xyz"', False),
+])
+def test_if_none_match_uses_weak_comparison(if_none_match, matches):
+    assert etag_matches(if_none_match, '"abc"') is matches
+    assert etag_matches(if_none_match, 'W/"abc"') is matches
+
+
+def test_unchanged_meal_plan_is_not_modified(client):
+    first = client.get("/mealplans/1")
+    etag = first.headers["ETag"]
+
+    again = client.get("/mealplans/1", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert again.content == b""
+
+    client.put("/mealplans/1", json={"meal_id": 1, "lunch_recipe": 77})
+    changed = client.get("/mealplans/1", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["lunch_recipe"] == 77
+
+
+def test_list_pages_are_not_modified_until_they_change(client):
+    etag = client.get("/mealplans", params={"limit": 5}).headers["ETag"]
+
+    assert client.get("/mealplans", params={"limit": 5}, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/mealplans", params={"limit": 6}, headers={"If-None-Match": etag}).status_code == 200
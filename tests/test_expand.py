@@ -0,0 +1,50 @@
+from app.services.service_factory import ServiceFactory
+
+
+def test_weekly_plan_embeds_its_days_in_date_order(client):
+    week = client.get("/weekly-mealplans/1", params={"expand": "daily"}).json()
+
+    days = week["daily_mealplans"]
+    assert len(days) == 21  # 30 days of plans over 14 dates, 3 per date
+    assert all(day["week_plan_id"] == 1 for day in days)
+    assert [day["date"] for day in days] == sorted(day["date"] for day in days)
+    assert "mealplan" not in days[0]
+
+
+def test_meals_are_embedded_with_one_lookup_per_level(client, monkeypatch):
+    data_service = ServiceFactory.get_service("MealplanResourceDataService")
+    lookups = []
+    get_data_objects = data_service.get_data_objects
+
+    def counting(database_name, collection_name, *args, **kwargs):
+        lookups.append(collection_name)
+        return get_data_objects(database_name, collection_name, *args, **kwargs)
+    monkeypatch.setattr(data_service, "get_data_objects", counting)
+
+    weeks = client.get("/weekly-mealplans/all", params={"expand": "meals"}).json()["items"]
+
+    days = [day for week in weeks for day in week["daily_mealplans"]]
+    assert len(days) == 30
+    assert all(day["mealplan"]["meal_id"] == day["meal_id"] for day in days)
+    assert lookups == ["daily_meal_plans", "meal_plans"]
+
+
+def test_daily_list_embeds_meals(client):
+    days = client.get("/daily-mealplans", params={"limit": 3, "expand": "meals"}).json()["items"]
+
+    assert [day["mealplan"]["meal_id"] for day in days] == [day["meal_id"] for day in days]
+
+
+def test_expansion_needs_its_key_in_the_fieldset(client):
+    response = client.get("/daily-mealplans", params={"fields": "date", "expand": "meals"})
+
+    assert response.status_code == 400
+    assert "meal_id" in response.json()["detail"]
+
+
+def test_unknown_expansion_is_a_bad_request(client):
+    assert client.get("/mealplans", params={"expand": "daily"}).status_code == 400
+
+
+def test_recipes_need_a_recipe_service(client):
+    assert client.get("/mealplans/1", params={"expand": "recipes"}).status_code == 503
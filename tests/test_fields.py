@@ -0,0 +1,45 @@
+import pytest
+
+from app.models.mealplan_model import Mealplan
+
+
+def test_fieldset_is_parsed_in_model_order():
+    assert Mealplan.parse_fields(" lunch_recipe,meal_id ,lunch_recipe") == ("meal_id", "lunch_recipe")
+
+
+@pytest.mark.parametrize("fields", ["", " , ", "meal_id,calories"])
+def test_invalid_fieldsets_are_rejected(fields):
+    with pytest.raises(ValueError):
+        Mealplan.parse_fields(fields)
+
+
+def test_only_the_selected_columns_are_read(data_service):
+    data_service.seed(meal_plans=10, days=7, recipes=10)
+
+    rows = data_service.get_all_data("mealplan_db", "meal_plans", limit=2, key_field="meal_id",
+                                     fields=("lunch_recipe",))
+
+    # The key is always selected, for the cursor.
+    assert [sorted(row) for row in rows] == [["lunch_recipe", "meal_id"]] * 2
+    with pytest.raises(ValueError):
+        data_service.get_all_data("mealplan_db", "meal_plans", fields=("calories",))
+
+
+def test_single_object_with_fields(client):
+    response = client.get("/mealplans/1", params={"fields": "lunch_recipe"})
+
+    assert response.json() == {"lunch_recipe": client.get("/mealplans/1").json()["lunch_recipe"]}
+
+
+def test_list_with_fields_keeps_them_in_the_links(client):
+    body = client.get("/daily-mealplans", params={"limit": 5, "fields": "date,day_plan_id"}).json()
+
+    assert [sorted(item) for item in body["items"]] == [["date", "day_plan_id"]] * 5
+    assert body["links"]["next"]["href"].endswith("&fields=day_plan_id,date")
+
+
+def test_unknown_field_is_a_bad_request(client):
+    response = client.get("/mealplans", params={"fields": "calories"})
+
+    assert response.status_code == 400
+    assert "calories" in response.json()["detail"]
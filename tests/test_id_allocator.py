@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from framework.services.data_access.IdAllocator import IdAllocator
+
+
+class _FakeSequences:
+    """
+    allocate_id_block() over in-memory sequences, recording each reservation.
+    """
+
+    def __init__(self, start=1):
+        self.start = start
+        self.next_values = {}
+        self.reservations = []
+
+    def allocate_id_block(self, database_name, sequence_name, block_size, seed_collection, seed_field):
+        first = self.next_values.get(sequence_name, self.start)
+        self.next_values[sequence_name] = first + block_size
+        self.reservations.append((sequence_name, block_size))
+        return first
+
+
+def test_ids_come_from_one_block_until_it_runs_out():
+    sequences = _FakeSequences()
+    allocator = IdAllocator(sequences, "mealplan_db", block_size=3)
+
+    ids = [allocator.next_id("meal_plans", "meal_id") for _ in range(4)]
+
+    assert ids == [1, 2, 3, 4]
+    assert sequences.reservations == [("meal_plans", 3), ("meal_plans", 3)]
+
+
+def test_sequences_are_independent():
+    sequences = _FakeSequences(start=10)
+    allocator = IdAllocator(sequences, "mealplan_db", block_size=5)
+
+    assert allocator.next_id("meal_plans", "meal_id") == 10
+    assert allocator.next_id("weekly_meal_plans", "week_plan_id") == 10
+    assert allocator.next_id("meal_plans", "meal_id") == 11
+
+
+def test_next_ids_beyond_the_block_size_take_one_round_trip():
+    sequences = _FakeSequences()
+    allocator = IdAllocator(sequences, "mealplan_db", block_size=4)
+    allocator.next_id("meal_plans", "meal_id")
+
+    ids = allocator.next_ids("meal_plans", "meal_id", 10)
+
+    # Three IDs are left in the first block; the other seven come from one new block.
+    assert ids == list(range(2, 12))
+    assert sequences.reservations == [("meal_plans", 4), ("meal_plans", 7)]
+
+
+def test_no_ids_need_no_round_trip():
+    sequences = _FakeSequences()
+    allocator = IdAllocator(sequences, "mealplan_db")
+
+    assert allocator.next_ids("meal_plans", "meal_id", 0) == []
+    assert sequences.reservations == []
+
+
+def test_concurrent_callers_get_unique_ids():
+    allocator = IdAllocator(_FakeSequences(), "mealplan_db", block_size=7)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        ids = [id for batch in executor.map(lambda _: allocator.next_ids("meal_plans", "meal_id", 3), range(200))
+               for id in batch]
+
+    assert sorted(ids) == list(range(1, 601))
+
+
+def test_block_size_must_be_positive():
+    with pytest.raises(ValueError):
+        IdAllocator(_FakeSequences(), "mealplan_db", block_size=0)
+
+
+def test_sqlite_sequences_continue_after_existing_rows(data_service):
+    data_service.seed(meal_plans=10, days=7, recipes=10)
+    allocator = IdAllocator(data_service, "mealplan_db", block_size=5)
+
+    assert allocator.next_ids("meal_plans", "meal_id", 2) == [11, 12]
+    # A second allocator, as in another process, gets a block of its own.
+    assert IdAllocator(data_service, "mealplan_db", block_size=5).next_id("meal_plans", "meal_id") == 16
@@ -0,0 +1,61 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from framework.services.jobs.job_engine import JobEngine, JobQueueFullError
+from framework.services.jobs.job_store import SQLiteJobStore, COMPLETED
+
+
+async def _double(value):
+    return value * 2
+
+
+def test_job_runs_and_is_polled(tmp_path):
+    engine = JobEngine(SQLiteJobStore(str(tmp_path / "jobs.db")), workers=1)
+
+    async def run():
+        job_id = await engine.submit(_double, 21)
+        return await engine.wait(job_id, timeout=5)
+
+    job = asyncio.run(run())
+    assert (job["status"], job["result"]) == (COMPLETED, 42)
+
+
+def test_submit_beyond_queue_size_is_rejected(tmp_path):
+    engine = JobEngine(SQLiteJobStore(str(tmp_path / "jobs.db")), workers=1, max_queue=2)
+
+    async def run():
+        await asyncio.gather(*(engine.submit(asyncio.sleep, 1) for _ in range(3)))
+
+    with pytest.raises(JobQueueFullError):
+        asyncio.run(run())
+
+
+def test_locked_store_does_not_block_event_loop(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    engine = JobEngine(SQLiteJobStore(path, busy_timeout=0.5), workers=1)
+    # Another process writing to the store.
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+
+    async def run():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        with pytest.raises(sqlite3.OperationalError):
+            await engine.submit(_double, 1)
+        ticker.cancel()
+        return ticks
+
+    try:
+        assert asyncio.run(run()) >= 10
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
@@ -0,0 +1,82 @@
+import io
+import json
+import logging
+import queue
+
+import pytest
+
+from framework.middleware.observability import correlation_id
+from framework.utils.logging_pipeline import _NonBlockingQueueHandler, configure_logging, shutdown_logging
+
+
+@pytest.fixture
+def log_stream():
+    """
+    Configure the pipeline to write to a buffer. The previous root handlers and level are
+    restored afterwards.
+    """
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    stream = io.StringIO()
+    yield stream
+    shutdown_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def _lines(stream):
+    shutdown_logging()  # Waits for the writer thread
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_records_are_written_as_json_with_correlation_id_and_extra_fields(log_stream):
+    configure_logging(level="INFO", json_format=True, levels={}, stream=log_stream)
+    token = correlation_id.set("abc-123")
+    try:
+        logging.getLogger("tests.pipeline").info("Served %s", "/ping", extra={"status": 200})
+    finally:
+        correlation_id.reset(token)
+
+    [line] = _lines(log_stream)
+    assert (line["level"], line["logger"], line["message"]) == ("INFO", "tests.pipeline", "Served /ping")
+    assert (line["correlation_id"], line["status"]) == ("abc-123", 200)
+
+
+def test_exceptions_are_formatted(log_stream):
+    configure_logging(level="INFO", json_format=True, levels={}, stream=log_stream)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logging.getLogger("tests.pipeline").exception("Failed")
+
+    [line] = _lines(log_stream)
+    assert "ValueError: boom" in line["exception"]
+
+
+def test_per_logger_levels_and_debug_sampling(log_stream):
+    configure_logging(level="INFO", json_format=True, levels={"tests.verbose": "DEBUG"},
+                      debug_sample_rate=0.0, stream=log_stream)
+    logging.getLogger("tests.quiet").debug("hidden by level")
+    logging.getLogger("tests.verbose").debug("dropped by sampling")
+    logging.getLogger("tests.verbose").info("kept")
+
+    assert [line["message"] for line in _lines(log_stream)] == ["kept"]
+
+
+def test_arguments_are_merged_before_the_record_is_queued():
+    handler = _NonBlockingQueueHandler(queue.Queue())
+    items = ["a"]
+    handler.handle(logging.LogRecord("tests", logging.INFO, __file__, 1, "Items: %s", (items,), None))
+    items.append("b")
+
+    record = handler.queue.get_nowait()
+    assert (record.msg, record.args) == ("Items: ['a']", None)
+
+
+def test_records_beyond_the_queue_size_are_dropped():
+    handler = _NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    for _ in range(3):
+        handler.handle(logging.LogRecord("tests", logging.INFO, __file__, 1, "record", None, None))
+
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 2
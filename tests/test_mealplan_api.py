@@ -0,0 +1,22 @@
+from app.services.service_factory import ServiceFactory
+from framework.services.data_access.ConnectionPool import PoolTimeoutError
+
+
+def test_daily_create_with_an_unknown_meal_plan_is_a_bad_request(client):
+    response = client.post("/daily-mealplans",
+                           json={"day_plan_id": 0, "week_plan_id": 0, "date": "2030-01-01", "meal_id": 999})
+
+    assert response.status_code == 400
+
+
+def test_list_is_unavailable_while_the_pool_is_exhausted(client, monkeypatch):
+    data_service = ServiceFactory.get_service("MealplanResourceDataService")
+    client.get("/mealplans")  # Fill the count cache
+
+    def acquire():
+        raise PoolTimeoutError("No connection available")
+    monkeypatch.setattr(data_service._pool, "acquire", acquire)
+    response = client.get("/mealplans", params={"skip": 10})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
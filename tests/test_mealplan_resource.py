@@ -0,0 +1,108 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.mealplan_model import DailyMealplan, Mealplan, WeeklyMealplan
+from app.services.service_factory import ServiceFactory
+
+
+def _small_pool_resource(service_env, pool_size):
+    # Every create refills an ID block inside its transaction, while as many creates as
+    # there are pooled connections run at once.
+    service_env.setenv("DB_POOL_MAX_SIZE", str(pool_size))
+    service_env.setenv("DB_POOL_TIMEOUT", "2")
+    service_env.setenv("ID_BLOCK_SIZE", "1")
+    data_service = ServiceFactory.get_service("MealplanResourceDataService")
+    data_service.seed(meal_plans=10, days=7, recipes=10)
+    return ServiceFactory.get_service("MealplanResource")
+
+
+def test_concurrent_daily_creates_do_not_exhaust_pool(service_env):
+    workers = 4
+    resource = _small_pool_resource(service_env, workers)
+
+    def create(i):
+        # The IDs are assigned by the resource.
+        daily = DailyMealplan(day_plan_id=0, week_plan_id=0, meal_id=1, date=f"2030-01-{i % 28 + 1:02d}")
+        return resource.create_daily_meal_plan(daily)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        created = list(executor.map(create, range(workers * 5)))
+
+    assert len({day.day_plan_id for day in created}) == len(created)
+    assert all(day.week_plan_id is not None for day in created)
+
+
+def test_concurrent_batches_do_not_exhaust_pool(service_env):
+    workers = 4
+    resource = _small_pool_resource(service_env, workers)
+
+    def run(i):
+        daily = DailyMealplan(day_plan_id=0, week_plan_id=0, meal_id=1, date=f"2030-02-{i % 28 + 1:02d}")
+        meal_plan = Mealplan(meal_id=0, breakfast_recipe=1, lunch_recipe=2, dinner_recipe=3)
+        return resource.run_batch([("create", "meal_plans", None, meal_plan),
+                                   ("create", "daily_meal_plans", None, daily)])
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        outcomes = list(executor.map(run, range(workers * 5)))
+
+    assert all(committed for committed, _ in outcomes)
+    meal_ids = [results[0][0].meal_id for _, results in outcomes]
+    assert len(set(meal_ids)) == len(meal_ids)
+
+
+def _daily(date, meal_id=1):
+    return DailyMealplan(day_plan_id=0, week_plan_id=0, meal_id=meal_id, date=date)
+
+
+def _weeks_starting(data_service, start_date):
+    return data_service.execute_query(
+        "SELECT week_plan_id FROM mealplan_db.weekly_meal_plans WHERE start_date = %s", (start_date,)
+    )
+
+
+def test_bulk_daily_create_is_atomic(service_env, resource, data_service):
+    data_service.seed(meal_plans=10, days=7, recipes=10)
+
+    with pytest.raises(HTTPException):
+        # The second day refers to a meal plan that does not exist.
+        resource.create_daily_meal_plans([_daily("2031-01-01"), _daily("2031-03-01", meal_id=999)])
+
+    assert _weeks_starting(data_service, "2031-01-01") == []
+    assert _weeks_starting(data_service, "2031-03-01") == []
+
+
+def test_bulk_daily_create_report_errors_leaves_no_orphan_weeks(service_env, resource, data_service):
+    data_service.seed(meal_plans=10, days=7, recipes=10)
+
+    created, errors = resource.create_daily_meal_plans(
+        [_daily("2031-01-01"), _daily("2031-03-01", meal_id=999), _daily("2031-01-02")], report_errors=True
+    )
+
+    assert [day.date for day in created] == ["2031-01-01", "2031-01-02"]
+    assert [error["index"] for error in errors] == [1]
+    assert len(_weeks_starting(data_service, "2031-01-01")) == 1
+    assert _weeks_starting(data_service, "2031-03-01") == []
+
+
+def test_daily_create_in_existing_week_reserves_no_week_key(service_env, resource, data_service):
+    data_service.seed(meal_plans=10, days=7, recipes=10)
+    first = resource.create_daily_meal_plan(_daily("2031-05-01"))
+
+    second = resource.create_daily_meal_plan(_daily("2031-05-02"))
+    new_week = resource.create_weekly_meal_plan(WeeklyMealplan(week_plan_id=0, start_date="2032-01-01",
+                                                               end_date="2032-01-07"))
+
+    assert second.week_plan_id == first.week_plan_id
+    assert new_week.week_plan_id == first.week_plan_id + 1
+
+
+def test_daily_create_keeps_the_status_of_data_errors(service_env, resource, data_service):
+    data_service.seed(meal_plans=10, days=7, recipes=10)
+
+    with pytest.raises(HTTPException) as raised:
+        # The meal plan does not exist.
+        resource.create_daily_meal_plan(_daily("2031-06-01", meal_id=999))
+
+    assert raised.value.status_code == 400
@@ -0,0 +1,76 @@
+import pytest
+
+from framework.services.cache.object_cache import ObjectCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ObjectCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_are_not_served():
+    cache = ObjectCache(ttl=0)
+    cache.put("a", 1)
+
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_missing_objects_are_not_cached():
+    cache = ObjectCache()
+    loads = []
+
+    for _ in range(2):
+        assert cache.get_or_load("a", lambda: loads.append("a")) is None
+
+    assert loads == ["a", "a"]
+
+
+def test_load_racing_with_an_invalidation_is_not_cached():
+    cache = ObjectCache()
+
+    def load():
+        # A write commits while the row is being read.
+        cache.invalidate("a")
+        return "before the write"
+
+    assert cache.get_or_load("a", load) == "before the write"
+    assert cache.get("a") is None
+
+
+def test_many_keys_load_the_misses_in_one_call():
+    cache = ObjectCache()
+    cache.put(1, "one")
+    calls = []
+
+    def load(keys):
+        calls.append(keys)
+        return {key: f"loaded {key}" for key in keys if key != 3}
+
+    assert cache.get_many_or_load([1, 2, 3], load) == {1: "one", 2: "loaded 2"}
+    assert calls == [[2, 3]]
+    assert cache.get(2) == "loaded 2"
+
+
+def test_max_size_must_be_positive():
+    with pytest.raises(ValueError):
+        ObjectCache(max_size=0)
+
+
+def test_writes_invalidate_cached_rows(resource, data_service):
+    data_service.seed(meal_plans=10, days=7, recipes=10)
+    assert resource.get_row(1, "meal_plans")["lunch_recipe"] != 77
+    resource.get_row(1, "meal_plans")
+    assert resource.object_cache.stats()["hits"] == 1
+
+    data_service.update_data("mealplan_db", "meal_plans", {"lunch_recipe": 77}, "meal_id", 1)
+    assert resource.get_row(1, "meal_plans")["lunch_recipe"] == 77
+
+    data_service.delete_data("mealplan_db", "meal_plans", "meal_id", 1)
+    assert resource.get_row(1, "meal_plans") is None
@@ -0,0 +1,58 @@
+import logging
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from framework.middleware.observability import ObservabilityMiddleware, get_correlation_id
+
+ACCESS_LOGGER = "tests.access"
+
+
+def _client():
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping(request: Request):
+        return {"state": request.state.correlation_id, "context": get_correlation_id()}
+
+    @app.get("/fail")
+    async def fail():
+        raise RuntimeError("boom")
+
+    app.add_middleware(ObservabilityMiddleware, access_logger=logging.getLogger(ACCESS_LOGGER))
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_correlation_id_is_taken_from_the_request():
+    response = _client().get("/ping", headers={"X-Correlation-ID": "abc-123"})
+
+    assert response.headers["X-Correlation-ID"] == "abc-123"
+    assert response.json() == {"state": "abc-123", "context": "abc-123"}
+
+
+def test_correlation_id_is_generated_when_missing():
+    response = _client().get("/ping")
+
+    correlation_id = response.headers["X-Correlation-ID"]
+    assert uuid.UUID(correlation_id)
+    assert response.json()["context"] == correlation_id
+    assert get_correlation_id() is None
+
+
+def test_one_access_line_per_request(caplog):
+    caplog.set_level(logging.INFO, logger=ACCESS_LOGGER)
+    _client().get("/ping", params={"limit": 5})
+
+    [record] = [record for record in caplog.records if record.name == ACCESS_LOGGER]
+    assert (record.method, record.path, record.status) == ("GET", "/ping?limit=5", 200)
+    assert record.duration_ms >= 0
+
+
+def test_failed_requests_are_logged_as_500(caplog):
+    caplog.set_level(logging.INFO, logger=ACCESS_LOGGER)
+    response = _client().get("/fail")
+
+    assert response.status_code == 500
+    [record] = [record for record in caplog.records if record.name == ACCESS_LOGGER]
+    assert record.status == 500
@@ -0,0 +1,105 @@
+import asyncio
+
+import httpx
+
+from app.services.recipe_client import RecipeClient
+
+
+class _RecipeService:
+    """
+    An httpx.MockTransport handler serving recipes 1-99. Recipe 500 fails, recipe 600 takes a
+    second and the other IDs are not found.
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.requested = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        recipe_id = int(request.url.path.rsplit("/", 1)[1])
+        self.requested.append(recipe_id)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(1.0 if recipe_id == 600 else self.delay)
+        finally:
+            self.in_flight -= 1
+        if recipe_id == 500:
+            return httpx.Response(500)
+        if recipe_id >= 100:
+            return httpx.Response(404)
+        return httpx.Response(200, json={"recipe_id": recipe_id, "name": f"Recipe {recipe_id}", "steps": ["..."]})
+
+
+def _run(client, *calls):
+    async def main():
+        try:
+            return await asyncio.gather(*(client.get_many(recipe_ids) for recipe_ids in calls))
+        finally:
+            await client._client.aclose()
+    return asyncio.run(main())
+
+
+def _client(service, **options):
+    return RecipeClient("http://recipes", transport=httpx.MockTransport(service), **options)
+
+
+def test_summaries_are_fetched_once_per_recipe():
+    service = _RecipeService()
+    client = _client(service)
+
+    [summaries] = _run(client, [1, 2, 1, None])
+
+    assert summaries == {1: {"recipe_id": 1, "name": "Recipe 1"}, 2: {"recipe_id": 2, "name": "Recipe 2"}}
+    assert sorted(service.requested) == [1, 2]
+
+
+def test_summaries_and_missing_recipes_are_cached():
+    service = _RecipeService()
+    client = _client(service)
+    _run(client, [1, 404])
+
+    [summaries] = _run(client, [1, 404])
+
+    assert summaries == {1: {"recipe_id": 1, "name": "Recipe 1"}, 404: None}
+    assert sorted(service.requested) == [1, 404]
+    assert client.stats()["not_found"] == 1
+
+
+def test_failed_recipes_are_none_and_retried_later():
+    service = _RecipeService()
+    client = _client(service, timeout=0.1)
+
+    [summaries] = _run(client, [1, 500, 600])
+    _run(client, [500])
+
+    assert summaries == {1: {"recipe_id": 1, "name": "Recipe 1"}, 500: None, 600: None}
+    assert service.requested.count(500) == 2
+    assert client.stats()["errors"] == 3
+
+
+def test_concurrent_requests_share_fetches():
+    service = _RecipeService(delay=0.02)
+    client = _client(service)
+
+    first, second = _run(client, [1, 2], [2, 3])
+
+    assert first[2] is second[2]
+    assert sorted(service.requested) == [1, 2, 3]
+    assert client.stats()["coalesced"] == 1
+
+
+def test_fan_out_is_bounded_by_the_connection_limit():
+    service = _RecipeService(delay=0.01)
+    client = _client(service, max_connections=3)
+
+    [summaries] = _run(client, range(1, 21))
+
+    assert len(summaries) == 20
+    assert service.max_in_flight == 3
+
+
+def test_disabled_without_a_base_url():
+    assert RecipeClient(None).enabled is False
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from framework.services.cache.single_flight import SingleFlight, call_key
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    single_flight = SingleFlight()
+    runs = []
+
+    async def read(key):
+        runs.append(key)
+        await asyncio.sleep(0.01)
+        return {"key": key}
+
+    async def main():
+        return await asyncio.gather(*(single_flight.do_async(("read", key), read, key) for key in (1, 1, 1, 2)))
+
+    results = asyncio.run(main())
+
+    assert runs == [1, 2]
+    assert results[0] is results[1] is results[2]
+    assert single_flight.stats() == {"in_flight": 0, "calls": 4, "coalesced": 2,
+                                     "coalesced_by_operation": {"read": 2}}
+
+
+def test_waiters_get_the_exception_of_the_call():
+    single_flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(*(single_flight.do_async(("fail",), fail) for _ in range(2)),
+                                    return_exceptions=True)
+
+    assert [type(error) for error in asyncio.run(main())] == [ValueError, ValueError]
+
+
+def test_calls_after_forget_all_start_a_new_execution():
+    single_flight = SingleFlight()
+    runs = []
+
+    async def read():
+        runs.append(len(runs))
+        await asyncio.sleep(0.01)
+        return len(runs)
+
+    async def main():
+        first = asyncio.ensure_future(single_flight.do_async(("read",), read))
+        await asyncio.sleep(0)
+        # A write committed while the first read is in flight.
+        single_flight.forget_all()
+        second = await single_flight.do_async(("read",), read)
+        return await first, second
+
+    assert asyncio.run(main()) == (2, 2)
+    assert runs == [0, 1]
+
+
+def test_cancelled_caller_does_not_cancel_the_call():
+    single_flight = SingleFlight()
+
+    async def read():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        impatient = asyncio.ensure_future(single_flight.do_async(("read",), read))
+        patient = asyncio.ensure_future(single_flight.do_async(("read",), read))
+        await asyncio.sleep(0.005)
+        impatient.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await impatient
+        return await patient
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_call_key_makes_arguments_hashable():
+    key = call_key("get_by_keys", ([3, 1], "meal_plans"), {"fields": ["meal_id"]})
+
+    assert key == ("get_by_keys", (3, 1), "meal_plans", ("fields", ("meal_id",)))
+    assert hash(key) == hash(call_key("get_by_keys", ([3, 1], "meal_plans"), {"fields": ["meal_id"]}))
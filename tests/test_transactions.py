@@ -0,0 +1,68 @@
+import pytest
+from fastapi import HTTPException
+
+
+def _meal_plan(meal_id):
+    return {"meal_id": meal_id, "breakfast_recipe": 1, "lunch_recipe": 2, "dinner_recipe": 3}
+
+
+def test_transaction_commits_once_at_the_end(data_service):
+    with data_service.transaction():
+        data_service.insert_data("mealplan_db", "meal_plans", _meal_plan(1))
+        data_service.insert_data("mealplan_db", "meal_plans", _meal_plan(2))
+        # The block reads its own writes.
+        assert data_service.get_data_object("mealplan_db", "meal_plans", "meal_id", 2) is not None
+
+    assert data_service.get_total_count("mealplan_db", "meal_plans") == 2
+
+
+def test_transaction_rolls_back_when_block_raises(data_service):
+    changes = []
+    data_service.add_change_listener(lambda *change: changes.append(change))
+
+    with pytest.raises(RuntimeError):
+        with data_service.transaction():
+            data_service.insert_data("mealplan_db", "meal_plans", _meal_plan(1))
+            data_service.update_data("mealplan_db", "meal_plans", {"lunch_recipe": 9}, "meal_id", 1)
+            raise RuntimeError("abort")
+
+    assert data_service.get_total_count("mealplan_db", "meal_plans") == 0
+    assert changes == []
+    assert data_service.get_pool_stats()["in_use"] == 0
+
+
+def test_transaction_rolls_back_after_a_handled_failure(data_service):
+    with pytest.raises(HTTPException) as raised:
+        with data_service.transaction():
+            data_service.insert_data("mealplan_db", "meal_plans", _meal_plan(1))
+            try:
+                data_service.insert_data("mealplan_db", "meal_plans", _meal_plan(1))
+            except HTTPException:
+                pass
+
+    assert raised.value.status_code == 500
+    assert data_service.get_total_count("mealplan_db", "meal_plans") == 0
+
+
+def test_savepoint_rolls_back_only_its_block(data_service):
+    with data_service.transaction():
+        data_service.insert_data("mealplan_db", "meal_plans", _meal_plan(1))
+        with pytest.raises(HTTPException):
+            with data_service.savepoint():
+                data_service.insert_data("mealplan_db", "meal_plans", _meal_plan(2))
+                data_service.insert_data("mealplan_db", "meal_plans", _meal_plan(1))
+
+    rows = data_service.get_all_data("mealplan_db", "meal_plans", key_field="meal_id")
+    assert [row["meal_id"] for row in rows] == [1]
+
+
+def test_changes_are_reported_when_the_transaction_commits(data_service):
+    data_service.insert_data("mealplan_db", "meal_plans", _meal_plan(1))
+    changes = []
+    data_service.add_change_listener(lambda *change: changes.append(change))
+
+    with data_service.transaction():
+        data_service.update_data("mealplan_db", "meal_plans", {"lunch_recipe": 9}, "meal_id", 1)
+        assert changes == []
+
+    assert changes == [("mealplan_db", "meal_plans", "meal_id", [1])]